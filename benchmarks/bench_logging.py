@@ -0,0 +1,55 @@
+"""
+Measures the cost of the enforcer debug logs when the permit logger is disabled (the default),
+comparing eagerly formatted f-strings with the lazy logs used by the SDK.
+
+    python -m benchmarks.bench_logging
+"""
+
+import timeit
+from pprint import pformat
+
+from loguru import logger
+from permit.logger import PERMIT_MODULE
+
+ITERATIONS = 20_000
+BODY = {
+    "user": {"key": "auth0|elon", "attributes": {"age": 50}},
+    "action": "read",
+    "resource": {"type": "document", "key": "1234", "tenant": "default", "context": {"tenant": "default"}},
+    "context": {"ip": "1.1.1.1", "time": "2024-01-01T00:00:00Z"},
+}
+CONTENT = {"allow": True, "query": BODY, "debug": {"rbac": {"allow": True, "code": "allow"}}}
+
+
+def eager_log():
+    logger.debug(
+        f"permit.check() response:\n"
+        f"body: {pformat(BODY, indent=2)}\n"
+        f"response status: {200}\n"
+        f"response data: {pformat(CONTENT, indent=2)}"
+    )
+
+
+def lazy_log():
+    logger.opt(lazy=True).debug(
+        "permit.check() response:\nbody: {}\nresponse status: {}\nresponse data: {}",
+        lambda: pformat(BODY, indent=2),
+        lambda: 200,
+        lambda: pformat(CONTENT, indent=2),
+    )
+
+
+def main():
+    # benchmark functions are defined in this module, so they are logged as the permit module would be
+    logger.disable(__name__)
+    logger.disable(PERMIT_MODULE)
+    eager_time = min(timeit.repeat(eager_log, number=ITERATIONS, repeat=3))
+    lazy_time = min(timeit.repeat(lazy_log, number=ITERATIONS, repeat=3))
+    print(  # noqa: T201
+        f"logging disabled: eager {eager_time / ITERATIONS * 1e6:.2f}us/log, "
+        f"lazy {lazy_time / ITERATIONS * 1e6:.2f}us/log ({eager_time / lazy_time:.1f}x faster)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Compares the normalization of permit.check() inputs via the pydantic models with the plain dict fast path.
+
+    python -m benchmarks.bench_normalization
+"""
+
+import timeit
+
+from permit.config import MultiTenancyConfig
+from permit.enforcement.interfaces import ResourceInput
+from permit.enforcement.normalization import (
+    _normalize_resource_model,
+    _normalize_user_model,
+    normalize_resource,
+    normalize_user,
+    parse_resource_string,
+)
+
+ITERATIONS = 20_000
+MULTI_TENANCY = MultiTenancyConfig()
+USER = {"key": "auth0|elon", "firstName": "Elon", "email": "elon@tesla.com", "attributes": {"age": 50}}
+RESOURCES = {
+    "string": "document:1234",
+    "dict": {"type": "document", "key": "1234", "tenant": "tesla", "attributes": {"private": False}},
+}
+
+
+def pydantic_path(resource):
+    if isinstance(resource, str):
+        resource_type, resource_key = parse_resource_string.__wrapped__(resource)
+        model = ResourceInput(type=resource_type, key=resource_key)
+    else:
+        model = ResourceInput(**resource)
+    return _normalize_user_model(USER), _normalize_resource_model(model, MULTI_TENANCY)
+
+
+def fast_path(resource):
+    return normalize_user(USER), normalize_resource(resource, MULTI_TENANCY)
+
+
+def main():
+    for name, resource in RESOURCES.items():
+        assert pydantic_path(resource) == fast_path(resource)
+        pydantic_time = min(timeit.repeat(lambda r=resource: pydantic_path(r), number=ITERATIONS, repeat=3))
+        fast_time = min(timeit.repeat(lambda r=resource: fast_path(r), number=ITERATIONS, repeat=3))
+        print(  # noqa: T201
+            f"{name} resource: pydantic {pydantic_time / ITERATIONS * 1e6:.2f}us/query, "
+            f"fast path {fast_time / ITERATIONS * 1e6:.2f}us/query ({pydantic_time / fast_time:.1f}x faster)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Compares permit.check() against a local stub PDP over TCP (localhost) and over a unix domain socket.
+
+    python -m benchmarks.bench_unix_socket
+"""
+
+import asyncio
+import multiprocessing
+import socket
+import tempfile
+import time
+from pathlib import Path
+
+from aiohttp import web
+
+from permit import Permit
+
+SEQUENTIAL_QUERIES = 2_000
+CONCURRENT_QUERIES = 10_000
+CONCURRENCY = 50
+
+
+async def allowed(request: web.Request) -> web.Response:
+    await request.read()
+    return web.json_response({"allow": True})
+
+
+async def sequential(permit: Permit) -> float:
+    started_at = time.perf_counter()
+    for i in range(SEQUENTIAL_QUERIES):
+        await permit.check(f"user{i}", "read", "document")
+    return (time.perf_counter() - started_at) / SEQUENTIAL_QUERIES
+
+
+async def concurrent(permit: Permit) -> float:
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def check(i: int) -> bool:
+        async with semaphore:
+            return await permit.check(f"user{i}", "read", "document")
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(check(i) for i in range(CONCURRENT_QUERIES)))
+    return CONCURRENT_QUERIES / (time.perf_counter() - started_at)
+
+
+async def serve(port: int, socket_path: str) -> None:
+    app = web.Application()
+    app.router.add_post("/allowed", allowed)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    await web.UnixSite(runner, socket_path).start()
+    await asyncio.Event().wait()
+
+
+def run_stub_pdp(port: int, socket_path: str) -> None:
+    # the stub PDP runs in its own process, so it does not compete with the SDK for the event loop
+    asyncio.run(serve(port, socket_path))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_for_stub_pdp(pdp: str) -> None:
+    for _ in range(100):
+        try:
+            async with Permit(token="mocked", pdp=pdp) as permit:
+                await permit.check("warmup", "read", "document")
+                return
+        except Exception:  # noqa: BLE001
+            await asyncio.sleep(0.05)
+    raise RuntimeError("the stub PDP did not start")
+
+
+async def benchmark(pdps: dict) -> None:
+    for name, pdp in pdps.items():
+        await wait_for_stub_pdp(pdp)
+        async with Permit(token="mocked", pdp=pdp) as permit:
+            latency = await sequential(permit)
+            throughput = await concurrent(permit)
+        print(  # noqa: T201
+            f"{name}: {latency * 1e6:.0f}us/query sequential, "
+            f"{throughput:.0f} queries/s with {CONCURRENCY} concurrent queries"
+        )
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        port, socket_path = free_port(), str(Path(directory) / "pdp.sock")
+        server = multiprocessing.Process(target=run_stub_pdp, args=(port, socket_path), daemon=True)
+        server.start()
+        try:
+            asyncio.run(benchmark({"tcp": f"http://127.0.0.1:{port}", "unix socket": f"unix://{socket_path}"}))
+        finally:
+            server.terminate()
+            server.join()
+
+
+if __name__ == "__main__":
+    main()
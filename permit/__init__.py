@@ -4,6 +4,8 @@ from .config import PermitConfig
 from .enforcement.enforcer import Action, Resource, User
 from .enforcement.interfaces import (
     AssignedRole,
+    AuthorizedUserAssignment,
+    AuthorizedUserRole,
     AuthorizedUsersResult,
     ResourceInput,
     UserInput,
@@ -1,4 +1,8 @@
-from typing import Optional, Type, TypeVar, Union
+import asyncio
+import functools
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional, Type, TypeVar, Union
+from uuid import UUID
 
 import aiohttp
 from aiohttp import ClientTimeout
@@ -12,7 +16,13 @@ else:
     from pydantic.v1 import BaseModel, Extra, Field, parse_obj_as  # type: ignore
 
 from ..config import PermitConfig
-from ..exceptions import PermitContextError, handle_api_error, handle_client_error
+from ..enforcement.cache import get_authorized_users_cache, get_decision_cache
+from ..exceptions import PermitApiError, PermitContextError, handle_api_error, handle_client_error
+from ..utils.circuit_breaker import CircuitBreaker, get_circuit_breaker
+from ..utils.httpx_transport import HttpxSessionPool, get_httpx_session_pool
+from ..utils.json_codec import JsonCodec, get_json_codec
+from ..utils.retry import RetryPolicy, get_retry_policy
+from ..utils.unix_socket import split_unix_socket_url
 from .context import API_ACCESS_LEVELS, ApiContextLevel, ApiKeyAccessLevel
 from .models import APIKeyScopeRead
 
@@ -35,22 +45,82 @@ class ClientConfig(BaseModel):
     headers: dict = Field(..., description="http headers sent to the API server")
 
 
+def guarded_by_circuit_breaker(func):
+    @functools.wraps(func)
+    async def wrapped(self: "SimpleHttpClient", *args, **kwargs):
+        if self._circuit_breaker is None:
+            return await func(self, *args, **kwargs)
+        async with self._circuit_breaker.guard():
+            return await func(self, *args, **kwargs)
+
+    return wrapped
+
+
+def retried(func):
+    """
+    retries the request with the retry policy of the client, a retries keyword argument
+    overrides the number of retries of the policy for this call.
+    """
+
+    @functools.wraps(func)
+    async def wrapped(self: "SimpleHttpClient", *args, retries: Optional[int] = None, **kwargs):
+        if self._retry_policy is None:
+            return await func(self, *args, **kwargs)
+        return await self._retry_policy.run(lambda: func(self, *args, **kwargs), retries=retries)
+
+    return wrapped
+
+
 class SimpleHttpClient:
     """
     wraps aiohttp client to reduce boilerplace
     """
 
-    def __init__(self, client_config: dict, base_url: str = "", timeout: Optional[int] = None):
+    def __init__(
+        self,
+        client_config: dict,
+        base_url: str = "",
+        timeout: Optional[int] = None,
+        json_codec: Optional[JsonCodec] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        unix_socket_path: Optional[str] = None,
+        httpx_sessions: Optional[HttpxSessionPool] = None,
+    ):
         self._client_config = client_config
         self._base_url = base_url
+        self._circuit_breaker = circuit_breaker
+        # only idempotent requests (GET) are retried
+        self._retry_policy = retry_policy
+        self._unix_socket_path = unix_socket_path
+        # when set, requests are sent with the long-lived httpx session of the server instead of aiohttp
+        self._httpx_sessions = httpx_sessions
+        self._json = json_codec or JsonCodec()
+        self._client_config["json_serialize"] = self._json.dumps
         if timeout is not None:
             self._client_config["timeout"] = ClientTimeout(total=timeout)
 
+    @asynccontextmanager
+    async def _session(self) -> AsyncIterator[aiohttp.ClientSession]:
+        if self._httpx_sessions is not None:
+            # the httpx session is shared by the clients to the same server, and outlives the request
+            yield self._httpx_sessions.get(self._client_config, self._unix_socket_path).as_aiohttp_session()
+            return
+        async with self._create_session() as session:
+            yield session
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        if self._unix_socket_path is not None:
+            return aiohttp.ClientSession(
+                connector=aiohttp.UnixConnector(path=self._unix_socket_path), **self._client_config
+            )
+        return aiohttp.ClientSession(**self._client_config)
+
     def _log_request(self, url: str, method: str) -> None:
-        logger.debug(f"Sending HTTP request: {method} {url}")
+        logger.debug("Sending HTTP request: {} {}", method, url)
 
     def _log_response(self, url: str, method: str, status: int) -> None:
-        logger.debug(f"Received HTTP response: {method} {url}, status: {status}")
+        logger.debug("Received HTTP response: {} {}, status: {}", method, url, status)
 
     def _prepare_json(self, json: Optional[Union[TData, dict, list]] = None) -> Optional[Union[dict, list]]:
         if json is None:
@@ -65,17 +135,20 @@ class SimpleHttpClient:
         return json.dict(exclude_unset=True, exclude_none=True)
 
     @handle_client_error
+    @retried
+    @guarded_by_circuit_breaker
     async def get(self, url, model: Type[TModel], **kwargs) -> TModel:
         url = f"{self._base_url}{url}"
-        async with aiohttp.ClientSession(**self._client_config) as client:
+        async with self._session() as client:
             self._log_request(url, "GET")
             async with client.get(url, **kwargs) as response:
                 await handle_api_error(response)
                 self._log_response(url, "GET", response.status)
-                data = await response.json()
+                data = await response.json(loads=self._json.loads)
                 return parse_obj_as(model, data)
 
     @handle_client_error
+    @guarded_by_circuit_breaker
     async def post(
         self,
         url,
@@ -84,15 +157,16 @@ class SimpleHttpClient:
         **kwargs,
     ) -> TModel:
         url = f"{self._base_url}{url}"
-        async with aiohttp.ClientSession(**self._client_config) as client:
+        async with self._session() as client:
             self._log_request(url, "POST")
             async with client.post(url, json=self._prepare_json(json), **kwargs) as response:
                 await handle_api_error(response)
                 self._log_response(url, "POST", response.status)
-                data = await response.json()
+                data = await response.json(loads=self._json.loads)
                 return parse_obj_as(model, data)
 
     @handle_client_error
+    @guarded_by_circuit_breaker
     async def put(
         self,
         url,
@@ -101,15 +175,16 @@ class SimpleHttpClient:
         **kwargs,
     ) -> TModel:
         url = f"{self._base_url}{url}"
-        async with aiohttp.ClientSession(**self._client_config) as client:
+        async with self._session() as client:
             self._log_request(url, "PUT")
             async with client.put(url, json=self._prepare_json(json), **kwargs) as response:
                 await handle_api_error(response)
                 self._log_response(url, "PUT", response.status)
-                data = await response.json()
+                data = await response.json(loads=self._json.loads)
                 return parse_obj_as(model, data)
 
     @handle_client_error
+    @guarded_by_circuit_breaker
     async def patch(
         self,
         url,
@@ -118,15 +193,16 @@ class SimpleHttpClient:
         **kwargs,
     ) -> TModel:
         url = f"{self._base_url}{url}"
-        async with aiohttp.ClientSession(**self._client_config) as client:
+        async with self._session() as client:
             self._log_request(url, "PATCH")
             async with client.patch(url, json=self._prepare_json(json), **kwargs) as response:
                 await handle_api_error(response)
                 self._log_response(url, "PATCH", response.status)
-                data = await response.json()
+                data = await response.json(loads=self._json.loads)
                 return parse_obj_as(model, data)
 
     @handle_client_error
+    @guarded_by_circuit_breaker
     async def delete(
         self,
         url,
@@ -135,14 +211,14 @@ class SimpleHttpClient:
         **kwargs,
     ) -> Optional[TModel]:
         url = f"{self._base_url}{url}"
-        async with aiohttp.ClientSession(**self._client_config) as client:
+        async with self._session() as client:
             self._log_request(url, "DELETE")
             async with client.delete(url, json=self._prepare_json(json), **kwargs) as response:
                 await handle_api_error(response)
                 self._log_response(url, "DELETE", response.status)
                 if model is None:
                     return None
-                data = await response.json()
+                data = await response.json(loads=self._json.loads)
                 return parse_obj_as(model, data)
 
 
@@ -165,8 +241,9 @@ class BasePermitApi:
         optional_headers = {}
         if self.config.proxy_facts_via_pdp and self.config.facts_sync_timeout:
             optional_headers["X-Wait-Timeout"] = str(self.config.facts_sync_timeout)
+        base_url, unix_socket_path = split_unix_socket_url(self.config.pdp) if use_pdp else (self.config.api_url, None)
         client_config = ClientConfig(
-            base_url=self.config.pdp if use_pdp else self.config.api_url,
+            base_url=base_url,
             headers={
                 "Content-Type": "application/json",
                 "Authorization": f"bearer {self.config.token}",
@@ -179,8 +256,81 @@ class BasePermitApi:
             client_config_dict,
             base_url=endpoint_url,
             timeout=self.config.api_timeout,
+            json_codec=get_json_codec(self.config.json_codec),
+            circuit_breaker=get_circuit_breaker(self.config, "pdp" if use_pdp else "api"),
+            retry_policy=get_retry_policy(self.config),
+            unix_socket_path=unix_socket_path,
+            httpx_sessions=(
+                get_httpx_session_pool(self.config) if self.config.http_transport.backend == "httpx" else None
+            ),
         )
 
+    @property
+    def _caches_decisions(self) -> bool:
+        """
+        Whether decisions (or authorized users) are cached, and must be invalidated by writes of facts.
+        """
+        return get_decision_cache(self.config).enabled or get_authorized_users_cache(self.config).enabled
+
+    async def _key_of(self, facts: str, ident: Optional[str]) -> Optional[str]:
+        """
+        Returns the key of a user or a tenant (facts is either 'users' or 'tenants') given by its id or its key,
+        as the cached decisions are partitioned by keys (None if it does not exist).
+        Only identifiers that look like ids are fetched, and only if decisions are cached.
+        """
+        if ident is None or not self._caches_decisions:
+            return ident
+        try:
+            UUID(ident)
+        except ValueError:
+            return ident
+        if self.config.proxy_facts_via_pdp:
+            client = self._build_http_client(f"/facts/{facts}", use_pdp=True)
+        else:
+            client = self._build_http_client(
+                f"/v2/facts/{self.config.api_context.project}/{self.config.api_context.environment}/{facts}"
+            )
+        try:
+            fact = await client.get(f"/{ident}", model=dict)
+        except PermitApiError as err:
+            if err.status_code == 404:
+                return None
+            raise
+        return fact["key"]
+
+    async def _invalidate_assignment_decisions(self, user: str, tenant: Optional[str]) -> None:
+        """
+        Evicts the cached decisions of a user within a tenant, each given by either its id or its key.
+        """
+        user_key, tenant_key = await asyncio.gather(self._key_of("users", user), self._key_of("tenants", tenant))
+        if user_key is not None:
+            self._invalidate_decisions(user=user_key, tenant=tenant_key)
+
+    def _invalidate_decisions(
+        self,
+        *,
+        user: Optional[str] = None,
+        resource: Optional[str] = None,
+        tenant: Optional[str] = None,
+    ) -> None:
+        """
+        Evicts the cached decisions (and authorized users) affected by a successful write of facts through the API.
+
+        Decisions that are being fetched from the PDP while the facts are written are not cached once fetched.
+        Note that unless the facts are written through the PDP (proxy_facts_via_pdp) and waited for
+        (facts_sync_timeout or Permit.wait_for_sync()), the PDP may still return (and so the cache may store)
+        decisions made with the previous facts, until the PDP is synced.
+
+        Args:
+            user: The key of the user whose facts changed.
+            resource: The resource instance ('type:key') whose facts changed, or the resource type
+                whose instances changed.
+            tenant: The key of the tenant in which the facts changed.
+        """
+        for cache in (get_decision_cache(self.config), get_authorized_users_cache(self.config)):
+            if cache.enabled:
+                cache.invalidate(user=user, resource=resource, tenant=tenant)
+
     async def _set_context_from_api_key(self) -> None:
         """
         Set the API context and permitted access level based on the API key scope.
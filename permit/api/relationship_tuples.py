@@ -1,3 +1,4 @@
+import asyncio
 from typing import List, Optional
 
 from ..utils.pydantic_version import PYDANTIC_VERSION
@@ -34,6 +35,12 @@ class RelationshipTuplesApi(BasePermitApi):
                 f"/v2/facts/{self.config.api_context.project}/{self.config.api_context.environment}/relationship_tuples"
             )
 
+    async def _invalidate_relationship_decisions(self, tenant: Optional[str] = None) -> None:
+        # relationships derive roles (and further relationships) transitively across the resource graph,
+        # so every decision in the tenant of the relationship may change (all decisions, if the tenant is unknown).
+        # the tenant may be given by its id, while the cached decisions are partitioned by tenant keys
+        self._invalidate_decisions(tenant=await self._key_of("tenants", tenant))
+
     @validate_arguments  # type: ignore[operator]
     async def list(
         self,
@@ -99,7 +106,9 @@ class RelationshipTuplesApi(BasePermitApi):
         """
         await self._ensure_access_level(ApiKeyAccessLevel.ENVIRONMENT_LEVEL_API_KEY)
         await self._ensure_context(ApiContextLevel.ENVIRONMENT)
-        return await self.__relationship_tuples.post("", model=RelationshipTupleRead, json=tuple_data)
+        relationship_tuple = await self.__relationship_tuples.post("", model=RelationshipTupleRead, json=tuple_data)
+        await self._invalidate_relationship_decisions(relationship_tuple.tenant)
+        return relationship_tuple
 
     @validate_arguments  # type: ignore[operator]
     async def delete(self, tuple_data: RelationshipTupleDelete) -> None:
@@ -115,7 +124,8 @@ class RelationshipTuplesApi(BasePermitApi):
         """
         await self._ensure_access_level(ApiKeyAccessLevel.ENVIRONMENT_LEVEL_API_KEY)
         await self._ensure_context(ApiContextLevel.ENVIRONMENT)
-        return await self.__relationship_tuples.delete("", json=tuple_data)
+        await self.__relationship_tuples.delete("", json=tuple_data)
+        await self._invalidate_relationship_decisions()
 
     @validate_arguments  # type: ignore[operator]
     async def bulk_create(self, tuples: List[RelationshipTupleCreate]) -> RelationshipTupleCreateBulkOperationResult:
@@ -144,11 +154,18 @@ class RelationshipTuplesApi(BasePermitApi):
         """
         await self._ensure_access_level(ApiKeyAccessLevel.ENVIRONMENT_LEVEL_API_KEY)
         await self._ensure_context(ApiContextLevel.ENVIRONMENT)
-        return await self.__relationship_tuples.post(
+        result = await self.__relationship_tuples.post(
             "/bulk",
             model=RelationshipTupleCreateBulkOperationResult,
             json=RelationshipTupleCreateBulkOperation(operations=tuples),
         )
+        await asyncio.gather(
+            *(
+                self._invalidate_relationship_decisions(tenant)
+                for tenant in {tuple_data.tenant for tuple_data in tuples}
+            )
+        )
+        return result
 
     @validate_arguments  # type: ignore[operator]
     async def bulk_delete(self, tuples: List[RelationshipTupleDelete]) -> RelationshipTupleDeleteBulkOperationResult:
@@ -173,8 +190,10 @@ class RelationshipTuplesApi(BasePermitApi):
         """
         await self._ensure_access_level(ApiKeyAccessLevel.ENVIRONMENT_LEVEL_API_KEY)
         await self._ensure_context(ApiContextLevel.ENVIRONMENT)
-        return await self.__relationship_tuples.delete(
+        result = await self.__relationship_tuples.delete(
             "/bulk",
             model=RelationshipTupleDeleteBulkOperationResult,
             json=RelationshipTupleDeleteBulkOperation(idents=tuples),
         )
+        await self._invalidate_relationship_decisions()
+        return result
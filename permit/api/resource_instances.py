@@ -1,3 +1,4 @@
+import asyncio
 from typing import List, Optional
 
 from ..utils.pydantic_version import PYDANTIC_VERSION
@@ -7,6 +8,8 @@ if PYDANTIC_VERSION < (2, 0):
 else:
     from pydantic.v1 import validate_arguments
 
+from ..enforcement.normalization import RESOURCE_DELIMITER
+from ..exceptions import PermitApiError
 from .base import (
     BasePermitApi,
     SimpleHttpClient,
@@ -88,6 +91,21 @@ class ResourceInstancesApi(BasePermitApi):
     async def _get(self, instance_key: str) -> ResourceInstanceRead:
         return await self.__resource_instances.get(f"/{instance_key}", model=ResourceInstanceRead)
 
+    async def _resource_of(self, instance_key: str) -> Optional[str]:
+        """
+        returns the resource instance ('type:key') an instance key or id refers to,
+        to know which cached decisions a write invalidates (None if the instance does not exist).
+        """
+        if RESOURCE_DELIMITER in instance_key or not self._caches_decisions:
+            return instance_key
+        try:
+            instance = await self._get(instance_key)
+        except PermitApiError as err:
+            if err.status_code == 404:
+                return None
+            raise
+        return f"{instance.resource}:{instance.key}"
+
     @validate_arguments  # type: ignore[operator]
     async def get(self, instance_key: str) -> ResourceInstanceRead:
         """
@@ -164,7 +182,9 @@ class ResourceInstancesApi(BasePermitApi):
         """
         await self._ensure_access_level(ApiKeyAccessLevel.ENVIRONMENT_LEVEL_API_KEY)
         await self._ensure_context(ApiContextLevel.ENVIRONMENT)
-        return await self.__resource_instances.post("", model=ResourceInstanceRead, json=instance_data)
+        instance = await self.__resource_instances.post("", model=ResourceInstanceRead, json=instance_data)
+        self._invalidate_decisions(resource=f"{instance_data.resource}:{instance_data.key}")
+        return instance
 
     @validate_arguments  # type: ignore[operator]
     async def update(self, instance_key: str, instance_data: ResourceInstanceUpdate) -> ResourceInstanceRead:
@@ -184,11 +204,13 @@ class ResourceInstancesApi(BasePermitApi):
         """
         await self._ensure_access_level(ApiKeyAccessLevel.ENVIRONMENT_LEVEL_API_KEY)
         await self._ensure_context(ApiContextLevel.ENVIRONMENT)
-        return await self.__resource_instances.patch(
+        instance = await self.__resource_instances.patch(
             f"/{instance_key}",
             model=ResourceInstanceRead,
             json=instance_data,
         )
+        self._invalidate_decisions(resource=f"{instance.resource}:{instance.key}")
+        return instance
 
     @validate_arguments  # type: ignore[operator]
     async def delete(self, instance_key: str) -> None:
@@ -207,7 +229,11 @@ class ResourceInstancesApi(BasePermitApi):
         """
         await self._ensure_access_level(ApiKeyAccessLevel.ENVIRONMENT_LEVEL_API_KEY)
         await self._ensure_context(ApiContextLevel.ENVIRONMENT)
-        return await self.__resource_instances.delete(f"/{instance_key}")
+        # the instance may be identified by its id, which must be resolved before it is deleted
+        resource = await self._resource_of(instance_key)
+        await self.__resource_instances.delete(f"/{instance_key}")
+        if resource is not None:
+            self._invalidate_decisions(resource=resource)
 
     @validate_arguments  # type: ignore[operator]
     async def bulk_replace(
@@ -231,11 +257,14 @@ class ResourceInstancesApi(BasePermitApi):
         """
         await self._ensure_access_level(ApiKeyAccessLevel.ENVIRONMENT_LEVEL_API_KEY)
         await self._ensure_context(ApiContextLevel.ENVIRONMENT)
-        return await self.__bulk_operations.put(
+        result = await self.__bulk_operations.put(
             "",
             model=ResourceInstanceCreateBulkOperationResult,
             json=ResourceInstanceCreateBulkOperation(operations=resource_instances),
         )
+        for instance in resource_instances:
+            self._invalidate_decisions(resource=f"{instance.resource}:{instance.key}")
+        return result
 
     @validate_arguments  # type: ignore[operator]
     async def bulk_delete(self, resource_instances: List[str]) -> ResourceInstanceDeleteBulkOperationResult:
@@ -255,8 +284,13 @@ class ResourceInstancesApi(BasePermitApi):
         """  # noqa: E501
         await self._ensure_access_level(ApiKeyAccessLevel.ENVIRONMENT_LEVEL_API_KEY)
         await self._ensure_context(ApiContextLevel.ENVIRONMENT)
-        return await self.__bulk_operations.delete(
+        resources = await asyncio.gather(*(self._resource_of(instance_key) for instance_key in resource_instances))
+        result = await self.__bulk_operations.delete(
             "",
             model=ResourceInstanceDeleteBulkOperationResult,
             json=ResourceInstanceDeleteBulkOperation(idents=resource_instances),
         )
+        for resource in resources:
+            if resource is not None:
+                self._invalidate_decisions(resource=resource)
+        return result
@@ -1,3 +1,4 @@
+import asyncio
 from typing import List, Optional, Union
 
 from ..utils.pydantic_version import PYDANTIC_VERSION
@@ -110,7 +111,10 @@ class RoleAssignmentsApi(BasePermitApi):
         """
         await self._ensure_access_level(ApiKeyAccessLevel.ENVIRONMENT_LEVEL_API_KEY)
         await self._ensure_context(ApiContextLevel.ENVIRONMENT)
-        return await self.__role_assignments.post("", model=RoleAssignmentRead, json=assignment)
+        role_assignment = await self.__role_assignments.post("", model=RoleAssignmentRead, json=assignment)
+        # the assignment may identify the user and the tenant by their ids, the created assignment has their keys
+        self._invalidate_decisions(user=role_assignment.user, tenant=role_assignment.tenant)
+        return role_assignment
 
     @validate_arguments  # type: ignore[operator]
     async def unassign(self, unassignment: RoleAssignmentRemove) -> None:
@@ -126,7 +130,8 @@ class RoleAssignmentsApi(BasePermitApi):
         """
         await self._ensure_access_level(ApiKeyAccessLevel.ENVIRONMENT_LEVEL_API_KEY)
         await self._ensure_context(ApiContextLevel.ENVIRONMENT)
-        return await self.__role_assignments.delete("", json=unassignment)
+        await self.__role_assignments.delete("", json=unassignment)
+        await self._invalidate_assignment_decisions(unassignment.user, unassignment.tenant)
 
     @validate_arguments  # type: ignore[operator]
     async def bulk_assign(self, assignments: List[RoleAssignmentCreate]) -> BulkRoleAssignmentReport:
@@ -146,11 +151,15 @@ class RoleAssignmentsApi(BasePermitApi):
         """
         await self._ensure_access_level(ApiKeyAccessLevel.ENVIRONMENT_LEVEL_API_KEY)
         await self._ensure_context(ApiContextLevel.ENVIRONMENT)
-        return await self.__role_assignments.post(
+        report = await self.__role_assignments.post(
             "/bulk",
             model=BulkRoleAssignmentReport,
             json=list(assignments),
         )
+        await asyncio.gather(
+            *(self._invalidate_assignment_decisions(assignment.user, assignment.tenant) for assignment in assignments)
+        )
+        return report
 
     @validate_arguments  # type: ignore[operator]
     async def bulk_unassign(self, unassignments: List[RoleAssignmentRemove]) -> BulkRoleUnAssignmentReport:
@@ -170,8 +179,15 @@ class RoleAssignmentsApi(BasePermitApi):
         """
         await self._ensure_access_level(ApiKeyAccessLevel.ENVIRONMENT_LEVEL_API_KEY)
         await self._ensure_context(ApiContextLevel.ENVIRONMENT)
-        return await self.__role_assignments.delete(
+        report = await self.__role_assignments.delete(
             "/bulk",
             model=BulkRoleUnAssignmentReport,
             json=list(unassignments),
         )
+        await asyncio.gather(
+            *(
+                self._invalidate_assignment_decisions(unassignment.user, unassignment.tenant)
+                for unassignment in unassignments
+            )
+        )
+        return report
@@ -188,7 +188,9 @@ class TenantsApi(BasePermitApi):
         """
         await self._ensure_access_level(ApiKeyAccessLevel.ENVIRONMENT_LEVEL_API_KEY)
         await self._ensure_context(ApiContextLevel.ENVIRONMENT)
-        return await self.__tenants.patch(f"/{tenant_key}", model=TenantRead, json=tenant_data)
+        tenant = await self.__tenants.patch(f"/{tenant_key}", model=TenantRead, json=tenant_data)
+        self._invalidate_decisions(tenant=tenant_key)
+        return tenant
 
     @validate_arguments  # type: ignore[operator]
     async def delete(self, tenant_key: str) -> None:
@@ -207,7 +209,8 @@ class TenantsApi(BasePermitApi):
         """
         await self._ensure_access_level(ApiKeyAccessLevel.ENVIRONMENT_LEVEL_API_KEY)
         await self._ensure_context(ApiContextLevel.ENVIRONMENT)
-        return await self.__tenants.delete(f"/{tenant_key}")
+        await self.__tenants.delete(f"/{tenant_key}")
+        self._invalidate_decisions(tenant=tenant_key)
 
     @validate_arguments  # type: ignore[operator]
     async def delete_tenant_user(self, tenant_key: str, user_key: str) -> None:
@@ -224,7 +227,8 @@ class TenantsApi(BasePermitApi):
         """
         await self._ensure_access_level(ApiKeyAccessLevel.ENVIRONMENT_LEVEL_API_KEY)
         await self._ensure_context(ApiContextLevel.ENVIRONMENT)
-        return await self.__tenants.delete(f"/{tenant_key}/users/{user_key}")
+        await self.__tenants.delete(f"/{tenant_key}/users/{user_key}")
+        self._invalidate_decisions(user=user_key, tenant=tenant_key)
 
     @validate_arguments  # type: ignore[operator]
     async def bulk_create(self, tenants: List[TenantCreate]) -> TenantCreateBulkOperationResult:
@@ -268,8 +272,11 @@ class TenantsApi(BasePermitApi):
         """
         await self._ensure_access_level(ApiKeyAccessLevel.ENVIRONMENT_LEVEL_API_KEY)
         await self._ensure_context(ApiContextLevel.ENVIRONMENT)
-        return await self.__bulk_operations.delete(
+        result = await self.__bulk_operations.delete(
             "",
             model=TenantDeleteBulkOperationResult,
             json=TenantDeleteBulkOperation(idents=tenants),
         )
+        for tenant in tenants:
+            self._invalidate_decisions(tenant=tenant)
+        return result
@@ -161,7 +161,9 @@ class UsersApi(BasePermitApi):
         """
         await self._ensure_access_level(ApiKeyAccessLevel.ENVIRONMENT_LEVEL_API_KEY)
         await self._ensure_context(ApiContextLevel.ENVIRONMENT)
-        return await self.__users.post("", model=UserRead, json=user_data)
+        user = await self.__users.post("", model=UserRead, json=user_data)
+        self._invalidate_decisions(user=user_data.key)
+        return user
 
     @validate_arguments  # type: ignore[operator]
     async def update(self, user_key: str, user_data: UserUpdate) -> UserRead:
@@ -181,7 +183,9 @@ class UsersApi(BasePermitApi):
         """
         await self._ensure_access_level(ApiKeyAccessLevel.ENVIRONMENT_LEVEL_API_KEY)
         await self._ensure_context(ApiContextLevel.ENVIRONMENT)
-        return await self.__users.patch(f"/{user_key}", model=UserRead, json=user_data)
+        user = await self.__users.patch(f"/{user_key}", model=UserRead, json=user_data)
+        self._invalidate_decisions(user=user_key)
+        return user
 
     @validate_arguments  # type: ignore[operator]
     async def sync(self, user: Union[UserCreate, dict]) -> UserRead:
@@ -206,7 +210,9 @@ class UsersApi(BasePermitApi):
                 raise KeyError("required 'key' in input dictionary")
         else:
             user_key = user.key
-        return await self.__users.put(f"/{user_key}", model=UserRead, json=user)
+        synced_user = await self.__users.put(f"/{user_key}", model=UserRead, json=user)
+        self._invalidate_decisions(user=user_key)
+        return synced_user
 
     @validate_arguments  # type: ignore[operator]
     async def delete(self, user_key: str) -> None:
@@ -222,7 +228,8 @@ class UsersApi(BasePermitApi):
         """
         await self._ensure_access_level(ApiKeyAccessLevel.ENVIRONMENT_LEVEL_API_KEY)
         await self._ensure_context(ApiContextLevel.ENVIRONMENT)
-        return await self.__users.delete(f"/{user_key}")
+        await self.__users.delete(f"/{user_key}")
+        self._invalidate_decisions(user=user_key)
 
     @validate_arguments  # type: ignore[operator]
     async def bulk_create(self, users: List[UserCreate]) -> UserCreateBulkOperationResult:
@@ -241,11 +248,14 @@ class UsersApi(BasePermitApi):
         """
         await self._ensure_access_level(ApiKeyAccessLevel.ENVIRONMENT_LEVEL_API_KEY)
         await self._ensure_context(ApiContextLevel.ENVIRONMENT)
-        return await self.__bulk_operations.post(
+        result = await self.__bulk_operations.post(
             "",
             model=UserCreateBulkOperationResult,
             json=UserCreateBulkOperation(operations=users),
         )
+        for user in users:
+            self._invalidate_decisions(user=user.key)
+        return result
 
     @validate_arguments  # type: ignore[operator]
     async def bulk_replace(self, users: List[UserCreate]) -> UserReplaceBulkOperationResult:
@@ -267,11 +277,14 @@ class UsersApi(BasePermitApi):
         """
         await self._ensure_access_level(ApiKeyAccessLevel.ENVIRONMENT_LEVEL_API_KEY)
         await self._ensure_context(ApiContextLevel.ENVIRONMENT)
-        return await self.__bulk_operations.put(
+        result = await self.__bulk_operations.put(
             "",
             model=UserReplaceBulkOperationResult,
             json=UserReplaceBulkOperation(operations=users),
         )
+        for user in users:
+            self._invalidate_decisions(user=user.key)
+        return result
 
     @validate_arguments  # type: ignore[operator]
     async def bulk_delete(self, users: List[str]) -> UserDeleteBulkOperationResult:
@@ -290,11 +303,14 @@ class UsersApi(BasePermitApi):
         """
         await self._ensure_access_level(ApiKeyAccessLevel.ENVIRONMENT_LEVEL_API_KEY)
         await self._ensure_context(ApiContextLevel.ENVIRONMENT)
-        return await self.__bulk_operations.delete(
+        result = await self.__bulk_operations.delete(
             "",
             model=UserDeleteBulkOperationResult,
             json=UserDeleteBulkOperation(idents=users),
         )
+        for user in users:
+            self._invalidate_decisions(user=user)
+        return result
 
     @validate_arguments  # type: ignore[operator]
     async def assign_role(self, assignment: RoleAssignmentCreate) -> RoleAssignmentRead:
@@ -313,11 +329,14 @@ class UsersApi(BasePermitApi):
         """
         await self._ensure_access_level(ApiKeyAccessLevel.ENVIRONMENT_LEVEL_API_KEY)
         await self._ensure_context(ApiContextLevel.ENVIRONMENT)
-        return await self.__users.post(
+        role_assignment = await self.__users.post(
             f"/{assignment.user}/roles",
             model=RoleAssignmentRead,
             json=assignment.dict(exclude={"user"}),
         )
+        # the assignment may identify the user and the tenant by their ids, the created assignment has their keys
+        self._invalidate_decisions(user=role_assignment.user, tenant=role_assignment.tenant)
+        return role_assignment
 
     @validate_arguments  # type: ignore[operator]
     async def unassign_role(self, unassignment: RoleAssignmentRemove) -> None:
@@ -333,10 +352,11 @@ class UsersApi(BasePermitApi):
         """
         await self._ensure_access_level(ApiKeyAccessLevel.ENVIRONMENT_LEVEL_API_KEY)
         await self._ensure_context(ApiContextLevel.ENVIRONMENT)
-        return await self.__users.delete(
+        await self.__users.delete(
             f"/{unassignment.user}/roles",
             json=unassignment.dict(exclude={"user"}),
         )
+        await self._invalidate_assignment_decisions(unassignment.user, unassignment.tenant)
 
     @validate_arguments  # type: ignore[operator]
     async def get_assigned_roles(
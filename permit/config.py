@@ -1,12 +1,15 @@
-from typing import Optional
+from typing import Any, List, Optional
+
+from typing_extensions import Literal
 
 from .api.context import ApiContext
+from .utils.json_codec import JsonCodecName
 from .utils.pydantic_version import PYDANTIC_VERSION
 
 if PYDANTIC_VERSION < (2, 0):
-    from pydantic import BaseModel, Field
+    from pydantic import BaseModel, Field, PrivateAttr
 else:
-    from pydantic.v1 import BaseModel, Field  # type: ignore
+    from pydantic.v1 import BaseModel, Field, PrivateAttr  # type: ignore
 
 
 class LoggerConfig(BaseModel):
@@ -35,6 +38,295 @@ class MultiTenancyConfig(BaseModel):
     )
 
 
+class PdpConnectionConfig(BaseModel):
+    limit: int = Field(
+        default=100,
+        description="The total number of simultaneous connections the SDK keeps open to the PDP (0 means unlimited).",
+    )
+    limit_per_host: int = Field(
+        default=0,
+        description="The number of simultaneous connections to a single PDP host (0 means unlimited).",
+    )
+    keepalive_timeout: float = Field(
+        default=15,
+        description="The amount of time in seconds an idle PDP connection is kept alive for reuse.",
+    )
+    use_dns_cache: bool = Field(
+        default=True,
+        description="Whether or not to cache the DNS resolution of the PDP host.",
+    )
+    ttl_dns_cache: Optional[int] = Field(
+        default=10,
+        description="The amount of time in seconds a cached DNS resolution is valid (None means forever).",
+    )
+
+
+class HttpTransportConfig(BaseModel):
+    backend: Literal["aiohttp", "httpx"] = Field(
+        default="aiohttp",
+        description="The http library used to send the requests to the PDP and the Permit REST API. "
+        "'httpx' keeps long-lived (http/2) connections that concurrent requests share.",
+    )
+    http2: bool = Field(
+        default=True,
+        description="Whether or not the httpx backend uses http/2, so concurrent requests are multiplexed over "
+        "a single connection (requires the 'h2' package, i.e: pip install permit[http2]).",
+    )
+
+
+class PdpLoadBalancingConfig(BaseModel):
+    endpoints: List[str] = Field(
+        default_factory=list,
+        description="The urls of the PDP instances (replicas / sidecars) the authorization queries "
+        "are balanced across. if not set, all the queries are sent to the 'pdp' url.",
+    )
+    strategy: Literal["least_outstanding", "power_of_two"] = Field(
+        default="least_outstanding",
+        description="How the PDP instance of each query is picked: the instance with the least outstanding queries, "
+        "or the less loaded of two random instances ('power of two choices').",
+    )
+    failure_threshold: int = Field(
+        default=3,
+        description="The number of consecutive failed queries after which a PDP instance is ejected from the rotation.",
+    )
+    probe_interval: float = Field(
+        default=5,
+        description="The interval in seconds between the health probes of an ejected PDP instance, "
+        "it is re-admitted to the rotation once a probe succeeds.",
+    )
+    probe_path: str = Field(default="/healthy", description="The path of the PDP health endpoint that is probed.")
+
+
+class CheckHedgingConfig(BaseModel):
+    enable: bool = Field(
+        default=False,
+        description="Whether or not a permit.check() query that is slow to answer should be sent again "
+        "(to another PDP instance, if load balancing is configured), using whichever answer comes first.",
+    )
+    percentile: float = Field(
+        default=95,
+        description="The percentile of the recently observed check latencies after which a query is hedged.",
+    )
+    initial_delay: float = Field(
+        default=0.05,
+        description="The time in seconds after which a query is hedged, until enough latencies were observed.",
+    )
+    min_delay: float = Field(
+        default=0.005,
+        description="The minimum time in seconds after which a query is hedged.",
+    )
+    max_hedge_ratio: float = Field(
+        default=0.05,
+        description="The maximum ratio of queries that are hedged (i.e: 0.05 means at most 5% extra queries).",
+    )
+    window: int = Field(
+        default=1000,
+        description="The number of recent check latencies the hedging percentile is computed from.",
+    )
+
+
+class PdpConcurrencyLimitConfig(BaseModel):
+    enable: bool = Field(
+        default=False,
+        description="Whether or not the number of concurrent requests to the PDP is limited, "
+        "the limit adapts to the observed latency of the PDP (requests beyond the limit wait in a queue).",
+    )
+    initial_limit: int = Field(default=20, description="The concurrency limit until the PDP latency is observed.")
+    min_limit: int = Field(default=1, description="The minimum concurrency limit.")
+    max_limit: int = Field(default=200, description="The maximum concurrency limit.")
+    latency_tolerance: float = Field(
+        default=2.0,
+        description="The ratio between a request latency and the baseline (no load) latency of the PDP "
+        "above which the PDP is considered overloaded, and the limit is decreased.",
+    )
+    backoff_ratio: float = Field(
+        default=0.9,
+        description="The ratio the limit is multiplied by when the PDP is overloaded (or failing).",
+    )
+    max_queue_size: Optional[int] = Field(
+        default=None,
+        description="The maximum number of requests waiting for the limit, beyond which requests fail immediately "
+        "with PermitLoadSheddingError (load shedding). None means requests always wait.",
+    )
+
+
+class RetryConfig(BaseModel):
+    enable: bool = Field(
+        default=False,
+        description="Whether or not idempotent requests (permit.check(), the PDP and REST API reads) "
+        "that failed transiently are retried.",
+    )
+    max_retries: int = Field(default=2, description="The maximum number of retries of a request.")
+    initial_backoff: float = Field(
+        default=0.05,
+        description="The backoff in seconds before the first retry, it doubles with every retry "
+        "(a random delay up to the backoff is waited, to spread the retries).",
+    )
+    max_backoff: float = Field(default=2, description="The maximum backoff in seconds between retries.")
+    retry_status_codes: List[int] = Field(
+        default_factory=lambda: [429, 502, 503, 504],
+        description="The http status codes that are retried (connection errors are always retried).",
+    )
+    max_retry_after: float = Field(
+        default=10,
+        description="The maximum delay in seconds requested by a Retry-After header that is waited before retrying, "
+        "if the server asks to wait longer the error is raised.",
+    )
+    budget_ratio: float = Field(
+        default=0.1,
+        description="The maximum ratio of retries out of all the requests (i.e: 0.1 means at most 10% extra requests), "
+        "so retries cannot amplify an outage.",
+    )
+    min_retries_per_second: float = Field(
+        default=10,
+        description="The number of retries per second allowed regardless of the budget ratio (for low traffic).",
+    )
+
+
+class CircuitBreakerConfig(BaseModel):
+    enable: bool = Field(
+        default=False,
+        description="Whether or not requests to a failing PDP (or Permit REST API) should fail fast "
+        "instead of waiting for it to time out.",
+    )
+    failure_rate_threshold: float = Field(
+        default=0.5,
+        description="The ratio of failed requests (out of the recent window) at which the circuit opens.",
+    )
+    window_size: int = Field(
+        default=20,
+        description="The number of recent requests the failure rate is computed from.",
+    )
+    minimum_calls: int = Field(
+        default=10,
+        description="The minimum number of recent requests before the failure rate can open the circuit.",
+    )
+    open_duration: float = Field(
+        default=30,
+        description="The time in seconds the circuit stays open (failing fast) before trial requests are let through.",
+    )
+    half_open_max_calls: int = Field(
+        default=1,
+        description="The number of trial requests that must succeed to close the circuit again.",
+    )
+
+
+class DecisionCacheConfig(BaseModel):
+    enable: bool = Field(
+        default=False,
+        description=(
+            "Whether or not to cache the decisions returned by the PDP in memory. "
+            "The cached decisions are invalidated by writes of facts through the SDK, but the PDP only reflects "
+            "the writes once synced: to avoid caching stale decisions right after a write, write the facts through "
+            "the PDP (proxy_facts_via_pdp) and wait for them to sync (facts_sync_timeout)."
+        ),
+    )
+    allow_ttl: float = Field(
+        default=10,
+        description="The amount of time in seconds an 'allow' decision is served from the cache.",
+    )
+    deny_ttl: float = Field(
+        default=5,
+        description="The amount of time in seconds a 'deny' decision is served from the cache.",
+    )
+    max_entries: int = Field(
+        default=10_000,
+        description="The maximum number of decisions kept in the cache, least recently used ones are evicted first.",
+    )
+    max_bytes: Optional[int] = Field(
+        default=None,
+        description="An (approximate) upper bound of the memory in bytes used by the cached decisions.",
+    )
+
+
+class AuthorizedUsersCacheConfig(BaseModel):
+    enable: bool = Field(
+        default=False,
+        description="Whether or not to cache the results of permit.authorized_users() in memory.",
+    )
+    ttl: float = Field(
+        default=10,
+        description="The amount of time in seconds a result is served from the cache.",
+    )
+    max_entries: int = Field(
+        default=1000,
+        description="The maximum number of results kept in the cache, least recently used ones are evicted first.",
+    )
+    max_bytes: Optional[int] = Field(
+        default=None,
+        description="An (approximate) upper bound of the memory in bytes used by the cached results.",
+    )
+
+
+class DegradedModeConfig(BaseModel):
+    enable: bool = Field(
+        default=False,
+        description="Whether or not permit.check() should keep answering when the PDP is slow or unreachable, "
+        "by serving cached decisions and falling back to the configured policy.",
+    )
+    stale_while_revalidate: float = Field(
+        default=0,
+        description="The amount of time in seconds after a cached decision expires during which it is still served, "
+        "while being revalidated against the PDP in the background (requires the decision cache).",
+    )
+    unreachable_deadline: float = Field(
+        default=10,
+        description="The amount of time in seconds the PDP must be failing continuously before the fallback policy "
+        "is applied, until then the errors are raised.",
+    )
+    fallback: Literal["fail_closed", "fail_open", "stale"] = Field(
+        default="fail_closed",
+        description="The decision returned once the PDP is unreachable past the deadline: 'fail_closed' denies, "
+        "'fail_open' allows the fail_open_actions, and 'stale' serves the last known decision (up to max_stale "
+        "seconds after it expired, otherwise denies).",
+    )
+    fail_open_actions: Optional[List[str]] = Field(
+        default=None,
+        description="The actions allowed by the 'fail_open' fallback, other actions are denied. "
+        "if not set, all the actions are allowed.",
+    )
+    max_stale: float = Field(
+        default=300,
+        description="The maximum amount of time in seconds after a cached decision expired "
+        "in which it can be served by the 'stale' fallback.",
+    )
+
+
+class CheckBatchingConfig(BaseModel):
+    enable: bool = Field(
+        default=False,
+        description="Whether or not concurrent permit.check() queries should be sent to the PDP together "
+        "in a single bulk request.",
+    )
+    max_delay: float = Field(
+        default=0.002,
+        description="The maximum amount of time in seconds a query waits for other queries to join its batch.",
+    )
+    max_batch_size: int = Field(
+        default=100,
+        description="The maximum number of queries sent in a single batch, a full batch is sent right away.",
+    )
+
+
+class BulkCheckConfig(BaseModel):
+    chunk_size: int = Field(
+        default=1000,
+        description="The maximum number of queries sent to the PDP in a single permit.bulk_check() request, "
+        "larger lists are split into chunks.",
+    )
+    max_concurrency: int = Field(
+        default=4,
+        description="The maximum number of chunks of a single permit.bulk_check() call "
+        "(or queries of a single permit.bulk_authorized_users() call) sent to the PDP in parallel.",
+    )
+    chunk_retries: Optional[int] = Field(
+        default=None,
+        description="The number of times a chunk that failed transiently is retried before permit.bulk_check() "
+        "fails, if retries are enabled by the retry config (with its backoff and budget). "
+        "Defaults to the max_retries of the retry config.",
+    )
+
+
 class PermitConfig(BaseModel):
     token: str = Field(
         default=...,
@@ -42,7 +334,8 @@ class PermitConfig(BaseModel):
     )
     pdp: str = Field(
         default="http://localhost:7766",
-        description="Configures the Policy Decision Point (PDP) url.",
+        description="Configures the Policy Decision Point (PDP) url. "
+        "a PDP on the same host can be queried over a unix domain socket, i.e: 'unix:///var/run/pdp.sock'.",
     )
     api_url: str = Field(default="https://api.permit.io", description="The url of Permit REST API")
     log: LoggerConfig = Field(LoggerConfig(), description="the logger configuration used by the SDK")
@@ -59,6 +352,72 @@ class PermitConfig(BaseModel):
         default=None,
         description="The timeout in seconds for requests to the PDP.",
     )
+    http_transport: HttpTransportConfig = Field(
+        HttpTransportConfig(),
+        description="configuration of the http library used to send the requests to the PDP and the Permit REST API",
+    )
+    pdp_connection: PdpConnectionConfig = Field(
+        PdpConnectionConfig(),
+        description="configuration of the connection pool used to send authorization queries to the PDP",
+    )
+    pdp_load_balancing: PdpLoadBalancingConfig = Field(
+        PdpLoadBalancingConfig(),
+        description="configuration of the client side load balancing of the authorization queries "
+        "across multiple PDP instances",
+    )
+    pdp_concurrency_limit: PdpConcurrencyLimitConfig = Field(
+        PdpConcurrencyLimitConfig(),
+        description="configuration of the adaptive limit of the concurrent requests to the PDP",
+    )
+    decision_cache: DecisionCacheConfig = Field(
+        DecisionCacheConfig(),
+        description="configuration of the in-process cache of permit.check() decisions",
+    )
+    authorized_users_cache: AuthorizedUsersCacheConfig = Field(
+        AuthorizedUsersCacheConfig(),
+        description="configuration of the in-process cache of permit.authorized_users() results",
+    )
+    resource_actions_ttl: float = Field(
+        default=300,
+        description="The amount of time in seconds the actions defined on a resource type are cached, "
+        "once fetched from the Permit REST API by permit.allowed_actions() (when called without actions).",
+    )
+    retry: RetryConfig = Field(
+        RetryConfig(),
+        description="configuration of the retries of idempotent requests to the PDP and the Permit REST API",
+    )
+    circuit_breaker: CircuitBreakerConfig = Field(
+        CircuitBreakerConfig(),
+        description="configuration of the circuit breakers of the requests to the PDP and the Permit REST API",
+    )
+    degraded_mode: DegradedModeConfig = Field(
+        DegradedModeConfig(),
+        description="configuration of the decisions returned by permit.check() when the PDP is slow or unreachable",
+    )
+    coalesce_checks: bool = Field(
+        default=False,
+        description="Whether or not concurrent identical permit.check() queries should share a single request "
+        "to the PDP instead of each sending its own (queries are identical if they serialize to the same json "
+        "and are retried the same number of times). The callers of a shared request get its decision, "
+        "or its error, even if they asked for it after the request was sent.",
+    )
+    check_hedging: CheckHedgingConfig = Field(
+        CheckHedgingConfig(),
+        description="configuration of the hedging of slow permit.check() queries",
+    )
+    bulk_check: BulkCheckConfig = Field(
+        BulkCheckConfig(),
+        description="configuration of the chunking of large permit.bulk_check() queries",
+    )
+    check_batching: CheckBatchingConfig = Field(
+        CheckBatchingConfig(),
+        description="configuration of the micro-batching of concurrent permit.check() queries",
+    )
+    json_codec: JsonCodecName = Field(
+        default="json",
+        description="The json library used to encode and decode the payloads sent to the PDP and the Permit REST API. "
+        "one of 'json' (standard library), 'orjson', 'msgspec' or 'auto' (the fastest installed library).",
+    )
     proxy_facts_via_pdp: bool = Field(
         default=False,
         description="Create facts via the PDP API instead of using the default Permit REST API.",
@@ -68,6 +427,17 @@ class PermitConfig(BaseModel):
         description="The amount of time in seconds to wait for facts to be available "
         "in the PDP cache before returning the response.",
     )
+    # the decision cache shared by the enforcer and the apis built with this config (see get_decision_cache())
+    _decision_cache: Any = PrivateAttr(default=None)
+    # the authorized users cache shared by the enforcer and the apis built with this config
+    # (see get_authorized_users_cache())
+    _authorized_users_cache: Any = PrivateAttr(default=None)
+    # the circuit breakers shared by the apis built with this config, by server (see get_circuit_breaker())
+    _circuit_breakers: Any = PrivateAttr(default_factory=dict)
+    # the retry policy (and budget) shared by the apis built with this config (see get_retry_policy())
+    _retry_policy: Any = PrivateAttr(default=None)
+    # the httpx sessions shared by the apis built with this config (see get_httpx_session_pool())
+    _httpx_sessions: Any = PrivateAttr(default=None)
 
     class Config:
         arbitrary_types_allowed = True
@@ -0,0 +1,117 @@
+import random
+import threading
+import time
+from typing import Collection, List, Optional
+
+from loguru import logger
+
+from ..config import PdpLoadBalancingConfig
+
+
+class PdpEndpoint:
+    __slots__ = ("consecutive_failures", "ejected_at", "outstanding", "probing", "url")
+
+    def __init__(self, url: str):
+        self.url = url
+        # the number of requests currently in flight to the endpoint
+        self.outstanding = 0
+        self.consecutive_failures = 0
+        # the time the endpoint was taken out of rotation (None while it is healthy)
+        self.ejected_at: Optional[float] = None
+        self.probing = False
+
+    @property
+    def healthy(self) -> bool:
+        return self.ejected_at is None
+
+
+class PdpEndpointPool:
+    """
+    Balances the queries to the PDP across a pool of PDP endpoints (replicas / sidecars).
+
+    Endpoints that fail consecutively are ejected from the rotation (passive failure detection),
+    and are re-admitted once an active health probe succeeds (see due_for_probe()).
+    """
+
+    def __init__(self, urls: List[str], config: PdpLoadBalancingConfig):
+        if not urls:
+            raise ValueError("at least one PDP endpoint is required")
+        self._config = config
+        self._endpoints = [PdpEndpoint(url) for url in urls]
+        self._lock = threading.Lock()
+
+    @property
+    def endpoints(self) -> List[PdpEndpoint]:
+        return list(self._endpoints)
+
+    def acquire(self, exclude: Collection[str] = ()) -> PdpEndpoint:
+        """
+        picks the endpoint the next query is sent to, release() must be called once the query is done.
+        endpoints whose url is excluded are only picked if there is no other endpoint.
+        """
+        with self._lock:
+            candidates = [
+                endpoint for endpoint in self._endpoints if endpoint.healthy and endpoint.url not in exclude
+            ] or [endpoint for endpoint in self._endpoints if endpoint.healthy]
+            if not candidates:
+                # no healthy endpoint is left, keep spreading the queries rather than failing them all
+                candidates = [
+                    endpoint for endpoint in self._endpoints if endpoint.url not in exclude
+                ] or self._endpoints
+            if len(candidates) == 1:
+                endpoint = candidates[0]
+            elif self._config.strategy == "power_of_two":
+                first, second = random.sample(candidates, 2)
+                endpoint = first if first.outstanding <= second.outstanding else second
+            else:
+                least_outstanding = min(endpoint.outstanding for endpoint in candidates)
+                endpoint = random.choice([c for c in candidates if c.outstanding == least_outstanding])
+            endpoint.outstanding += 1
+            return endpoint
+
+    def release(self, endpoint: PdpEndpoint, *, failed: bool) -> None:
+        with self._lock:
+            endpoint.outstanding -= 1
+            if not failed:
+                endpoint.consecutive_failures = 0
+                return
+            endpoint.consecutive_failures += 1
+            if (
+                endpoint.healthy
+                and len(self._endpoints) > 1
+                and endpoint.consecutive_failures >= self._config.failure_threshold
+            ):
+                endpoint.ejected_at = time.monotonic()
+                logger.warning(
+                    f"PDP endpoint {endpoint.url} failed {endpoint.consecutive_failures} consecutive queries, "
+                    f"ejecting it from the rotation"
+                )
+
+    def due_for_probe(self) -> List[PdpEndpoint]:
+        """
+        returns the ejected endpoints that should be health-probed now (and marks them as being probed),
+        the result of each probe must be reported with report_probe().
+        """
+        now = time.monotonic()
+        with self._lock:
+            due = [
+                endpoint
+                for endpoint in self._endpoints
+                if endpoint.ejected_at is not None
+                and not endpoint.probing
+                and now - endpoint.ejected_at >= self._config.probe_interval
+            ]
+            for endpoint in due:
+                endpoint.probing = True
+            return due
+
+    def report_probe(self, endpoint: PdpEndpoint, *, healthy: bool) -> None:
+        with self._lock:
+            endpoint.probing = False
+            if healthy:
+                endpoint.ejected_at = None
+                endpoint.consecutive_failures = 0
+                logger.info(f"PDP endpoint {endpoint.url} is healthy again, re-admitting it to the rotation")
+            else:
+                # probe again after another interval
+                endpoint.ejected_at = time.monotonic()
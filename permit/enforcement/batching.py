@@ -0,0 +1,81 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, List, Optional, Set, Tuple, TypeVar
+
+from loguru import logger
+
+from ..exceptions import PermitConnectionError
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class _Batch(Generic[T, R]):
+    __slots__ = ("flush_handle", "items")
+
+    def __init__(self):
+        self.items: List[Tuple[T, "asyncio.Future[R]"]] = []
+        self.flush_handle: Optional[asyncio.TimerHandle] = None
+
+
+class MicroBatcher(Generic[T, R]):
+    """
+    Collects items submitted by concurrent callers for a short window (or until the batch is full)
+    and sends them together, resolving each caller with its own result.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[List[T]], Awaitable[List[R]]],
+        *,
+        max_delay: float,
+        max_batch_size: int,
+    ):
+        self._send = send
+        self._max_delay = max_delay
+        self._max_batch_size = max_batch_size
+        # pending batches are kept per event loop (i.e: sync clients used from multiple threads)
+        self._pending: Dict[asyncio.AbstractEventLoop, _Batch[T, R]] = {}
+        self._sending: "Set[asyncio.Task[None]]" = set()
+
+    async def submit(self, item: T) -> R:
+        loop = asyncio.get_running_loop()
+        batch = self._pending.get(loop)
+        if batch is None:
+            batch = self._pending[loop] = _Batch()
+            batch.flush_handle = loop.call_later(self._max_delay, self._flush, loop, batch)
+        future: "asyncio.Future[R]" = loop.create_future()
+        batch.items.append((item, future))
+        if len(batch.items) >= self._max_batch_size:
+            self._flush(loop, batch)
+        return await future
+
+    def _flush(self, loop: asyncio.AbstractEventLoop, batch: _Batch[T, R]) -> None:
+        if self._pending.get(loop) is batch:
+            del self._pending[loop]
+        if batch.flush_handle is not None:
+            batch.flush_handle.cancel()
+        task = loop.create_task(self._send_batch(batch.items))
+        # keeps a reference to the task until it is done, so it is not garbage collected
+        self._sending.add(task)
+        task.add_done_callback(self._sending.discard)
+
+    async def _send_batch(self, items: List[Tuple[T, "asyncio.Future[R]"]]) -> None:
+        # callers that were cancelled while waiting are not sent
+        items = [(item, future) for item, future in items if not future.done()]
+        if not items:
+            return
+        logger.debug("sending a batch of {} queries", len(items))
+        try:
+            results = await self._send([item for item, _ in items])
+            if len(results) != len(items):
+                raise PermitConnectionError(
+                    f"Permit SDK got {len(results)} results for a batch of {len(items)} queries from the PDP"
+                )
+        except Exception as err:  # noqa: BLE001
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(err)
+            return
+        for (_, future), result in zip(items, results):
+            if not future.done():
+                future.set_result(result)
@@ -0,0 +1,471 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Generic, Hashable, List, Optional, Set, Tuple, TypeVar, Union
+
+from ..config import AuthorizedUsersCacheConfig, DecisionCacheConfig, PermitConfig
+from ..utils.pydantic_version import PYDANTIC_VERSION
+from .interfaces import AuthorizedUserAssignment, AuthorizedUsersResult
+from .normalization import RESOURCE_DELIMITER
+
+if PYDANTIC_VERSION < (2, 0):
+    from pydantic import BaseModel, Field
+else:
+    from pydantic.v1 import BaseModel, Field  # type: ignore
+
+# (user key, action, resource type, resource key, tenant, digest of the full query)
+CacheKey = Tuple[str, str, str, Optional[str], Optional[str], bytes]
+# (action, resource type, resource key, tenant, digest of the full query)
+AuthorizedUsersCacheKey = Tuple[str, str, Optional[str], Optional[str], bytes]
+
+# rough per-entry bookkeeping cost (ordered dict node, key tuple, entry object, index sets)
+ENTRY_OVERHEAD_BYTES = 400
+# rough cost of an authorized user assignment (pydantic model, its strings and the index entries)
+ASSIGNMENT_OVERHEAD_BYTES = 600
+
+
+class CacheStats(BaseModel):
+    hits: int = Field(..., description="The number of entries served from the cache")
+    misses: int = Field(..., description="The number of lookups that were not found in the cache (or expired)")
+    stale_hits: int = Field(
+        ..., description="The number of expired entries served (while revalidating, or while the PDP is unreachable)"
+    )
+    evictions: int = Field(..., description="The number of entries evicted to keep the cache within its bounds")
+    invalidations: int = Field(..., description="The number of entries removed by invalidate()")
+    entries: int = Field(..., description="The number of entries currently in the cache")
+    bytes: int = Field(..., description="The approximate memory in bytes used by the cached entries")
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+DecisionCacheStats = CacheStats
+
+
+V = TypeVar("V")
+K = TypeVar("K", bound=Hashable)
+
+
+class _CacheEntry(Generic[V]):
+    __slots__ = ("expires_at", "partitions", "size", "value")
+
+    def __init__(self, *, value: V, expires_at: float, size: int, partitions: Dict[str, str]):
+        self.value = value
+        self.expires_at = expires_at
+        self.size = size
+        # the partitions (i.e: user, resource, tenant) the entry belongs to, by which it can be invalidated
+        self.partitions = partitions
+
+
+class PartitionedCache(Generic[K, V]):
+    """
+    An in-process LRU cache whose entries expire after a ttl, and are partitioned by user,
+    resource type, resource and tenant so they can be selectively invalidated when the underlying facts change.
+    """
+
+    def __init__(self, *, max_entries: int, max_bytes: Optional[int] = None, stale_ttl: float = 0):
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        # expired entries are kept for stale_ttl more seconds, so they can be served by get_stale()
+        self._stale_ttl = stale_ttl
+        self._entries: "OrderedDict[K, _CacheEntry[V]]" = OrderedDict()
+        # partition name -> partition -> the keys of the entries in the partition
+        self._indexes: Dict[str, Dict[str, Set[K]]] = {}
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._stale_hits = 0
+        self._evictions = 0
+        self._invalidations = 0
+        # incremented by every invalidation, so values fetched before an invalidation are not stored after it
+        self._generation = 0
+
+    @property
+    def stats(self) -> CacheStats:
+        """
+        A snapshot of the cache counters, useful to tune the cache ttl and size bounds.
+        """
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                stale_hits=self._stale_hits,
+                evictions=self._evictions,
+                invalidations=self._invalidations,
+                entries=len(self._entries),
+                bytes=self._bytes,
+            )
+
+    @property
+    def generation(self) -> int:
+        """
+        The number of invalidations of the cache so far: read it before fetching a value to cache,
+        and pass it to set(), so the value is dropped if the cache was invalidated while it was fetched.
+        """
+        return self._generation
+
+    def _get(self, key: K) -> Optional[V]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            now = time.monotonic()
+            if entry.expires_at <= now:
+                if entry.expires_at + self._stale_ttl <= now:
+                    self._remove(key)
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry.value
+
+    def _get_stale(self, key: K, max_staleness: float) -> Optional[V]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at + min(max_staleness, self._stale_ttl) <= time.monotonic():
+                return None
+            self._entries.move_to_end(key)
+            self._stale_hits += 1
+            return entry.value
+
+    def _set(
+        self,
+        key: K,
+        value: V,
+        *,
+        ttl: float,
+        size: int,
+        partitions: Dict[str, str],
+        generation: Optional[int] = None,
+    ) -> None:
+        if ttl <= 0:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                # the value was fetched before an invalidation, and may not reflect the change of facts
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _CacheEntry(
+                value=value, expires_at=time.monotonic() + ttl, size=size, partitions=partitions
+            )
+            self._bytes += size
+            for name, partition in partitions.items():
+                self._indexes.setdefault(name, {}).setdefault(partition, set()).add(key)
+            self._evict()
+
+    def invalidate(
+        self,
+        user: Optional[Union[str, dict]] = None,
+        resource: Optional[Union[str, dict]] = None,
+        tenant: Optional[str] = None,
+    ) -> int:
+        """
+        Removes cached entries that may have changed due to a change in the facts (users, roles, resources).
+
+        Only entries matching all the given filters are removed, calling it without filters clears the cache.
+
+        Args:
+            user: The user (key or user object) whose entries should be removed.
+            resource: The resource ('type', 'type:key' or resource object) whose entries should be removed.
+                if only the type is given, the entries of all the resources of that type are removed.
+            tenant: The tenant key whose entries should be removed.
+
+        Returns:
+            the number of removed entries.
+
+        Examples:
+
+            # user roles changed
+            permit.cache.invalidate(user='auth0|elon')
+
+            # a document was updated
+            permit.cache.invalidate(resource='document:1234')
+
+            # user roles changed, but only in the 'tesla' tenant
+            permit.cache.invalidate(user='auth0|elon', tenant='tesla')
+        """
+        user_key = None if user is None else (user if isinstance(user, str) else user["key"])
+        resource_type, resource_key = None, None
+        if isinstance(resource, str):
+            resource_type, _, resource_key = resource.partition(RESOURCE_DELIMITER)
+        elif resource is not None:
+            resource_type, resource_key = resource["type"], resource.get("key")
+            tenant = tenant if tenant is not None else resource.get("tenant")
+
+        filters = {}
+        if user_key is not None:
+            filters["user"] = user_key
+        if resource_type is not None:
+            if resource_key:
+                filters["resource"] = self._resource_id(resource_type, resource_key)
+            else:
+                filters["resource_type"] = resource_type
+        if tenant is not None:
+            filters["tenant"] = tenant
+        return self._invalidate(self._invalidation_filters(filters))
+
+    def _invalidation_filters(self, filters: Dict[str, str]) -> Dict[str, str]:
+        """
+        returns the partitions whose (common) entries are affected by a change in the given partitions
+        """
+        return filters
+
+    def _invalidate(self, filters: Dict[str, str]) -> int:
+        with self._lock:
+            self._generation += 1
+            if not filters:
+                removed = len(self._entries)
+                self._clear()
+            else:
+                partitions = [self._indexes.get(name, {}).get(partition, set()) for name, partition in filters.items()]
+                smallest, *others = sorted(partitions, key=len)
+                keys = [key for key in smallest if all(key in other for other in others)]
+                for key in keys:
+                    self._remove(key)
+                removed = len(keys)
+            self._invalidations += removed
+            return removed
+
+    def clear(self) -> None:
+        """
+        Removes all the cached entries.
+        """
+        with self._lock:
+            self._generation += 1
+            self._clear()
+
+    @staticmethod
+    def _resource_id(resource_type: str, resource_key: str) -> str:
+        return f"{resource_type}{RESOURCE_DELIMITER}{resource_key}"
+
+    def _clear(self) -> None:
+        self._entries.clear()
+        self._indexes.clear()
+        self._bytes = 0
+
+    def _evict(self) -> None:
+        while self._entries and (
+            len(self._entries) > self._max_entries or (self._max_bytes is not None and self._bytes > self._max_bytes)
+        ):
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self._evictions += 1
+
+    def _remove(self, key: K) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+        for name, partition in entry.partitions.items():
+            index = self._indexes.get(name, {})
+            keys = index.get(partition)
+            if keys is None:
+                continue
+            keys.discard(key)
+            if not keys:
+                del index[partition]
+
+
+class DecisionCache(PartitionedCache[CacheKey, bool]):
+    """
+    An in-process LRU cache of authorization decisions.
+
+    Decisions are keyed on the normalized query (user, action, resource and the derived context),
+    expire after a ttl that depends on the decision (allow / deny), and are partitioned by user,
+    resource and tenant so they can be selectively invalidated when the underlying facts change.
+    """
+
+    def __init__(self, config: DecisionCacheConfig, stale_ttl: float = 0):
+        super().__init__(max_entries=config.max_entries, max_bytes=config.max_bytes, stale_ttl=stale_ttl)
+        self._config = config
+
+    @property
+    def enabled(self) -> bool:
+        return self._config.enable
+
+    @staticmethod
+    def key_for(query: dict) -> CacheKey:
+        """
+        builds the cache key of a normalized PDP query (the body sent to /allowed)
+        """
+        resource = query["resource"]
+        return (
+            query["user"]["key"],
+            query["action"],
+            resource["type"],
+            resource.get("key"),
+            resource.get("tenant"),
+            _digest(query),
+        )
+
+    def get(self, key: CacheKey) -> Optional[bool]:
+        """
+        returns the cached decision, or None if the query is not cached (or its decision expired)
+        """
+        return self._get(key)
+
+    def get_stale(self, key: CacheKey, max_staleness: float) -> Optional[bool]:
+        """
+        returns the cached decision even if it expired, as long as it expired less than max_staleness seconds ago
+        (and within the stale ttl of the cache), or None otherwise.
+        """
+        return self._get_stale(key, max_staleness)
+
+    def set(self, key: CacheKey, *, decision: bool, generation: Optional[int] = None) -> None:
+        """
+        caches the decision, unless the cache was invalidated since the given generation (see generation)
+        """
+        user, _, resource_type, resource_key, tenant, _ = key
+        self._set(
+            key,
+            decision,
+            ttl=self._config.allow_ttl if decision else self._config.deny_ttl,
+            size=ENTRY_OVERHEAD_BYTES + sum(len(part) for part in key if part is not None),
+            partitions=self._partitions(user, resource_type, resource_key, tenant),
+            generation=generation,
+        )
+
+    @classmethod
+    def _partitions(
+        cls, user: Optional[str], resource_type: str, resource_key: Optional[str], tenant: Optional[str]
+    ) -> Dict[str, str]:
+        partitions = {"resource_type": resource_type}
+        if user is not None:
+            partitions["user"] = user
+        if resource_key is not None:
+            partitions["resource"] = cls._resource_id(resource_type, resource_key)
+        if tenant is not None:
+            partitions["tenant"] = tenant
+        return partitions
+
+
+class AuthorizedUsers:
+    """
+    A cached permit.authorized_users() result, indexed by user and role.
+    """
+
+    __slots__ = ("_roles", "result")
+
+    def __init__(self, result: AuthorizedUsersResult):
+        self.result = result
+        # user key -> role key -> the assignments of the role that authorize the user
+        self._roles: Dict[str, Dict[str, List[AuthorizedUserAssignment]]] = {}
+        for user, assignments in result.users.items():
+            roles = self._roles[user] = {}
+            for assignment in assignments:
+                roles.setdefault(assignment.role, []).append(assignment)
+
+    def is_authorized(self, user: str) -> bool:
+        return user in self._roles
+
+    def roles(self, user: str) -> List[str]:
+        """
+        returns the keys of the roles that authorize the user (empty if the user is not authorized)
+        """
+        return list(self._roles.get(user, ()))
+
+    def assignments(self, user: str, role: Optional[str] = None) -> List[AuthorizedUserAssignment]:
+        """
+        returns the assignments that authorize the user (only those of the given role, if given)
+        """
+        roles = self._roles.get(user, {})
+        if role is not None:
+            return list(roles.get(role, ()))
+        return [assignment for assignments in roles.values() for assignment in assignments]
+
+
+class AuthorizedUsersCache(PartitionedCache[AuthorizedUsersCacheKey, AuthorizedUsers]):
+    """
+    An in-process LRU cache of permit.authorized_users() results, keyed on the normalized query
+    (action, resource and the derived context), and indexed by user so the lookups of a user
+    in a cached result are constant time.
+    """
+
+    def __init__(self, config: AuthorizedUsersCacheConfig):
+        super().__init__(max_entries=config.max_entries, max_bytes=config.max_bytes)
+        self._config = config
+
+    @property
+    def enabled(self) -> bool:
+        return self._config.enable
+
+    @staticmethod
+    def key_for(query: dict) -> AuthorizedUsersCacheKey:
+        """
+        builds the cache key of a normalized PDP query (the body sent to /authorized_users)
+        """
+        resource = query["resource"]
+        return query["action"], resource["type"], resource.get("key"), resource.get("tenant"), _digest(query)
+
+    def get(self, key: AuthorizedUsersCacheKey) -> Optional[AuthorizedUsers]:
+        """
+        returns the cached result, or None if the query is not cached (or its result expired)
+        """
+        return self._get(key)
+
+    def set(
+        self, key: AuthorizedUsersCacheKey, result: AuthorizedUsersResult, generation: Optional[int] = None
+    ) -> AuthorizedUsers:
+        """
+        caches the result (unless the cache was invalidated since the given generation), and returns it indexed
+        """
+        _, resource_type, resource_key, tenant, _ = key
+        authorized_users = AuthorizedUsers(result)
+        self._set(
+            key,
+            authorized_users,
+            ttl=self._config.ttl,
+            size=ENTRY_OVERHEAD_BYTES
+            + sum(
+                len(user) + ASSIGNMENT_OVERHEAD_BYTES * len(assignments) for user, assignments in result.users.items()
+            ),
+            partitions=DecisionCache._partitions(None, resource_type, resource_key, tenant),
+            generation=generation,
+        )
+        return authorized_users
+
+    def _invalidation_filters(self, filters: Dict[str, str]) -> Dict[str, str]:
+        # a change of the roles of a user may add the user to any result (of the same tenant / resource),
+        # not only to the results the user is already in
+        return {name: partition for name, partition in filters.items() if name != "user"}
+
+
+def _digest(query: dict) -> bytes:
+    return hashlib.blake2b(
+        json.dumps(query, sort_keys=True, separators=(",", ":"), default=str).encode(),
+        digest_size=16,
+    ).digest()
+
+
+def get_decision_cache(config: PermitConfig) -> DecisionCache:
+    """
+    returns the decision cache shared by the SDK clients built with the given config,
+    so that the facts written through the api invalidate the decisions cached by the enforcer.
+    """
+    if config._decision_cache is None:
+        degraded_mode = config.degraded_mode
+        stale_ttl = 0.0
+        if degraded_mode.enable:
+            stale_ttl = max(
+                degraded_mode.stale_while_revalidate,
+                degraded_mode.max_stale if degraded_mode.fallback == "stale" else 0,
+            )
+        config._decision_cache = DecisionCache(config.decision_cache, stale_ttl=stale_ttl)
+    return config._decision_cache
+
+
+def get_authorized_users_cache(config: PermitConfig) -> AuthorizedUsersCache:
+    """
+    returns the authorized users cache shared by the SDK clients built with the given config,
+    so that the facts written through the api invalidate the results cached by the enforcer.
+    """
+    if config._authorized_users_cache is None:
+        config._authorized_users_cache = AuthorizedUsersCache(config.authorized_users_cache)
+    return config._authorized_users_cache
@@ -0,0 +1,40 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[K, T]):
+    """
+    Deduplicates concurrent calls: while a call for a key is in flight, other callers
+    asking for the same key wait for its result (or exception) instead of making their own call.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[K, "asyncio.Task[T]"] = {}
+
+    def __len__(self) -> int:
+        return len(self._in_flight)
+
+    async def run(self, key: K, call: Callable[[], Awaitable[T]]) -> T:
+        loop = asyncio.get_running_loop()
+        task = self._in_flight.get(key)
+        # tasks cannot be shared across event loops (i.e: sync clients used from multiple threads)
+        if task is None or task.get_loop() is not loop:
+            task = loop.create_task(self._call(call))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        # a cancelled waiter must not cancel the call other waiters are sharing
+        return await asyncio.shield(task)
+
+    @staticmethod
+    async def _call(call: Callable[[], Awaitable[T]]) -> T:
+        return await call()
+
+    def _forget(self, key: K, task: "asyncio.Task[T]") -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            # marks the exception as retrieved, even if all the waiters were cancelled
+            task.exception()
@@ -1,17 +1,61 @@
-import json
+import asyncio
+import time
+from contextlib import AsyncExitStack, asynccontextmanager
 from pprint import pformat
-from typing import List, Optional, TypedDict, Union
+from typing import (
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypedDict,
+    TypeVar,
+    Union,
+)
 
 import aiohttp
+import httpx
 from aiohttp import ClientTimeout
 from loguru import logger
-from pydantic import parse_obj_as
 
 from ..config import PermitConfig
-from ..exceptions import PermitConnectionError
+from ..exceptions import PermitConnectionError, PermitLoadSheddingError
+from ..utils.circuit_breaker import get_circuit_breaker, is_server_failure
 from ..utils.context import Context, ContextStore
+from ..utils.httpx_transport import HttpxSession
+from ..utils.iterables import achunked
+from ..utils.json_codec import get_json_codec
+from ..utils.json_stream import JsonStreamReader
+from ..utils.retry import get_retry_policy, parse_retry_after
 from ..utils.sync import SyncClass
-from .interfaces import AuthorizedUsersResult, ResourceInput, UserInput
+from ..utils.unix_socket import split_unix_socket_url
+from .balancing import PdpEndpoint, PdpEndpointPool
+from .batching import MicroBatcher
+from .cache import (
+    AuthorizedUsers,
+    AuthorizedUsersCache,
+    AuthorizedUsersCacheKey,
+    CacheKey,
+    DecisionCache,
+    get_authorized_users_cache,
+    get_decision_cache,
+)
+from .coalescing import SingleFlight
+from .hedging import Hedger
+from .interfaces import AuthorizedUserAssignment, AuthorizedUserRole, AuthorizedUsersResult
+from .limiter import ConcurrencyLimiter
+from .normalization import (
+    RESOURCE_DELIMITER,  # noqa: F401
+    Resource,
+    User,
+    normalize_resource,
+    normalize_user,
+    resource_repr,
+)
 
 
 def set_if_not_none(d: dict, k: str, v):
@@ -19,11 +63,7 @@ def set_if_not_none(d: dict, k: str, v):
         d[k] = v
 
 
-RESOURCE_DELIMITER = ":"
-
-User = Union[dict, str]
 Action = str
-Resource = Union[dict, str]
 
 
 class CheckQuery(TypedDict):
@@ -32,20 +72,62 @@ class CheckQuery(TypedDict):
     resource: Resource
 
 
+AuthorizedUsersQuery = Tuple[Action, Resource]
+
+T = TypeVar("T")
+
+
 SETUP_PDP_DOCS_LINK = (
     "https://docs.permit.io/sdk/python/quickstart-python/#2-setup-your-pdp-policy-decision-point-container"
 )
+# the size of the chunks in which streamed authorized users responses are read (and parsed)
+AUTHORIZED_USERS_STREAM_CHUNK_SIZE = 64 * 1024
 
 
 class Enforcer:
+    # whether the http session (and its connection pool) to the PDP is kept open between queries
+    _reuse_session: bool = True
+    # whether background tasks (revalidation of stale decisions, PDP health probes) can outlive the calls starting them
+    _run_background_tasks: bool = True
+
     def __init__(self, config: PermitConfig):
         self._config = config
         self._context_store = ContextStore()
+        self._decision_cache = get_decision_cache(self._config)
+        self._authorized_users_cache = get_authorized_users_cache(self._config)
+        self._in_flight_checks: SingleFlight[Tuple[bytes, Optional[int]], bool] = SingleFlight()
+        self._check_batcher: Optional[MicroBatcher[dict, bool]] = None
+        if self._config.check_batching.enable:
+            self._check_batcher = MicroBatcher(
+                self._bulk_check,
+                max_delay=self._config.check_batching.max_delay,
+                max_batch_size=self._config.check_batching.max_batch_size,
+            )
+        self._check_hedger: Optional[Hedger[bool]] = None
+        if self._config.check_hedging.enable:
+            self._check_hedger = Hedger(self._config.check_hedging)
         self._headers = {
             "Content-Type": "application/json",
             "Authorization": f"bearer {self._config.token}",
         }
-        self._base_url = self._config.pdp
+        pdp_urls = self._config.pdp_load_balancing.endpoints or [self._config.pdp]
+        base_urls, socket_paths = zip(*(split_unix_socket_url(url) for url in pdp_urls))
+        # a co-located PDP (sidecar) can be queried over a unix domain socket, skipping the TCP stack
+        self._unix_socket_path: Optional[str] = socket_paths[0]
+        if len(pdp_urls) > 1 and any(socket_paths):
+            raise ValueError("a PDP listening on a unix domain socket cannot be load balanced with other PDP endpoints")
+        self._endpoints = PdpEndpointPool(list(base_urls), self._config.pdp_load_balancing)
+        self._health_probes: Set["asyncio.Task[None]"] = set()
+        self._circuit_breaker = get_circuit_breaker(self._config, "pdp")
+        self._concurrency_limiter = ConcurrencyLimiter(self._config.pdp_concurrency_limit)
+        self._retry_policy = get_retry_policy(self._config)
+        self._json = get_json_codec(self._config.json_codec)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+        # the time since which the queries to the PDP are failing (None while the PDP is reachable)
+        self._pdp_failing_since: Optional[float] = None
+        self._falling_back = False
+        self._revalidations: Dict[CacheKey, "asyncio.Task[bool]"] = {}
 
     @property
     def context_store(self):
@@ -55,6 +137,27 @@ class Enforcer:
         """
         return self._context_store
 
+    @property
+    def decision_cache(self) -> DecisionCache:
+        """
+        the in-process cache of check() decisions (only used when enabled in the config)
+        """
+        return self._decision_cache
+
+    @property
+    def authorized_users_cache(self) -> AuthorizedUsersCache:
+        """
+        the in-process cache of authorized_users() results (only used when enabled in the config)
+        """
+        return self._authorized_users_cache
+
+    @property
+    def concurrency_limiter(self) -> ConcurrencyLimiter:
+        """
+        the adaptive limit of the concurrent requests to the PDP (only used when enabled in the config)
+        """
+        return self._concurrency_limiter
+
     @property
     def _timeout_config(self):
         timeout_config = {}
@@ -62,6 +165,157 @@ class Enforcer:
             timeout_config["timeout"] = ClientTimeout(total=self._config.pdp_timeout)
         return timeout_config
 
+    def _create_session(self) -> aiohttp.ClientSession:
+        connection_config = self._config.pdp_connection
+        if self._config.http_transport.backend == "httpx":
+            return HttpxSession(
+                headers=self._headers,
+                unix_socket_path=self._unix_socket_path,
+                http2=self._config.http_transport.http2,
+                limits=httpx.Limits(
+                    max_connections=connection_config.limit or None,
+                    max_keepalive_connections=connection_config.limit or None,
+                    keepalive_expiry=connection_config.keepalive_timeout,
+                ),
+                **self._timeout_config,
+            ).as_aiohttp_session()
+        connector: aiohttp.BaseConnector
+        if self._unix_socket_path is not None:
+            connector = aiohttp.UnixConnector(
+                path=self._unix_socket_path,
+                limit=connection_config.limit,
+                limit_per_host=connection_config.limit_per_host,
+                keepalive_timeout=connection_config.keepalive_timeout,
+            )
+        else:
+            connector = aiohttp.TCPConnector(
+                limit=connection_config.limit,
+                limit_per_host=connection_config.limit_per_host,
+                keepalive_timeout=connection_config.keepalive_timeout,
+                use_dns_cache=connection_config.use_dns_cache,
+                ttl_dns_cache=connection_config.ttl_dns_cache,
+            )
+        return aiohttp.ClientSession(headers=self._headers, connector=connector, **self._timeout_config)
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """
+        returns the long-lived PDP session, creating it lazily on first use.
+        a session is bound to the event loop it was created in, so if the running loop
+        changed since (or the session was closed) a new session replaces the stale one.
+        """
+        loop = asyncio.get_running_loop()
+        stale_session, stale_loop = None, None
+        if self._session is not None and (self._session.closed or self._session_loop is not loop):
+            stale_session, stale_loop = self._session, self._session_loop
+            self._session, self._session_loop = None, None
+        if self._session is None:
+            self._session = self._create_session()
+            self._session_loop = loop
+        session = self._session
+        if stale_session is not None and stale_loop is not None:
+            await self._close_session(stale_session, stale_loop)
+        return session
+
+    @staticmethod
+    async def _close_session(session: aiohttp.ClientSession, loop: asyncio.AbstractEventLoop) -> None:
+        if session.closed:
+            return
+        if loop is asyncio.get_running_loop() or loop.is_closed():
+            # connections of a closed loop died together with it, closing only releases the session
+            await session.close()
+        else:
+            # the session belongs to a loop that is still alive (i.e: in another thread)
+            asyncio.run_coroutine_threadsafe(session.close(), loop)
+
+    @asynccontextmanager
+    async def _pdp_session(
+        self, session: Optional[aiohttp.ClientSession] = None
+    ) -> AsyncIterator[aiohttp.ClientSession]:
+        """
+        yields the session the requests to the PDP are sent with (the given session, if any)
+        """
+        if session is not None:
+            yield session
+            return
+        if not self._reuse_session:
+            async with self._create_session() as session:
+                yield session
+            return
+        yield await self._get_session()
+
+    @asynccontextmanager
+    async def _pdp_endpoint(
+        self, used_endpoints: Optional[List[str]] = None, kind: str = "check"
+    ) -> AsyncIterator[str]:
+        """
+        picks the PDP endpoint a query is sent to, once the query fits within the concurrency limit of the PDP
+        (and unless the circuit to the PDP is open), and tracks the outcome of the query for the endpoint health,
+        the circuit breaker and the concurrency limit (that compares its latency to queries of the same kind).
+        if given, endpoints in used_endpoints are avoided, and the picked endpoint is added to it.
+        """
+        await self._probe_ejected_endpoints()
+        # the circuit breaker is entered within the concurrency limit, so queries that wait for (or are shed by)
+        # the limit neither hold a trial of the half open circuit nor count as its outcomes
+        async with self._concurrency_limiter.acquire(kind), self._circuit_breaker.guard(), self._acquire_endpoint(
+            used_endpoints
+        ) as base_url:
+            yield base_url
+
+    @asynccontextmanager
+    async def _acquire_endpoint(self, used_endpoints: Optional[List[str]]) -> AsyncIterator[str]:
+        if used_endpoints is None:
+            endpoint = self._endpoints.acquire()
+        else:
+            endpoint = self._endpoints.acquire(exclude=used_endpoints)
+            used_endpoints.append(endpoint.url)
+        failed = True
+        try:
+            yield endpoint.url
+            failed = False
+        except asyncio.CancelledError:
+            # the query was abandoned by the caller, not failed by the endpoint
+            failed = False
+            raise
+        except BaseException as err:
+            # the PDP answering with a client error (i.e: invalid query) is not a failure of the endpoint
+            failed = is_server_failure(err)
+            raise
+        finally:
+            self._endpoints.release(endpoint, failed=failed)
+
+    async def _probe_ejected_endpoints(self) -> None:
+        for endpoint in self._endpoints.due_for_probe():
+            if self._run_background_tasks:
+                probe = asyncio.ensure_future(self._probe_endpoint(endpoint))
+                self._health_probes.add(probe)
+                probe.add_done_callback(self._health_probes.discard)
+            else:
+                await self._probe_endpoint(endpoint)
+
+    async def _probe_endpoint(self, endpoint: PdpEndpoint) -> None:
+        healthy = False
+        try:
+            async with self._pdp_session() as session, session.get(
+                f"{endpoint.url}{self._config.pdp_load_balancing.probe_path}"
+            ) as response:
+                healthy = response.status == 200
+        except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+            logger.debug("health probe of PDP endpoint {} failed: {}", endpoint.url, err)
+        finally:
+            self._endpoints.report_probe(endpoint, healthy=healthy)
+
+    async def aclose(self) -> None:
+        """
+        Closes the connection pool to the PDP.
+        The enforcer can still be used afterwards, a new connection pool will be opened on the next query.
+        """
+        for task in [*self._revalidations.values(), *self._health_probes]:
+            task.cancel()
+        session, session_loop = self._session, self._session_loop
+        self._session, self._session_loop = None, None
+        if session is not None and session_loop is not None:
+            await self._close_session(session, session_loop)
+
     async def authorized_users(
         self,
         action: Action,
@@ -94,76 +348,274 @@ class Enforcer:
             # (in a multi tenant application)
             await permit.authorized_users('close', {'type': 'issue', 'tenant': 't1'})
         """  # noqa: E501
-        context = context or {}
+        authorized_users = await self._get_authorized_users(action, resource, context)
+        return authorized_users.result
 
-        normalized_resource: ResourceInput = self._normalize_resource(
-            self._resource_from_string(resource) if isinstance(resource, str) else ResourceInput(**resource)
-        )
-        query_context = self._context_store.get_derived_context(context)
-        input = {
+    async def authorized_user_assignments(
+        self,
+        user: User,
+        action: Action,
+        resource: Resource,
+        context: Optional[Context] = None,
+    ) -> List[AuthorizedUserAssignment]:
+        """
+        Queries the role assignments that authorize a user to perform an action on a resource,
+        out of the (cached, if enabled) result of authorized_users().
+
+        Args:
+            user: The user key or user object.
+            action: The action to be performed on the resource.
+            resource: The resource object representing the resource.
+            context: The context object representing the context in which the action is performed. Defaults to None.
+
+        Returns:
+            The role assignments that authorize the user, or an empty list if the user is not authorized.
+
+        Raises:
+            PermitConnectionError: If an error occurs while sending the authorization request to the PDP.
+
+        Examples:
+
+            # which roles allow elon to close the issue 1234?
+            assignments = await permit.authorized_user_assignments('auth0|elon', 'close', 'issue:1234')
+            print([assignment.role for assignment in assignments])
+        """
+        authorized_users = await self._get_authorized_users(action, resource, context)
+        return authorized_users.assignments(normalize_user(user)["key"])
+
+    async def bulk_authorized_users(
+        self,
+        queries: Iterable[AuthorizedUsersQuery],
+        context: Optional[Context] = None,
+        *,
+        max_concurrency: Optional[int] = None,
+    ) -> Dict[Tuple[Action, str], AuthorizedUsersResult]:
+        """
+        Queries the users that are authorized to perform each of several actions on each of several resources.
+
+        Identical queries are only sent once, and the queries are sent in parallel (with bounded concurrency)
+        over the pooled connections to the PDP.
+
+        Args:
+            queries: The (action, resource) pairs to query.
+            context: The context object representing the context in which the actions are performed. Defaults to None.
+            max_concurrency: The maximum number of queries sent to the PDP in parallel.
+                Defaults to the bulk_check.max_concurrency config.
+
+        Returns:
+            The result of each query, keyed by (action, resource). string resources are kept as given,
+            resource objects are keyed by their normalized 'type:key, tenant: tenant' representation.
+
+        Raises:
+            PermitConnectionError: If an error occurs while sending the authorization requests to the PDP.
+
+        Examples:
+
+            results = await permit.bulk_authorized_users([('read', 'issue:1'), ('read', 'issue:2'), ('close', 'issue:1')])
+            readers_of_first_issue = results[('read', 'issue:1')].users
+        """  # noqa: E501
+        query_context = self._context_store.get_derived_context(context or {})
+        inputs: Dict[AuthorizedUsersCacheKey, dict] = {}
+        query_keys: Dict[Tuple[Action, str], AuthorizedUsersCacheKey] = {}
+        for action, resource in queries:
+            input = self._build_authorized_users_query(action, resource, query_context)
+            query_key = AuthorizedUsersCache.key_for(input)
+            # identical queries (i.e: a resource given both as a string and as an object) are sent once
+            inputs.setdefault(query_key, input)
+            query_keys[(action, resource if isinstance(resource, str) else resource_repr(input["resource"]))] = (
+                query_key
+            )
+
+        semaphore = asyncio.Semaphore(max(max_concurrency or self._config.bulk_check.max_concurrency, 1))
+        async with self._pdp_session() as session:
+
+            async def query(input: dict) -> AuthorizedUsers:
+                async with semaphore:
+                    return await self._query_authorized_users(input, session)
+
+            tasks = {query_key: asyncio.ensure_future(query(input)) for query_key, input in inputs.items()}
+            try:
+                await asyncio.gather(*tasks.values())
+            except BaseException:
+                for task in tasks.values():
+                    task.cancel()
+                raise
+        return {key: tasks[query_key].result().result for key, query_key in query_keys.items()}
+
+    async def _get_authorized_users(
+        self, action: Action, resource: Resource, context: Optional[Context] = None
+    ) -> AuthorizedUsers:
+        query_context = self._context_store.get_derived_context(context or {})
+        return await self._query_authorized_users(self._build_authorized_users_query(action, resource, query_context))
+
+    def _build_authorized_users_query(self, action: Action, resource: Resource, query_context: Context) -> dict:
+        return {
             "action": action,
-            "resource": normalized_resource.dict(exclude_unset=True),
+            "resource": normalize_resource(resource, self._config.multi_tenancy),
             "context": query_context,
         }
 
-        async with aiohttp.ClientSession(headers=self._headers, **self._timeout_config) as session:
-            check_url = f"{self._base_url}/authorized_users"
+    async def _query_authorized_users(
+        self, input: dict, session: Optional[aiohttp.ClientSession] = None
+    ) -> AuthorizedUsers:
+        if not self._authorized_users_cache.enabled:
+            return AuthorizedUsers(await self._fetch_authorized_users(input, session))
+        query_key = AuthorizedUsersCache.key_for(input)
+        cached_result = self._authorized_users_cache.get(query_key)
+        if cached_result is not None:
+            return cached_result
+        generation = self._authorized_users_cache.generation
+        result = await self._fetch_authorized_users(input, session)
+        return self._authorized_users_cache.set(query_key, result, generation)
+
+    async def _fetch_authorized_users(
+        self, input: dict, session: Optional[aiohttp.ClientSession] = None
+    ) -> AuthorizedUsersResult:
+        async with self._pdp_session(session) as session, self._pdp_endpoint(kind="authorized_users") as base_url:
             try:
                 async with session.post(
-                    check_url,
-                    data=json.dumps(input),
+                    f"{base_url}/authorized_users",
+                    data=self._json.dumps_bytes(input),
                 ) as response:
                     if response.status != 200:
-                        if response.status == 501:
-                            raise PermitConnectionError(
-                                f"Permit SDK got an error: {response.status}, and cannot connect to the PDP container."
-                                f"\nPlease ensure you are not using ABAC/ReBAC policies,"
-                                f"as the cloud PDP is not compatible with these kinds of policies.\n"
-                                f"Also, please check your configuration and "
-                                f"make sure it's running at {self._base_url} and accepting requests.\n"
-                                f"Read more about setting up the PDP at {SETUP_PDP_DOCS_LINK}"
-                            )
+                        raise await self._authorized_users_error(response, base_url, input)
 
-                        error_json: dict = await response.json()
-                        logger.error(
-                            "error in permit.authorized_users({}, {}):\n{}\n{}".format(
-                                action,
-                                self._resource_repr(normalized_resource),
-                                f"status code: {response.status}",
-                                repr(error_json),
-                            )
-                        )
-                        raise PermitConnectionError(
-                            f"Permit SDK got unexpected status code: {response.status}, "
-                            f"please check your Permit SDK class init and PDP container are configured correctly. \n"
-                            f"Read more about setting up the PDP at {SETUP_PDP_DOCS_LINK}"
-                        )
-
-                    content: dict = await response.json()
-                    logger.debug(
-                        f"permit.authorized_users() response:"
-                        f"\ninput: {pformat(input, indent=2)}"
-                        f"\nresponse status: {response.status}"
-                        f"\nresponse data: {pformat(content, indent=2)}"
+                    content: dict = await response.json(loads=self._json.loads)
+                    # lazy logging: the payloads are only formatted if debug logs are enabled
+                    logger.opt(lazy=True).debug(
+                        "permit.authorized_users() response:\ninput: {}\nresponse status: {}\nresponse data: {}",
+                        lambda: pformat(input, indent=2),
+                        lambda: response.status,
+                        lambda: pformat(content, indent=2),
                     )
-                    result: AuthorizedUsersResult = parse_obj_as(AuthorizedUsersResult, content)
+                    result: AuthorizedUsersResult = AuthorizedUsersResult.parse_obj(content)
                     return result
             except aiohttp.ClientError as err:
+                raise self._authorized_users_connection_error(err, base_url, input) from err
+
+    async def authorized_users_stream(
+        self,
+        action: Action,
+        resource: Resource,
+        context: Optional[Context] = None,
+    ) -> AsyncIterator[Tuple[str, List[AuthorizedUserRole]]]:
+        """
+        Queries all the users that are authorized to perform an action on a resource within the specified context,
+        and yields them one by one while the response of the PDP is still being received.
+
+        Unlike authorized_users(), the response is parsed incrementally into compact (non pydantic) objects,
+        so the memory used does not grow with the number of authorized users.
+        The results are not cached, and the query is not retried once users were yielded.
+
+        Args:
+            action: The action to be performed on the resource.
+            resource: The resource object representing the resource.
+            context: The context object representing the context in which the action is performed. Defaults to None.
+
+        Yields:
+            tuple[str, list[AuthorizedUserRole]]: the key of an authorized user,
+                and the role assignments that grant the user the permission.
+
+        Raises:
+            PermitConnectionError: If an error occurs while sending the authorization request to the PDP,
+                or if its response is not a valid authorized users result.
+
+        Examples:
+
+            # notify everyone in the organization that can read the announcement
+            async for user_key, assignments in permit.authorized_users_stream('read', 'announcement:1234'):
+                await notify(user_key)
+        """
+        query_context = self._context_store.get_derived_context(context or {})
+        input = self._build_authorized_users_query(action, resource, query_context)
+        async with self._pdp_session() as session, AsyncExitStack() as response_scope:
+            async with self._pdp_endpoint(kind="authorized_users") as base_url:
+                try:
+                    response = await response_scope.enter_async_context(
+                        session.post(f"{base_url}/authorized_users", data=self._json.dumps_bytes(input))
+                    )
+                    if response.status != 200:
+                        raise await self._authorized_users_error(response, base_url, input)
+                except aiohttp.ClientError as err:
+                    raise self._authorized_users_connection_error(err, base_url, input) from err
+            # the PDP answered: the concurrency limit slot, the endpoint and the circuit breaker are released
+            # before the body is streamed, as its pace depends on the caller consuming the users, not on the PDP
+            try:
+                reader = JsonStreamReader(response.content.iter_chunked(AUTHORIZED_USERS_STREAM_CHUNK_SIZE))
+                async for key in reader.members():
+                    if key != "users":
+                        await reader.value()
+                        continue
+                    async for user_key in reader.members():
+                        assignments = await reader.value()
+                        yield (
+                            user_key,
+                            [
+                                AuthorizedUserRole(assignment["tenant"], assignment["resource"], assignment["role"])
+                                for assignment in assignments
+                            ],
+                        )
+            except aiohttp.ClientError as err:
+                raise self._authorized_users_connection_error(err, base_url, input) from err
+            except (ValueError, TypeError, KeyError) as err:
                 logger.error(
-                    f"error in permit.authorized_users({action}, {self._resource_repr(normalized_resource)}):\n{err}"
+                    f"invalid response to permit.authorized_users({action}, {resource_repr(input['resource'])}):\n{err}"
                 )
                 raise PermitConnectionError(
-                    f"Permit SDK got error: {err}, and cannot connect to the PDP container.\n"
-                    f"Please check your configuration and make sure it's running at "
-                    f"{self._base_url} and accepting requests.\n "
-                    f"Read more about setting up the PDP at {SETUP_PDP_DOCS_LINK}",
-                    error=err,
+                    f"Permit SDK got an invalid authorized users response from the PDP: {err}"
                 ) from err
 
+    async def _authorized_users_error(
+        self, response: aiohttp.ClientResponse, base_url: str, input: dict
+    ) -> PermitConnectionError:
+        if response.status == 501:
+            return PermitConnectionError(
+                f"Permit SDK got an error: {response.status}, and cannot connect to the PDP container."
+                f"\nPlease ensure you are not using ABAC/ReBAC policies,"
+                f"as the cloud PDP is not compatible with these kinds of policies.\n"
+                f"Also, please check your configuration and "
+                f"make sure it's running at {base_url} and accepting requests.\n"
+                f"Read more about setting up the PDP at {SETUP_PDP_DOCS_LINK}",
+                status_code=response.status,
+                retry_after=parse_retry_after(response.headers),
+            )
+
+        error_json: dict = await response.json(loads=self._json.loads)
+        logger.error(
+            "error in permit.authorized_users({}, {}):\n{}\n{}".format(
+                input["action"],
+                resource_repr(input["resource"]),
+                f"status code: {response.status}",
+                repr(error_json),
+            )
+        )
+        return PermitConnectionError(
+            f"Permit SDK got unexpected status code: {response.status}, "
+            f"please check your Permit SDK class init and PDP container are configured correctly. \n"
+            f"Read more about setting up the PDP at {SETUP_PDP_DOCS_LINK}",
+            status_code=response.status,
+            retry_after=parse_retry_after(response.headers),
+        )
+
+    @staticmethod
+    def _authorized_users_connection_error(
+        err: aiohttp.ClientError, base_url: str, input: dict
+    ) -> PermitConnectionError:
+        logger.error(f"error in permit.authorized_users({input['action']}, {resource_repr(input['resource'])}):\n{err}")
+        return PermitConnectionError(
+            f"Permit SDK got error: {err}, and cannot connect to the PDP container.\n"
+            f"Please check your configuration and make sure it's running at "
+            f"{base_url} and accepting requests.\n "
+            f"Read more about setting up the PDP at {SETUP_PDP_DOCS_LINK}",
+            error=err,
+        )
+
     async def bulk_check(
         self,
         checks: List[CheckQuery],
         context: Optional[Context] = None,
+        *,
+        retries: Optional[int] = None,
     ) -> List[bool]:
         """
         Checks if a user is authorized to perform an action on a resource within the specified context.
@@ -171,6 +623,8 @@ class Enforcer:
         Args:
             checks: A list of CheckQuery objects representing the authorization queries to be performed.
             context: The context object representing the context in which the action is performed. Defaults to None.
+            retries: The number of times a chunk of queries that failed transiently is retried,
+                overrides the bulk_check.chunk_retries config for this call.
 
         Returns:
             list[bool]: A list of booleans indicating whether the user is authorized for each resource.
@@ -200,35 +654,322 @@ class Enforcer:
             ])
         """
         context = context or {}
-        input = []
-        for check in checks:
-            normalized_user: UserInput = (
-                UserInput(key=check["user"]) if isinstance(check["user"], str) else UserInput(**check["user"])
-            )
-            normalized_resource: ResourceInput = self._normalize_resource(
-                self._resource_from_string(check["resource"])
-                if isinstance(check["resource"], str)
-                else ResourceInput(**check["resource"])
-            )
-            query_context = self._context_store.get_derived_context(context)
-            input.append(
-                {
-                    "user": normalized_user.dict(exclude_unset=True),
-                    "action": check["action"],
-                    "resource": normalized_resource.dict(exclude_unset=True),
-                    "context": query_context,
-                }
+        # all the queries share the same context, so it is derived only once
+        query_context = self._context_store.get_derived_context(context)
+        input = [self._build_bulk_query(check, query_context) for check in checks]
+        return await self._chunked_bulk_check(input, retries)
+
+    async def bulk_check_stream(
+        self,
+        checks: Union[Iterable[CheckQuery], AsyncIterable[CheckQuery]],
+        context: Optional[Context] = None,
+    ) -> AsyncIterator[Tuple[int, CheckQuery, bool]]:
+        """
+        Checks a (possibly very large or lazily produced) stream of authorization queries, and yields
+        the decisions as soon as they arrive from the PDP.
+
+        The queries are consumed lazily and sent in chunks, with a bounded number of chunks in flight,
+        so the memory used does not grow with the number of queries.
+
+        Args:
+            checks: A sync or async iterable of CheckQuery objects representing the authorization queries.
+            context: The context object representing the context in which the action is performed. Defaults to None.
+
+        Yields:
+            tuple[int, CheckQuery, bool]: the index of the query in the stream, the query and its decision.
+                decisions are yielded in order of arrival (chunks may complete out of order).
+
+        Raises:
+            PermitConnectionError: If an error occurs while sending the authorization request to the PDP.
+
+        Examples:
+
+            async for index, query, allowed in permit.bulk_check_stream(queries_from_db()):
+                if allowed:
+                    ...
+        """
+        query_context = self._context_store.get_derived_context(context or {})
+        max_in_flight = max(self._config.bulk_check.max_concurrency, 1)
+        in_flight: Set[asyncio.Task] = set()
+        offset = 0
+        try:
+            async for chunk in achunked(checks, max(self._config.bulk_check.chunk_size, 1)):
+                if len(in_flight) >= max_in_flight:
+                    done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        for result in task.result():
+                            yield result
+                in_flight.add(asyncio.ensure_future(self._check_stream_chunk(offset, chunk, query_context)))
+                offset += len(chunk)
+            while in_flight:
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    for result in task.result():
+                        yield result
+        finally:
+            for task in in_flight:
+                task.cancel()
+
+    async def _check_stream_chunk(
+        self, offset: int, chunk: List[CheckQuery], query_context: Context
+    ) -> List[Tuple[int, CheckQuery, bool]]:
+        decisions = await self._bulk_check_chunk([self._build_bulk_query(check, query_context) for check in chunk])
+        if len(decisions) != len(chunk):
+            raise PermitConnectionError(
+                f"Permit SDK got {len(decisions)} decisions for a chunk of {len(chunk)} queries from the PDP"
             )
+        return [(offset + i, check, decision) for i, (check, decision) in enumerate(zip(chunk, decisions))]
+
+    async def allowed_actions(
+        self,
+        user: User,
+        resource: Resource,
+        actions: Iterable[Action],
+        context: Optional[Context] = None,
+        *,
+        retries: Optional[int] = None,
+    ) -> Set[Action]:
+        """
+        Checks which of the given actions a user is authorized to perform on a resource within the specified context.
+
+        The user, the resource and the context are normalized once and shared by the queries of all the actions,
+        which are sent to the PDP in a single bulk query (reusing cached decisions, if the decision cache is enabled).
+
+        Args:
+            user: The user object representing the user.
+            resource: The resource object representing the resource.
+            actions: The actions to check.
+            context: The context object representing the context in which the actions are performed. Defaults to None.
+            retries: The number of times a chunk of queries that failed transiently is retried,
+                overrides the bulk_check.chunk_retries config for this call.
+
+        Returns:
+            set[str]: The actions the user is authorized to perform.
+
+        Raises:
+            PermitConnectionError: If an error occurs while sending the authorization request to the PDP.
+
+        Examples:
+
+            # which of the issue buttons should be shown to the user?
+            await permit.allowed_actions(user, 'issue:1234', ['read', 'comment', 'close', 'delete'])
+        """
+        query_context = self._context_store.get_derived_context(context or {})
+        normalized_user = normalize_user(user)
+        normalized_resource = normalize_resource(resource, self._config.multi_tenancy)
+        queries: Dict[CacheKey, dict] = {}
+        for action in actions:
+            body = {
+                "user": normalized_user,
+                "action": action,
+                "resource": normalized_resource,
+                "context": query_context,
+            }
+            queries[DecisionCache.key_for(body)] = body
+        decisions = await self._get_bulk_decisions(queries, retries)
+        return {body["action"] for query_key, body in queries.items() if decisions[query_key]}
+
+    async def filter_objects(
+        self,
+        user: User,
+        action: Action,
+        resources: Iterable[T],
+        key: Optional[Callable[[T], Resource]] = None,
+        context: Optional[Context] = None,
+        *,
+        type_level_check: bool = False,
+        retries: Optional[int] = None,
+    ) -> List[T]:
+        """
+        Filters a list of resources (or of objects representing resources) down to those the user
+        is authorized to perform an action on, within the specified context.
+
+        Repeated resources are only checked once, cached decisions (if the decision cache is enabled) are reused,
+        and the rest of the resources are checked in chunked bulk queries.
+
+        Args:
+            user: The user object representing the user.
+            action: The action to be performed on the resources.
+            resources: The resources to filter, or any objects the key function maps to resources.
+            key: A function returning the resource (a resource object or a 'type:key' string) of each object.
+                Defaults to None, in which case the objects themselves are the resources.
+            context: The context object representing the context in which the action is performed. Defaults to None.
+            type_level_check: Whether several instances of the same resource type (and tenant) are first checked
+                with a single type-level query: if the user may perform the action on any resource of the type,
+                the instances are allowed without being checked, otherwise they are checked individually
+                in a second round trip. Only enable it if a type-level allow implies that every instance is allowed
+                (i.e: RBAC policies), as it allows the instances that ABAC conditions on stored resource attributes
+                or ReBAC derived roles would deny. Instances given with attributes or with a resource context
+                are always checked individually. Defaults to False.
+            retries: The number of times a chunk of queries that failed transiently is retried,
+                overrides the bulk_check.chunk_retries config for this call.
+
+        Returns:
+            The objects the user is authorized on, in the order they were given.
+
+        Raises:
+            PermitConnectionError: If an error occurs while sending the authorization requests to the PDP.
+
+        Examples:
+
+            # the documents the user may read
+            documents = await permit.filter_objects(user, 'read', documents, key=lambda doc: f'document:{doc.id}')
+        """
+        query_context = self._context_store.get_derived_context(context or {})
+        normalized_user = normalize_user(user)
+        objects = list(resources)
+        queries: Dict[CacheKey, dict] = {}
+        query_keys: List[CacheKey] = []
+        for obj in objects:
+            body = {
+                "user": normalized_user,
+                "action": action,
+                "resource": normalize_resource(
+                    key(obj) if key is not None else obj,  # type: ignore[arg-type]
+                    self._config.multi_tenancy,
+                ),
+                "context": query_context,
+            }
+            query_key = DecisionCache.key_for(body)
+            queries.setdefault(query_key, body)
+            query_keys.append(query_key)
+
+        decisions = self._get_cached_decisions(queries)
+        if type_level_check:
+            unresolved = {query_key: body for query_key, body in queries.items() if query_key not in decisions}
+            decisions.update(await self._get_type_level_decisions(unresolved, retries))
+        unresolved = {query_key: body for query_key, body in queries.items() if query_key not in decisions}
+        decisions.update(await self._get_bulk_decisions(unresolved, retries))
+        return [obj for obj, query_key in zip(objects, query_keys) if decisions[query_key]]
+
+    def _get_cached_decisions(self, queries: Dict[CacheKey, dict]) -> Dict[CacheKey, bool]:
+        if not self._decision_cache.enabled:
+            return {}
+        decisions = {}
+        for query_key in queries:
+            decision = self._decision_cache.get(query_key)
+            if decision is not None:
+                decisions[query_key] = decision
+        return decisions
+
+    async def _get_bulk_decisions(
+        self, queries: Dict[CacheKey, dict], retries: Optional[int] = None
+    ) -> Dict[CacheKey, bool]:
+        """
+        returns the decisions of the queries, the ones that are not cached are checked in chunked bulk queries
+        (and their decisions are cached).
+        """
+        decisions = self._get_cached_decisions(queries)
+        unresolved = [(query_key, body) for query_key, body in queries.items() if query_key not in decisions]
+        if not unresolved:
+            return decisions
+        generation = self._decision_cache.generation
+        checked = await self._chunked_bulk_check([body for _, body in unresolved], retries)
+        for (query_key, _), decision in zip(unresolved, checked):
+            decisions[query_key] = decision
+            if self._decision_cache.enabled:
+                self._decision_cache.set(query_key, decision=decision, generation=generation)
+        return decisions
+
+    async def _get_type_level_decisions(
+        self, queries: Dict[CacheKey, dict], retries: Optional[int] = None
+    ) -> Dict[CacheKey, bool]:
+        """
+        checks the resource instances of each resource type (and tenant) with a single type-level query,
+        and returns the (allowed) decisions of the instances whose type-level query is allowed.
+        only types with several instances are checked, as a single instance is checked by a single query anyway.
+        """
+        instances: Dict[Tuple[str, Optional[str]], List[CacheKey]] = {}
+        for query_key, body in queries.items():
+            resource = body["resource"]
+            # attributes and a resource context may change the decision of the instance
+            if resource.get("key") is None or resource.get("attributes") or set(resource["context"]) - {"tenant"}:
+                continue
+            instances.setdefault((resource["type"], resource.get("tenant")), []).append(query_key)
+
+        type_queries: Dict[CacheKey, dict] = {}
+        type_instances: Dict[CacheKey, List[CacheKey]] = {}
+        for (resource_type, tenant), query_keys in instances.items():
+            if len(query_keys) < 2:
+                continue
+            body = queries[query_keys[0]]
+            type_resource = {"type": resource_type} if tenant is None else {"type": resource_type, "tenant": tenant}
+            type_body = {
+                "user": body["user"],
+                "action": body["action"],
+                "resource": normalize_resource(type_resource, self._config.multi_tenancy),
+                "context": body["context"],
+            }
+            type_key = DecisionCache.key_for(type_body)
+            type_queries[type_key] = type_body
+            type_instances[type_key] = query_keys
+        if not type_queries:
+            return {}
+
+        type_decisions = await self._get_bulk_decisions(type_queries, retries)
+        return {
+            query_key: True
+            for type_key, query_keys in type_instances.items()
+            if type_decisions[type_key]
+            for query_key in query_keys
+        }
+
+    def _build_bulk_query(self, check: CheckQuery, query_context: Context) -> dict:
+        return {
+            "user": normalize_user(check["user"]),
+            "action": check["action"],
+            "resource": normalize_resource(check["resource"], self._config.multi_tenancy),
+            "context": query_context,
+        }
+
+    async def _chunked_bulk_check(self, input: List[dict], retries: Optional[int] = None) -> List[bool]:
+        """
+        splits a large bulk query into chunks that are sent in parallel (bounded by the configured concurrency),
+        and reassembles the decisions in the order of the queries.
+        """
+        chunk_size = max(self._config.bulk_check.chunk_size, 1)
+        if len(input) <= chunk_size:
+            return await self._bulk_check_chunk(input, retries)
+
+        chunks = [input[i : i + chunk_size] for i in range(0, len(input), chunk_size)]
+        semaphore = asyncio.Semaphore(max(self._config.bulk_check.max_concurrency, 1))
 
-        async with aiohttp.ClientSession(headers=self._headers, **self._timeout_config) as session:
-            check_url = f"{self._base_url}/allowed/bulk"
+        async def check_chunk(chunk: List[dict]) -> List[bool]:
+            async with semaphore:
+                decisions = await self._bulk_check_chunk(chunk, retries)
+            if len(decisions) != len(chunk):
+                raise PermitConnectionError(
+                    f"Permit SDK got {len(decisions)} decisions for a chunk of {len(chunk)} queries from the PDP"
+                )
+            return decisions
+
+        tasks = [asyncio.ensure_future(check_chunk(chunk)) for chunk in chunks]
+        try:
+            chunk_decisions = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        return [decision for decisions in chunk_decisions for decision in decisions]
+
+    async def _bulk_check_chunk(self, chunk: List[dict], retries: Optional[int] = None) -> List[bool]:
+        # a failed chunk is retried on its own, without failing (or resending) the rest of the bulk query
+        if retries is None and self._config.retry.enable:
+            retries = self._config.bulk_check.chunk_retries
+        return await self._retry_policy.run(lambda: self._bulk_check(chunk), retries=retries)
+
+    async def _bulk_check(self, input: List[dict]) -> List[bool]:
+        # the latency of a bulk query grows with its size, so it is compared to bulk queries of about the same size
+        kind = f"bulk_check/{len(input).bit_length()}"
+        async with self._pdp_session() as session, self._pdp_endpoint(kind=kind) as base_url:
+            check_url = f"{base_url}/allowed/bulk"
             try:
                 async with session.post(
                     check_url,
-                    data=json.dumps(input),
+                    data=self._json.dumps_bytes(input),
                 ) as response:
                     if response.status != 200:
-                        error_json: dict = await response.json()
+                        error_json: dict = await response.json(loads=self._json.loads)
                         msg = "error in permit.check({}):\n{}\n{}".format(
                             (
                                 [
@@ -244,13 +985,16 @@ class Enforcer:
                             repr(error_json),
                         )
                         logger.error(msg)
-                        raise PermitConnectionError(msg)
-                    content: dict = await response.json()
-                    logger.debug(
-                        f"permit.check() response:\n"
-                        f"input: {pformat(input, indent=2)}\n"
-                        f"response status: {response.status}\n"
-                        f"response data: {pformat(content, indent=2)}"
+                        raise PermitConnectionError(
+                            msg, status_code=response.status, retry_after=parse_retry_after(response.headers)
+                        )
+                    content: dict = await response.json(loads=self._json.loads)
+                    # lazy logging: the payloads are only formatted if debug logs are enabled
+                    logger.opt(lazy=True).debug(
+                        "permit.check() response:\ninput: {}\nresponse status: {}\nresponse data: {}",
+                        lambda: pformat(input, indent=2),
+                        lambda: response.status,
+                        lambda: pformat(content, indent=2),
                     )
                     data = content.get("allow", content.get("result", {}).get("allow", []))
                     decisions: List[bool] = [bool(item.get("allow", False)) for item in data]
@@ -278,6 +1022,8 @@ class Enforcer:
         action: Action,
         resource: Resource,
         context: Optional[Context] = None,
+        *,
+        retries: Optional[int] = None,
     ) -> bool:
         """
         Checks if a user is authorized to perform an action on a resource within the specified context.
@@ -287,12 +1033,15 @@ class Enforcer:
             action: The action to be performed on the resource.
             resource: The resource object representing the resource.
             context: The context object representing the context in which the action is performed. Defaults to None.
+            retries: The number of times the query is retried if it fails transiently,
+                overrides the retry config for this call.
 
         Returns:
             bool: True if the user is authorized, False otherwise.
 
         Raises:
-            PermitConnectionError: If an error occurs while sending the authorization request to the PDP.
+            PermitConnectionError: If an error occurs while sending the authorization request to the PDP
+                (unless degraded mode is enabled and the PDP is unreachable past the deadline).
 
         Examples:
 
@@ -308,23 +1057,131 @@ class Enforcer:
         """
         context = context or {}
 
-        normalized_user: UserInput = UserInput(key=user) if isinstance(user, str) else UserInput(**user)
-        normalized_resource: ResourceInput = self._normalize_resource(
-            self._resource_from_string(resource) if isinstance(resource, str) else ResourceInput(**resource)
-        )
         query_context = self._context_store.get_derived_context(context)
         body = {
-            "user": normalized_user.dict(exclude_unset=True),
+            "user": normalize_user(user),
             "action": action,
-            "resource": normalized_resource.dict(exclude_unset=True),
+            "resource": normalize_resource(resource, self._config.multi_tenancy),
             "context": query_context,
         }
-        async with aiohttp.ClientSession(headers=self._headers, **self._timeout_config) as session:
-            check_url = f"{self._base_url}/allowed"
+        query_key = None
+        if self._decision_cache.enabled:
+            query_key = DecisionCache.key_for(body)
+            cached_decision = self._decision_cache.get(query_key)
+            if cached_decision is not None:
+                return cached_decision
+            stale_decision = self._get_revalidated_decision(query_key, body)
+            if stale_decision is not None:
+                return stale_decision
+
+        try:
+            return await self._fetch_decision(query_key, body, retries)
+        except (PermitConnectionError, asyncio.TimeoutError) as err:
+            if not is_server_failure(err) and not isinstance(err, PermitLoadSheddingError):
+                # the PDP rejected the query, falling back would hide the error
+                raise
+            fallback_decision = self._get_fallback_decision(query_key, action)
+            if fallback_decision is None:
+                raise
+            return fallback_decision
+
+    async def _fetch_decision(self, query_key: Optional[CacheKey], body: dict, retries: Optional[int] = None) -> bool:
+        generation = self._decision_cache.generation
+        try:
+            if self._config.coalesce_checks:
+                # concurrent identical queries share a single request to the PDP: the serialized query
+                # is both the key of the request in flight (with its retries) and the payload it is sent with
+                data = self._json.dumps_bytes(body)
+                decision = await self._in_flight_checks.run(
+                    (data, retries), lambda: self._send_check(body, retries, data)
+                )
+            else:
+                decision = await self._send_check(body, retries)
+        except PermitLoadSheddingError:
+            # the SDK is overloaded, not the PDP
+            raise
+        except (PermitConnectionError, asyncio.TimeoutError) as err:
+            if not is_server_failure(err):
+                # the PDP is reachable, it rejected the query
+                self._pdp_failing_since = None
+            elif self._pdp_failing_since is None:
+                self._pdp_failing_since = time.monotonic()
+            raise
+        if self._falling_back:
+            logger.info("the PDP is reachable again, permit.check() stopped falling back")
+        self._pdp_failing_since = None
+        self._falling_back = False
+        if query_key is not None and self._decision_cache.enabled:
+            self._decision_cache.set(query_key, decision=decision, generation=generation)
+        return decision
+
+    def _get_revalidated_decision(self, query_key: CacheKey, body: dict) -> Optional[bool]:
+        """
+        returns the expired decision of the query (if still within the stale-while-revalidate window),
+        and revalidates it against the PDP in the background.
+        """
+        degraded_mode = self._config.degraded_mode
+        if not degraded_mode.enable or not degraded_mode.stale_while_revalidate or not self._run_background_tasks:
+            return None
+        stale_decision = self._decision_cache.get_stale(query_key, degraded_mode.stale_while_revalidate)
+        if stale_decision is not None and query_key not in self._revalidations:
+            revalidation = asyncio.ensure_future(self._fetch_decision(query_key, body))
+            self._revalidations[query_key] = revalidation
+            revalidation.add_done_callback(lambda task: self._on_revalidated(query_key, task))
+        return stale_decision
+
+    def _on_revalidated(self, query_key: CacheKey, revalidation: "asyncio.Task[bool]") -> None:
+        self._revalidations.pop(query_key, None)
+        if not revalidation.cancelled() and revalidation.exception() is not None:
+            logger.opt(lazy=True).debug("failed to revalidate a stale decision: {}", revalidation.exception)
+
+    def _get_fallback_decision(self, query_key: Optional[CacheKey], action: Action) -> Optional[bool]:
+        """
+        returns the decision of the fallback policy, or None if the error should be raised
+        (degraded mode is disabled, or the PDP is not failing for long enough).
+        """
+        degraded_mode = self._config.degraded_mode
+        if not degraded_mode.enable or self._pdp_failing_since is None:
+            return None
+        if time.monotonic() - self._pdp_failing_since < degraded_mode.unreachable_deadline:
+            return None
+        if not self._falling_back:
+            logger.warning(f"the PDP is unreachable, permit.check() falls back to '{degraded_mode.fallback}' decisions")
+            self._falling_back = True
+        if degraded_mode.fallback == "fail_open":
+            return degraded_mode.fail_open_actions is None or action in degraded_mode.fail_open_actions
+        if degraded_mode.fallback == "stale" and query_key is not None and self._decision_cache.enabled:
+            stale_decision = self._decision_cache.get_stale(query_key, degraded_mode.max_stale)
+            if stale_decision is not None:
+                return stale_decision
+        return False
+
+    async def _send_check(self, body: dict, retries: Optional[int] = None, data: Optional[bytes] = None) -> bool:
+        # checks are idempotent, so a query that failed transiently can be safely retried
+        return await self._retry_policy.run(lambda: self._send_check_once(body, data), retries=retries)
+
+    async def _send_check_once(self, body: dict, data: Optional[bytes] = None) -> bool:
+        if self._check_batcher is not None:
+            # concurrent queries are sent together in a single bulk request
+            return await self._check_batcher.submit(body)
+        if self._check_hedger is not None:
+            # a query that is slow to answer is sent again (to another PDP endpoint), the first answer wins
+            return await self._check_hedger.run(lambda used_endpoints: self._check(body, used_endpoints, data))
+        return await self._check(body, data=data)
+
+    async def _check(
+        self, body: dict, used_endpoints: Optional[List[str]] = None, data: Optional[bytes] = None
+    ) -> bool:
+        """
+        sends the query to the PDP, data is the query already serialized (if it was, i.e: to coalesce it)
+        """
+        normalized_user, action, normalized_resource = body["user"], body["action"], body["resource"]
+        async with self._pdp_session() as session, self._pdp_endpoint(used_endpoints) as base_url:
+            check_url = f"{base_url}/allowed"
             try:
                 async with session.post(
                     check_url,
-                    data=json.dumps(body),
+                    data=data if data is not None else self._json.dumps_bytes(body),
                 ) as response:
                     if response.status != 200:
                         if response.status == 501:
@@ -333,16 +1190,18 @@ class Enforcer:
                                 f"\nPlease ensure you are not using ABAC/ReBAC policies,\n"
                                 f"as the cloud PDP is not compatible with these kinds of policies.\n"
                                 f"Also, please check your configuration and make sure it's running "
-                                f"at {self._base_url} and accepting requests.\n"
-                                f"Read more about setting up the PDP at {SETUP_PDP_DOCS_LINK}"
+                                f"at {base_url} and accepting requests.\n"
+                                f"Read more about setting up the PDP at {SETUP_PDP_DOCS_LINK}",
+                                status_code=response.status,
+                                retry_after=parse_retry_after(response.headers),
                             )
 
-                        error_json: dict = await response.json()
+                        error_json: dict = await response.json(loads=self._json.loads)
                         logger.error(
                             "error in permit.check({}, {}, {}):\n{}\n{}".format(
                                 normalized_user,
                                 action,
-                                self._resource_repr(normalized_resource),
+                                resource_repr(normalized_resource),
                                 f"status code: {response.status}",
                                 repr(error_json),
                             )
@@ -350,61 +1209,37 @@ class Enforcer:
                         raise PermitConnectionError(
                             f"Permit SDK got unexpected status code: {response.status}, "
                             f"please check your Permit SDK class init and PDP container are configured correctly. \n"
-                            f"Read more about setting up the PDP at {SETUP_PDP_DOCS_LINK}"
+                            f"Read more about setting up the PDP at {SETUP_PDP_DOCS_LINK}",
+                            status_code=response.status,
+                            retry_after=parse_retry_after(response.headers),
                         )
 
-                    content: dict = await response.json()
-                    logger.debug(
-                        f"permit.check() response:\n"
-                        f"body: {pformat(body, indent=2)}\n"
-                        f"response status: {response.status}\n"
-                        f"response data: {pformat(content, indent=2)}"
+                    content: dict = await response.json(loads=self._json.loads)
+                    # lazy logging: the payloads are only formatted if debug logs are enabled
+                    logger.opt(lazy=True).debug(
+                        "permit.check() response:\nbody: {}\nresponse status: {}\nresponse data: {}",
+                        lambda: pformat(body, indent=2),
+                        lambda: response.status,
+                        lambda: pformat(content, indent=2),
                     )
                     decision: bool = bool(content.get("allow", False))
                     return decision
             except aiohttp.ClientError as err:
                 logger.error(
-                    f"error in permit.check({normalized_user}, {action}, {self._resource_repr(normalized_resource)}):"
-                    f"\n{err}"
+                    f"error in permit.check({normalized_user}, {action}, {resource_repr(normalized_resource)}):\n{err}"
                 )
                 raise PermitConnectionError(
                     f"Permit SDK got error: {err}, \n"
                     f"and cannot connect to the PDP container, please check your configuration and make sure it's "
-                    f"running at {self._base_url} and accepting requests. \n"
+                    f"running at {base_url} and accepting requests. \n"
                     f"Read more about setting up the PDP at {SETUP_PDP_DOCS_LINK}",
                     error=err,
                 ) from err
 
-    def _normalize_resource(self, resource: ResourceInput) -> ResourceInput:
-        normalized_resource: ResourceInput = resource.copy()
-        if normalized_resource.context is None:
-            normalized_resource.context = {}
-
-        # if tenant is empty, we migth auto-set the default tenant according to config
-        if normalized_resource.tenant is None and self._config.multi_tenancy.use_default_tenant_if_empty:
-            normalized_resource.tenant = self._config.multi_tenancy.default_tenant
-
-        # copy tenant from resource.tenant to resource.context.tenant (until we change RBAC policy)
-        if normalized_resource.context.get("tenant", None) is None and normalized_resource.tenant is not None:
-            normalized_resource.context["tenant"] = normalized_resource.tenant
-        return normalized_resource
-
-    @staticmethod
-    def _resource_repr(resource: ResourceInput) -> str:
-        resource_repr: str = resource.type
-        if resource.key is not None:
-            resource_repr += ":" + resource.key
-        if resource.tenant:
-            resource_repr += f", tenant: {resource.tenant}"
-        return resource_repr
-
-    @staticmethod
-    def _resource_from_string(resource: str) -> ResourceInput:
-        parts = resource.split(RESOURCE_DELIMITER)
-        if len(parts) < 1 or len(parts) > 2:
-            raise ValueError(f"permit.check() got invalid resource string: {resource}")
-        return ResourceInput(type=parts[0], key=(parts[1] if len(parts) > 1 else None))
-
 
 class SyncEnforcer(Enforcer, metaclass=SyncClass):
-    pass
+    # every sync call runs in its own event loop, so a session cannot outlive the call
+    _reuse_session = False
+    # background tasks are cancelled when the call returns, so expired decisions are not served while revalidating
+    # and PDP health probes run inline
+    _run_background_tasks = False
@@ -0,0 +1,93 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Generic, List, TypeVar
+
+from ..config import CheckHedgingConfig
+
+T = TypeVar("T")
+
+# the number of latency samples required before the hedging delay follows the observed latency percentile
+MIN_LATENCY_SAMPLES = 20
+# the maximum number of hedges that can be sent in a burst, when the budget accumulated
+MAX_HEDGE_BURST = 10
+
+
+class Hedger(Generic[T]):
+    """
+    Sends a duplicate (hedge) of a request that did not complete within a percentile of the recently observed
+    latencies, and returns whichever answers first, cancelling the other one.
+
+    The hedges are limited by a budget: every request earns max_hedge_ratio of a hedge,
+    so hedges never exceed that ratio of the traffic (beyond a small burst).
+    """
+
+    def __init__(self, config: CheckHedgingConfig):
+        self._config = config
+        self._latencies: Deque[float] = deque(maxlen=config.window)
+        self._samples_since_update = 0
+        self._delay = config.initial_delay
+        self._budget = 0.0
+        self._lock = threading.Lock()
+        self.hedged = 0
+        self.hedges_won = 0
+
+    @property
+    def delay(self) -> float:
+        """
+        the time in seconds after which a pending request is hedged
+        """
+        return self._delay
+
+    async def run(self, call: Callable[[List[str]], Awaitable[T]]) -> T:
+        """
+        runs the call, and runs it again (concurrently) if it does not complete within the hedging delay.
+        every run of the call gets the same list, to which it should add the PDP endpoint it sent its request to,
+        so the hedge is sent to another endpoint.
+        """
+        used_endpoints: List[str] = []
+        started_at = time.monotonic()
+        with self._lock:
+            self._budget = min(self._budget + self._config.max_hedge_ratio, MAX_HEDGE_BURST)
+        attempts = [asyncio.ensure_future(call(used_endpoints))]
+        try:
+            done, _ = await asyncio.wait(attempts, timeout=self._delay)
+            if not done and self._take_budget():
+                self.hedged += 1
+                attempts.append(asyncio.ensure_future(call(used_endpoints)))
+            pending = set(attempts)
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                succeeded = [attempt for attempt in done if attempt.exception() is None]
+                if succeeded:
+                    self._record(time.monotonic() - started_at)
+                    if succeeded[0] is not attempts[0]:
+                        self.hedges_won += 1
+                    return succeeded[0].result()
+                if not pending:
+                    # all the attempts failed
+                    return attempts[0].result()
+        finally:
+            for attempt in attempts:
+                attempt.cancel()
+
+    def _take_budget(self) -> bool:
+        with self._lock:
+            if self._budget < 1:
+                return False
+            self._budget -= 1
+            return True
+
+    def _record(self, latency: float) -> None:
+        with self._lock:
+            self._latencies.append(latency)
+            self._samples_since_update += 1
+            # the percentile is only recomputed every 10% of the window, it does not need to be exact
+            if len(self._latencies) >= MIN_LATENCY_SAMPLES and self._samples_since_update >= max(
+                len(self._latencies) // 10, 1
+            ):
+                self._samples_since_update = 0
+                latencies = sorted(self._latencies)
+                index = min(int(len(latencies) * self._config.percentile / 100), len(latencies) - 1)
+                self._delay = max(latencies[index], self._config.min_delay)
@@ -1,4 +1,4 @@
-from typing import Dict, List, Optional
+from typing import Dict, List, NamedTuple, Optional
 
 from ..utils.pydantic_version import PYDANTIC_VERSION
 
@@ -47,6 +47,17 @@ class AuthorizedUserAssignment(BaseModel):
     role: str = Field(..., description="The role that the user is assigned to")
 
 
+class AuthorizedUserRole(NamedTuple):
+    """
+    A role assignment that authorizes a user, as yielded (alongside the user key) by permit.authorized_users_stream().
+    A compact, unvalidated alternative to AuthorizedUserAssignment for very large results.
+    """
+
+    tenant: str
+    resource: str
+    role: str
+
+
 AuthorizedUsersDict = Dict[str, List[AuthorizedUserAssignment]]
 
 
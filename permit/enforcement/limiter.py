@@ -0,0 +1,168 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, Optional, Tuple
+
+from loguru import logger
+
+from ..config import PdpConcurrencyLimitConfig
+from ..exceptions import PermitCircuitOpenError, PermitLoadSheddingError
+from ..utils.circuit_breaker import is_server_failure
+from ..utils.pydantic_version import PYDANTIC_VERSION
+
+if PYDANTIC_VERSION < (2, 0):
+    from pydantic import BaseModel, Field
+else:
+    from pydantic.v1 import BaseModel, Field  # type: ignore
+
+# how fast the baseline latency follows latencies that are above it (it follows lower latencies immediately),
+# so it adapts to a lasting change of the PDP latency without following a temporary overload
+BASELINE_DRIFT = 0.01
+
+_Waiter = Tuple[asyncio.AbstractEventLoop, "asyncio.Future[None]"]
+
+
+class ConcurrencyLimiterStats(BaseModel):
+    limit: int = Field(..., description="The current concurrency limit")
+    in_flight: int = Field(..., description="The number of requests currently in flight")
+    queued: int = Field(..., description="The number of requests waiting for the limit")
+    shed: int = Field(..., description="The number of requests that failed immediately because the queue was full")
+    baseline_latencies: Dict[str, float] = Field(
+        default_factory=dict, description="The estimated latency in seconds of the PDP (no load), per kind of request"
+    )
+
+
+class ConcurrencyLimiter:
+    """
+    Limits the number of concurrent requests to the PDP, requests beyond the limit wait in a FIFO queue
+    (or fail immediately with PermitLoadSheddingError once the queue is full, if it is bounded).
+
+    The limit adapts to the PDP with AIMD (additive increase, multiplicative decrease): it grows by about one
+    for every limit-worth of requests that completed in time, and shrinks by backoff_ratio when a request
+    is slower than latency_tolerance times the baseline latency of the PDP, or fails because the PDP is failing.
+    The baseline latency is kept per kind of request, as a bulk query is slower than a single check
+    even when the PDP is not loaded.
+    """
+
+    def __init__(self, config: PdpConcurrencyLimitConfig):
+        self._config = config
+        self._limit = float(config.initial_limit)
+        self._in_flight = 0
+        self._waiters: Deque[_Waiter] = deque()
+        self._baseline_latencies: Dict[str, float] = {}
+        self._decreased_at = 0.0
+        self._shed = 0
+        self._lock = threading.Lock()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def stats(self) -> ConcurrencyLimiterStats:
+        with self._lock:
+            return ConcurrencyLimiterStats(
+                limit=int(self._limit),
+                in_flight=self._in_flight,
+                queued=len(self._waiters),
+                shed=self._shed,
+                baseline_latencies=dict(self._baseline_latencies),
+            )
+
+    @asynccontextmanager
+    async def acquire(self, kind: str = "check") -> AsyncIterator[None]:
+        """
+        Waits until the request can be sent within the limit, and measures its latency once done.
+
+        Args:
+            kind: The kind of request, its latency is compared to the baseline latency of requests of the same kind.
+        """
+        if not self._config.enable:
+            yield
+            return
+        await self._acquire()
+        started_at = time.monotonic()
+        overloaded: Optional[bool] = None
+        try:
+            yield
+            overloaded = False
+        except (asyncio.CancelledError, PermitCircuitOpenError):
+            # the request was abandoned (or not sent at all), its latency is unknown
+            raise
+        except BaseException as err:
+            overloaded = is_server_failure(err)
+            raise
+        finally:
+            latency = None if overloaded is None else time.monotonic() - started_at
+            self._release(latency, kind, overloaded=bool(overloaded))
+
+    async def _acquire(self) -> None:
+        with self._lock:
+            if self._in_flight < int(self._limit) and not self._waiters:
+                self._in_flight += 1
+                return
+            if self._config.max_queue_size is not None and len(self._waiters) >= self._config.max_queue_size:
+                self._shed += 1
+                raise PermitLoadSheddingError(
+                    f"{len(self._waiters)} requests to the PDP are already waiting for the concurrency limit "
+                    f"({int(self._limit)}), shedding the request"
+                )
+            loop = asyncio.get_running_loop()
+            waiter: _Waiter = (loop, loop.create_future())
+            self._waiters.append(waiter)
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            with self._lock:
+                try:
+                    self._waiters.remove(waiter)
+                    handed_over = False
+                except ValueError:
+                    # the slot of a completed request was already handed over to this waiter
+                    handed_over = True
+            if handed_over:
+                self._release(None, overloaded=False)
+            raise
+
+    def _release(self, latency: Optional[float], kind: str = "check", *, overloaded: bool) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            if latency is not None:
+                self._adapt(latency, kind, overloaded=overloaded)
+            # hand the free slots over to the waiters (the loop of a waiter may run in another thread)
+            while self._waiters and self._in_flight < int(self._limit):
+                loop, future = self._waiters.popleft()
+                self._in_flight += 1
+                loop.call_soon_threadsafe(_wake, future)
+
+    def _adapt(self, latency: float, kind: str, *, overloaded: bool) -> None:
+        """
+        updates the limit after a request of the given kind completed (must be called with the lock held)
+        """
+        config = self._config
+        if not overloaded:
+            baseline_latency = self._baseline_latencies.get(kind)
+            if baseline_latency is None or latency < baseline_latency:
+                baseline_latency = latency
+            else:
+                baseline_latency += BASELINE_DRIFT * (latency - baseline_latency)
+            self._baseline_latencies[kind] = baseline_latency
+            overloaded = latency > baseline_latency * config.latency_tolerance
+        now = time.monotonic()
+        if overloaded:
+            # the requests in flight when the PDP got overloaded all complete slowly,
+            # so the limit is decreased at most once per request latency
+            if now - self._decreased_at >= latency and self._limit > config.min_limit:
+                self._limit = max(self._limit * config.backoff_ratio, config.min_limit)
+                self._decreased_at = now
+                logger.debug("the PDP is overloaded, decreased the concurrency limit to {}", int(self._limit))
+        elif self._in_flight + 1 >= self._limit / 2:
+            # the limit only grows while it is actually used
+            self._limit = min(self._limit + 1 / self._limit, config.max_limit)
+
+
+def _wake(future: "asyncio.Future[None]") -> None:
+    if not future.done():
+        future.set_result(None)
@@ -0,0 +1,125 @@
+from functools import lru_cache
+from typing import Dict, Optional, Tuple, Union
+
+from ..config import MultiTenancyConfig
+from .interfaces import ResourceInput, UserInput
+
+RESOURCE_DELIMITER = ":"
+
+User = Union[dict, str]
+Resource = Union[dict, str]
+
+# the common input shapes (strings, and dicts with plain values) are normalized with plain dict operations,
+# which is much faster than building and serializing the pydantic input models. any other input falls back
+# to the pydantic models, so the json sent to the PDP is always identical to the one the models produce.
+# (input key, output field name) of the optional user fields, in the order of the UserInput model fields
+_USER_STR_FIELDS = (("firstName", "first_name"), ("lastName", "last_name"), ("email", "email"))
+# the order of the ResourceInput model fields
+_RESOURCE_FIELDS = ("type", "id", "key", "tenant", "attributes", "context")
+_RESOURCE_STR_FIELDS = ("id", "key", "tenant")
+_RESOURCE_DICT_FIELDS = ("attributes", "context")
+
+
+def normalize_user(user: User) -> dict:
+    """
+    returns the json of the user as sent to the PDP, identical to UserInput(...).dict(exclude_unset=True)
+    """
+    if isinstance(user, str):
+        return {"key": user}
+    if user.get("key").__class__ is not str or "roles" in user:
+        return _normalize_user_model(user)
+
+    normalized: dict = {"key": user["key"]}
+    for input_key, field in _USER_STR_FIELDS:
+        if input_key in user:
+            value = user[input_key]
+            if value is not None and value.__class__ is not str:
+                return _normalize_user_model(user)
+            normalized[field] = value
+    if "attributes" in user:
+        attributes = user["attributes"]
+        if attributes is not None and attributes.__class__ is not dict:
+            return _normalize_user_model(user)
+        normalized["attributes"] = None if attributes is None else dict(attributes)
+    return normalized
+
+
+def normalize_resource(resource: Resource, multi_tenancy: MultiTenancyConfig) -> dict:
+    """
+    returns the json of the resource as sent to the PDP, including the default tenant (if configured)
+    and the tenant copied into the resource context.
+    """
+    fields: Dict[str, Optional[Union[str, dict]]]
+    if isinstance(resource, str):
+        resource_type, resource_key = parse_resource_string(resource)
+        fields = {"type": resource_type, "key": resource_key}
+    else:
+        fields = {}
+        if resource.get("type").__class__ is not str:
+            return _normalize_resource_model(ResourceInput(**resource), multi_tenancy)
+        fields["type"] = resource["type"]
+        for field in _RESOURCE_STR_FIELDS:
+            if field in resource:
+                value = resource[field]
+                if value is not None and value.__class__ is not str:
+                    return _normalize_resource_model(ResourceInput(**resource), multi_tenancy)
+                fields[field] = value
+        for field in _RESOURCE_DICT_FIELDS:
+            if field in resource:
+                value = resource[field]
+                if value is not None and value.__class__ is not dict:
+                    return _normalize_resource_model(ResourceInput(**resource), multi_tenancy)
+                fields[field] = None if value is None else dict(value)
+
+    context = fields.get("context")
+    if not isinstance(context, dict):
+        context = fields["context"] = {}
+
+    # if tenant is empty, we might auto-set the default tenant according to config
+    tenant = fields.get("tenant")
+    if tenant is None and multi_tenancy.use_default_tenant_if_empty:
+        tenant = fields["tenant"] = multi_tenancy.default_tenant
+
+    # copy tenant from resource.tenant to resource.context.tenant (until we change RBAC policy)
+    if context.get("tenant") is None and tenant is not None:
+        context["tenant"] = tenant
+    return {field: fields[field] for field in _RESOURCE_FIELDS if field in fields}
+
+
+@lru_cache(maxsize=4096)
+def parse_resource_string(resource: str) -> Tuple[str, Optional[str]]:
+    """
+    parses a 'type' or 'type:key' resource string
+    """
+    parts = resource.split(RESOURCE_DELIMITER)
+    if len(parts) < 1 or len(parts) > 2:
+        raise ValueError(f"permit.check() got invalid resource string: {resource}")
+    return parts[0], (parts[1] if len(parts) > 1 else None)
+
+
+def resource_repr(resource: dict) -> str:
+    resource_repr: str = resource["type"]
+    if resource.get("key") is not None:
+        resource_repr += ":" + resource["key"]
+    if resource.get("tenant"):
+        resource_repr += f", tenant: {resource['tenant']}"
+    return resource_repr
+
+
+def _normalize_user_model(user: dict) -> dict:
+    return UserInput(**user).dict(exclude_unset=True)
+
+
+def _normalize_resource_model(resource: ResourceInput, multi_tenancy: MultiTenancyConfig) -> dict:
+    normalized_resource: ResourceInput = resource.copy()
+    if normalized_resource.context is None:
+        normalized_resource.context = {}
+
+    # if tenant is empty, we might auto-set the default tenant according to config
+    if normalized_resource.tenant is None and multi_tenancy.use_default_tenant_if_empty:
+        normalized_resource.tenant = multi_tenancy.default_tenant
+
+    # copy tenant from resource.tenant to resource.context.tenant (until we change RBAC policy)
+    if normalized_resource.context.get("tenant", None) is None and normalized_resource.tenant is not None:
+        normalized_resource.context["tenant"] = normalized_resource.tenant
+    return normalized_resource.dict(exclude_unset=True)
@@ -23,9 +23,32 @@ class PermitException(PermitError):  # noqa: N818
 class PermitConnectionError(PermitException):
     """Permit connection exception"""
 
-    def __init__(self, message: str, *, error: Optional[aiohttp.ClientError] = None):
+    def __init__(
+        self,
+        message: str,
+        *,
+        error: Optional[aiohttp.ClientError] = None,
+        status_code: Optional[int] = None,
+        retry_after: Optional[float] = None,
+    ):
         super().__init__(message)
         self.original_error = error
+        # the http status code returned by the PDP (if it answered)
+        self.status_code = status_code
+        # the delay in seconds the PDP asked to wait before retrying (Retry-After header)
+        self.retry_after = retry_after
+
+
+class PermitCircuitOpenError(PermitConnectionError):
+    """
+    Raised without sending a request, while the circuit breaker to the server is open after repeated failures.
+    """
+
+
+class PermitLoadSheddingError(PermitConnectionError):
+    """
+    Raised without sending a request, when too many requests to the PDP are already waiting for the concurrency limit.
+    """
 
 
 class PermitContextError(PermitError):
@@ -2,6 +2,11 @@ from typing import Callable, TypeVar
 
 from permit import PYDANTIC_VERSION, PermitConfig
 from permit.api.base import SimpleHttpClient
+from permit.utils.circuit_breaker import get_circuit_breaker
+from permit.utils.httpx_transport import get_httpx_session_pool
+from permit.utils.json_codec import get_json_codec
+from permit.utils.retry import get_retry_policy
+from permit.utils.unix_socket import split_unix_socket_url
 
 if PYDANTIC_VERSION < (2, 0):
     from pydantic import BaseModel, Extra, Field
@@ -44,8 +49,9 @@ class BasePdpPermitApi:
         self.config = config
 
     def _build_http_client(self, endpoint_url: str = "", **kwargs):
+        base_url, unix_socket_path = split_unix_socket_url(self.config.pdp)
         client_config = ClientConfig(
-            base_url=f"{self.config.pdp}",
+            base_url=base_url,
             headers={
                 "Content-Type": "application/json",
                 "Authorization": f"bearer {self.config.token}",
@@ -56,4 +62,11 @@ class BasePdpPermitApi:
         return SimpleHttpClient(
             client_config_dict,
             base_url=endpoint_url,
+            json_codec=get_json_codec(self.config.json_codec),
+            circuit_breaker=get_circuit_breaker(self.config, "pdp"),
+            retry_policy=get_retry_policy(self.config),
+            unix_socket_path=unix_socket_path,
+            httpx_sessions=(
+                get_httpx_session_pool(self.config) if self.config.http_transport.backend == "httpx" else None
+            ),
         )
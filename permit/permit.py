@@ -1,24 +1,49 @@
 import json
+import time
 from contextlib import contextmanager
-from typing import Generator, List, Optional
+from typing import (
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
 from loguru import logger
 from typing_extensions import Self
 
 from .api.api_client import PermitApiClient
 from .api.elements import ElementsApi
+from .api.models import ResourceRead
 from .config import PermitConfig
+from .enforcement.cache import AuthorizedUsersCache, DecisionCache
 from .enforcement.enforcer import (
     Action,
+    AuthorizedUserAssignment,
+    AuthorizedUserRole,
+    AuthorizedUsersQuery,
     AuthorizedUsersResult,
     CheckQuery,
     Enforcer,
     Resource,
     User,
 )
+from .enforcement.limiter import ConcurrencyLimiter
+from .enforcement.normalization import parse_resource_string
 from .logger import configure_logger
 from .pdp_api.pdp_api_client import PermitPdpApiClient
-from .utils.context import Context
+from .utils.circuit_breaker import CircuitBreaker, get_circuit_breaker
+from .utils.context import Context, ContextScope
+from .utils.httpx_transport import get_httpx_session_pool
+
+T = TypeVar("T")
 
 
 class Permit:
@@ -30,9 +55,11 @@ class Permit:
         self._api = PermitApiClient(self._config)
         self._elements = ElementsApi(self._config)
         self._pdp_api = PermitPdpApiClient(self._config)
-        logger.debug(
+        # the actions of each resource type, as fetched by allowed_actions(): (expiry time, actions)
+        self._resource_actions: Dict[str, Tuple[float, List[Action]]] = {}
+        logger.opt(lazy=True).debug(
             "Permit SDK initialized with config:\n${}",
-            json.dumps(self._config.dict(exclude={"api_context"})),
+            lambda: json.dumps(self._config.dict(exclude={"api_context"})),
         )
 
     @property
@@ -48,6 +75,44 @@ class Permit:
         """
         return self._config.copy()
 
+    async def aclose(self) -> None:
+        """
+        Closes the connections the SDK keeps open to the PDP (and to the Permit REST API, with the httpx backend).
+        Call it once when your application shuts down, or use the client as an async context manager.
+
+        Usage example:
+
+            async with Permit(token="<YOUR_API_KEY>") as permit:
+                await permit.check(user, 'close', 'issue')
+        """
+        await self._enforcer.aclose()
+        await get_httpx_session_pool(self._config).aclose()
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    def context_scope(self, context: Context) -> ContextScope:
+        """
+        Opens a request scope: the given context is added to the context of every authorization query
+        made within the scope (in the current thread or asyncio task), on top of the SDK base context.
+
+        The merged context is computed once for the scope and reused by every check made within it,
+        instead of being passed to (and merged in) every call.
+
+        Args:
+            context: The context shared by the authorization queries made within the scope.
+
+        Usage example:
+
+            async with permit.context_scope({"ip": request.client.host, "time": now}):
+                await permit.check(user, 'read', 'document')
+                await permit.check(user, 'update', 'document')
+        """
+        return self._enforcer.context_store.scope(context)
+
     @contextmanager
     def wait_for_sync(self, timeout: float = 10.0) -> Generator[Self, None, None]:
         """
@@ -73,6 +138,63 @@ class Permit:
         contextualized_config.facts_sync_timeout = timeout
         yield self.__class__(contextualized_config)
 
+    @property
+    def cache(self) -> DecisionCache:
+        """
+        Access the in-process decision cache using this property.
+        The cache is only used when enabled via the `decision_cache` config.
+
+        Usage example:
+
+            permit = Permit(token="<YOUR_API_KEY>", decision_cache={"enable": True})
+            permit.cache.invalidate(user="auth0|elon")
+            print(permit.cache.stats.hit_ratio)
+        """
+        return self._enforcer.decision_cache
+
+    @property
+    def authorized_users_cache(self) -> AuthorizedUsersCache:
+        """
+        Access the in-process cache of permit.authorized_users() results using this property.
+        The cache is only used when enabled via the `authorized_users_cache` config.
+
+        Usage example:
+
+            permit = Permit(token="<YOUR_API_KEY>", authorized_users_cache={"enable": True})
+            permit.authorized_users_cache.invalidate(resource="document:1234")
+            print(permit.authorized_users_cache.stats.hit_ratio)
+        """
+        return self._enforcer.authorized_users_cache
+
+    @property
+    def circuit_breakers(self) -> Dict[str, CircuitBreaker]:
+        """
+        Access the circuit breakers of the requests to the PDP ('pdp') and to the Permit REST API ('api').
+        The circuit breakers are only used when enabled via the `circuit_breaker` config.
+
+        Usage example:
+
+            permit = Permit(token="<YOUR_API_KEY>", circuit_breaker={"enable": True})
+            permit.circuit_breakers["pdp"].add_listener(
+                lambda name, previous, state: print(f"the circuit to the {name} is now {state}")
+            )
+            print(permit.circuit_breakers["pdp"].stats)
+        """
+        return {name: get_circuit_breaker(self._config, name) for name in ("pdp", "api")}
+
+    @property
+    def pdp_concurrency_limiter(self) -> ConcurrencyLimiter:
+        """
+        Access the adaptive limit of the concurrent requests to the PDP.
+        The limit is only used when enabled via the `pdp_concurrency_limit` config.
+
+        Usage example:
+
+            permit = Permit(token="<YOUR_API_KEY>", pdp_concurrency_limit={"enable": True, "max_queue_size": 1000})
+            print(permit.pdp_concurrency_limiter.stats)
+        """
+        return self._enforcer.concurrency_limiter
+
     @property
     def api(self) -> PermitApiClient:
         """
@@ -143,10 +265,113 @@ class Permit:
         """  # noqa: E501
         return await self._enforcer.authorized_users(action, resource, context)
 
+    async def bulk_authorized_users(
+        self,
+        queries: Iterable[AuthorizedUsersQuery],
+        context: Optional[Context] = None,
+        *,
+        max_concurrency: Optional[int] = None,
+    ) -> Dict[Tuple[Action, str], AuthorizedUsersResult]:
+        """
+        Queries the users that are authorized to perform each of several actions on each of several resources.
+
+        Identical queries are only sent once, and the queries are sent in parallel (with bounded concurrency)
+        over the pooled connections to the PDP.
+
+        Args:
+            queries: The (action, resource) pairs to query.
+            context: The context object representing the context in which the actions are performed. Defaults to None.
+            max_concurrency: The maximum number of queries sent to the PDP in parallel.
+                Defaults to the bulk_check.max_concurrency config.
+
+        Returns:
+            The result of each query, keyed by (action, resource). string resources are kept as given,
+            resource objects are keyed by their normalized 'type:key, tenant: tenant' representation.
+
+        Raises:
+            PermitConnectionError: If an error occurs while sending the authorization requests to the PDP.
+
+        Examples:
+
+            # who should be notified about the new comments on issues 1 and 2?
+            results = await permit.bulk_authorized_users([('read', 'issue:1'), ('read', 'issue:2')])
+            for (action, resource), result in results.items():
+                notify(resource, result.users)
+        """
+        return await self._enforcer.bulk_authorized_users(queries, context, max_concurrency=max_concurrency)
+
+    def authorized_users_stream(
+        self,
+        action: Action,
+        resource: Resource,
+        context: Optional[Context] = None,
+    ) -> AsyncIterator[Tuple[str, List[AuthorizedUserRole]]]:
+        """
+        Queries all the users that are authorized to perform an action on a resource within the specified context,
+        and yields them one by one while the response of the PDP is still being received.
+
+        Unlike authorized_users(), the response is parsed incrementally into compact (non pydantic) objects,
+        so the memory used does not grow with the number of authorized users.
+        The results are not cached, and the query is not retried once users were yielded.
+
+        Args:
+            action: The action to be performed on the resource.
+            resource: The resource object representing the resource.
+            context: The context object representing the context in which the action is performed. Defaults to None.
+
+        Yields:
+            tuple[str, list[AuthorizedUserRole]]: the key of an authorized user,
+                and the role assignments that grant the user the permission.
+
+        Raises:
+            PermitConnectionError: If an error occurs while sending the authorization request to the PDP,
+                or if its response is not a valid authorized users result.
+
+        Examples:
+
+            # notify everyone in the organization that can read the announcement
+            async for user_key, assignments in permit.authorized_users_stream('read', 'announcement:1234'):
+                await notify(user_key)
+        """
+        return self._enforcer.authorized_users_stream(action, resource, context)
+
+    async def authorized_user_assignments(
+        self,
+        user: User,
+        action: Action,
+        resource: Resource,
+        context: Optional[Context] = None,
+    ) -> List[AuthorizedUserAssignment]:
+        """
+        Queries the role assignments that authorize a user to perform an action on a resource within the specified context.
+        The lookup is served from the cached authorized users of the resource, if the `authorized_users_cache` is enabled.
+
+        Args:
+            user: The user object representing the user.
+            action: The action to be performed on the resource.
+            resource: The resource object representing the resource.
+            context: The context object representing the context in which the action is performed. Defaults to None.
+
+        Returns:
+            The role assignments that authorize the user, or an empty list if the user is not authorized.
+
+        Raises:
+            PermitConnectionError: If an error occurs while sending the authorization request to the PDP.
+
+        Examples:
+
+            # which roles allow elon to close the issue 1234?
+            assignments = await permit.authorized_user_assignments('auth0|elon', 'close', 'issue:1234')
+            print([assignment.role for assignment in assignments])
+        """  # noqa: E501
+        return await self._enforcer.authorized_user_assignments(user, action, resource, context)
+
     async def bulk_check(
         self,
         checks: List[CheckQuery],
         context: Optional[Context] = None,
+        *,
+        retries: Optional[int] = None,
     ) -> List[bool]:
         """
         Checks if a user is authorized to perform an action on a list of resources within the specified context.
@@ -154,6 +379,8 @@ class Permit:
         Args:
             checks: A list of check queries, each query contain user, action, and resource.
             context: The context object representing the context in which the action is performed. Defaults to None.
+            retries: The number of times a chunk of queries that failed transiently is retried,
+                overrides the bulk_check.chunk_retries config for this call.
 
         Returns:
             list[bool]: A list of booleans indicating whether the user is authorized for each resource.
@@ -182,7 +409,150 @@ class Permit:
                 },
             ])
         """
-        return await self._enforcer.bulk_check(checks, context)
+        return await self._enforcer.bulk_check(checks, context, retries=retries)
+
+    def bulk_check_stream(
+        self,
+        checks: Union[Iterable[CheckQuery], AsyncIterable[CheckQuery]],
+        context: Optional[Context] = None,
+    ) -> AsyncIterator[Tuple[int, CheckQuery, bool]]:
+        """
+        Checks a (possibly very large or lazily produced) stream of authorization queries, and yields
+        the decisions as soon as they arrive from the PDP.
+
+        The queries are consumed lazily and sent in chunks, with a bounded number of chunks in flight,
+        so the memory used does not grow with the number of queries.
+
+        Args:
+            checks: A sync or async iterable of check queries, each query contain user, action, and resource.
+            context: The context object representing the context in which the action is performed. Defaults to None.
+
+        Yields:
+            tuple[int, CheckQuery, bool]: the index of the query in the stream, the query and its decision.
+                decisions are yielded in order of arrival (chunks may complete out of order).
+
+        Raises:
+            PermitConnectionError: If an error occurs while sending the authorization request to the PDP.
+
+        Examples:
+
+            async for index, query, allowed in permit.bulk_check_stream(queries_from_db()):
+                if allowed:
+                    ...
+        """
+        return self._enforcer.bulk_check_stream(checks, context)
+
+    async def allowed_actions(
+        self,
+        user: User,
+        resource: Resource,
+        actions: Optional[Iterable[Action]] = None,
+        context: Optional[Context] = None,
+        *,
+        retries: Optional[int] = None,
+    ) -> Set[Action]:
+        """
+        Checks which actions a user is authorized to perform on a resource within the specified context
+        (i.e: to decide which buttons to show for the resource).
+
+        The user, the resource and the context are normalized once and shared by the queries of all the actions,
+        which are sent to the PDP in a single bulk query (reusing cached decisions, if the decision cache is enabled).
+
+        Args:
+            user: The user object representing the user.
+            resource: The resource object representing the resource.
+            actions: The actions to check. Defaults to None, in which case all the actions defined on the resource type
+                are checked (as fetched from the Permit REST API, and cached for the resource_actions_ttl config).
+            context: The context object representing the context in which the actions are performed. Defaults to None.
+            retries: The number of times a chunk of queries that failed transiently is retried,
+                overrides the bulk_check.chunk_retries config for this call.
+
+        Returns:
+            set[str]: The actions the user is authorized to perform.
+
+        Raises:
+            PermitConnectionError: If an error occurs while sending the authorization request to the PDP.
+            PermitApiError: If the actions of the resource type cannot be fetched from the Permit REST API.
+
+        Examples:
+
+            # all the actions the user may perform on the issue 1234
+            await permit.allowed_actions(user, 'issue:1234')
+
+            # which of the issue buttons should be shown to the user?
+            await permit.allowed_actions(user, 'issue:1234', ['read', 'comment', 'close', 'delete'])
+        """
+        if actions is None:
+            resource_type = self._resource_type(resource)
+            actions = self._get_cached_resource_actions(resource_type)
+            if actions is None:
+                actions = self._cache_resource_actions(resource_type, await self.api.resources.get(resource_type))
+        return await self._enforcer.allowed_actions(user, resource, actions, context, retries=retries)
+
+    @staticmethod
+    def _resource_type(resource: Resource) -> str:
+        return parse_resource_string(resource)[0] if isinstance(resource, str) else resource["type"]
+
+    def _get_cached_resource_actions(self, resource_type: str) -> Optional[List[Action]]:
+        cached = self._resource_actions.get(resource_type)
+        if cached is None or cached[0] <= time.monotonic():
+            return None
+        return cached[1]
+
+    def _cache_resource_actions(self, resource_type: str, schema: ResourceRead) -> List[Action]:
+        actions = list(schema.actions or {})
+        self._resource_actions[resource_type] = (time.monotonic() + self._config.resource_actions_ttl, actions)
+        return actions
+
+    async def filter_objects(
+        self,
+        user: User,
+        action: Action,
+        resources: Iterable[T],
+        key: Optional[Callable[[T], Resource]] = None,
+        context: Optional[Context] = None,
+        *,
+        type_level_check: bool = False,
+        retries: Optional[int] = None,
+    ) -> List[T]:
+        """
+        Filters a list of resources (or of objects representing resources) down to those the user
+        is authorized to perform an action on, within the specified context.
+
+        Repeated resources are only checked once, cached decisions (if the decision cache is enabled) are reused,
+        and the rest of the resources are checked in chunked bulk queries.
+
+        Args:
+            user: The user object representing the user.
+            action: The action to be performed on the resources.
+            resources: The resources to filter, or any objects the key function maps to resources.
+            key: A function returning the resource (a resource object or a 'type:key' string) of each object.
+                Defaults to None, in which case the objects themselves are the resources.
+            context: The context object representing the context in which the action is performed. Defaults to None.
+            type_level_check: Whether several instances of the same resource type (and tenant) are first checked
+                with a single type-level query: if the user may perform the action on any resource of the type,
+                the instances are allowed without being checked, otherwise they are checked individually
+                in a second round trip. Only enable it if a type-level allow implies that every instance is allowed
+                (i.e: RBAC policies), as it allows the instances that ABAC conditions on stored resource attributes
+                or ReBAC derived roles would deny. Instances given with attributes or with a resource context
+                are always checked individually. Defaults to False.
+            retries: The number of times a chunk of queries that failed transiently is retried,
+                overrides the bulk_check.chunk_retries config for this call.
+
+        Returns:
+            The objects the user is authorized on, in the order they were given.
+
+        Raises:
+            PermitConnectionError: If an error occurs while sending the authorization requests to the PDP.
+
+        Examples:
+
+            # the documents the user may read
+            documents = await permit.filter_objects(user, 'read', documents, key=lambda doc: f'document:{doc.id}')
+        """
+        return await self._enforcer.filter_objects(
+            user, action, resources, key, context, type_level_check=type_level_check, retries=retries
+        )
 
     async def check(
         self,
@@ -190,6 +560,8 @@ class Permit:
         action: Action,
         resource: Resource,
         context: Optional[Context] = None,
+        *,
+        retries: Optional[int] = None,
     ) -> bool:
         """
         Checks if a user is authorized to perform an action on a resource within the specified context.
@@ -199,6 +571,8 @@ class Permit:
             action: The action to be performed on the resource.
             resource: The resource object representing the resource.
             context: The context object representing the context in which the action is performed. Defaults to None.
+            retries: The number of times the query is retried if it fails transiently,
+                overrides the retry config for this call.
 
         Returns:
             bool: True if the user is authorized, False otherwise.
@@ -218,4 +592,4 @@ class Permit:
             # (in a multi tenant application)
             await permit.check(user, 'close', {'type': 'issue', 'tenant': 't1'})
         """
-        return await self._enforcer.check(user, action, resource, context)
+        return await self._enforcer.check(user, action, resource, context, retries=retries)
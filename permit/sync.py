@@ -1,12 +1,17 @@
-from typing import List, Optional
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, TypeVar
 
 from .api.elements import SyncElementsApi
 from .api.sync_api_client import SyncPermitApiClient
 from .config import PermitConfig
-from .enforcement.enforcer import Action, CheckQuery, Resource, SyncEnforcer, User
+from .enforcement.enforcer import Action, AuthorizedUsersQuery, CheckQuery, Resource, SyncEnforcer, User
+from .enforcement.interfaces import AuthorizedUserAssignment, AuthorizedUserRole, AuthorizedUsersResult
 from .pdp_api.pdp_api_client import SyncPDPApi
 from .permit import Permit as AsyncPermit
 from .utils.context import Context
+from .utils.iterables import chunked
+from .utils.sync import iterate_async_sync
+
+T = TypeVar("T")
 
 
 class Permit(AsyncPermit):
@@ -52,10 +57,120 @@ class Permit(AsyncPermit):
         """
         return self._pdp_api  # type: ignore[return-value]
 
+    async def aclose(self) -> None:
+        # every sync call opens (and closes) its own connection to the PDP, there is nothing left to close
+        return None
+
+    def bulk_authorized_users(  # type: ignore[override]
+        self,
+        queries: Iterable[AuthorizedUsersQuery],
+        context: Optional[Context] = None,
+        *,
+        max_concurrency: Optional[int] = None,
+    ) -> Dict[Tuple[Action, str], AuthorizedUsersResult]:
+        """
+        Queries the users that are authorized to perform each of several actions on each of several resources.
+
+        Identical queries are only sent once, and the queries are sent in parallel (with bounded concurrency)
+        over the pooled connections to the PDP.
+
+        Args:
+            queries: The (action, resource) pairs to query.
+            context: The context object representing the context in which the actions are performed. Defaults to None.
+            max_concurrency: The maximum number of queries sent to the PDP in parallel.
+                Defaults to the bulk_check.max_concurrency config.
+
+        Returns:
+            The result of each query, keyed by (action, resource). string resources are kept as given,
+            resource objects are keyed by their normalized 'type:key, tenant: tenant' representation.
+
+        Raises:
+            PermitConnectionError: If an error occurs while sending the authorization requests to the PDP.
+
+        Examples:
+
+            # who should be notified about the new comments on issues 1 and 2?
+            results = permit.bulk_authorized_users([('read', 'issue:1'), ('read', 'issue:2')])
+            for (action, resource), result in results.items():
+                notify(resource, result.users)
+        """
+        return self._enforcer.bulk_authorized_users(  # type: ignore[return-value]
+            queries, context, max_concurrency=max_concurrency
+        )
+
+    def authorized_users_stream(  # type: ignore[override]
+        self,
+        action: Action,
+        resource: Resource,
+        context: Optional[Context] = None,
+    ) -> Iterator[Tuple[str, List[AuthorizedUserRole]]]:
+        """
+        Queries all the users that are authorized to perform an action on a resource within the specified context,
+        and yields them one by one while the response of the PDP is still being received.
+
+        Unlike authorized_users(), the response is parsed incrementally into compact (non pydantic) objects,
+        so the memory used does not grow with the number of authorized users.
+        The results are not cached, and the query is not retried once users were yielded.
+
+        Args:
+            action: The action to be performed on the resource.
+            resource: The resource object representing the resource.
+            context: The context object representing the context in which the action is performed. Defaults to None.
+
+        Yields:
+            tuple[str, list[AuthorizedUserRole]]: the key of an authorized user,
+                and the role assignments that grant the user the permission.
+
+        Raises:
+            PermitConnectionError: If an error occurs while sending the authorization request to the PDP,
+                or if its response is not a valid authorized users result.
+
+        Examples:
+
+            # notify everyone in the organization that can read the announcement
+            for user_key, assignments in permit.authorized_users_stream('read', 'announcement:1234'):
+                notify(user_key)
+        """
+        # the response is streamed by an async generator, which is driven step by step on a private event loop
+        return iterate_async_sync(self._enforcer.authorized_users_stream(action, resource, context))
+
+    def authorized_user_assignments(  # type: ignore[override]
+        self,
+        user: User,
+        action: Action,
+        resource: Resource,
+        context: Optional[Context] = None,
+    ) -> List[AuthorizedUserAssignment]:
+        """
+        Queries the role assignments that authorize a user to perform an action on a resource within the specified context.
+        The lookup is served from the cached authorized users of the resource, if the `authorized_users_cache` is enabled.
+
+        Args:
+            user: The user object representing the user.
+            action: The action to be performed on the resource.
+            resource: The resource object representing the resource.
+            context: The context object representing the context in which the action is performed. Defaults to None.
+
+        Returns:
+            The role assignments that authorize the user, or an empty list if the user is not authorized.
+
+        Raises:
+            PermitConnectionError: If an error occurs while sending the authorization request to the PDP.
+
+        Examples:
+
+            # which roles allow elon to close the issue 1234?
+            assignments = permit.authorized_user_assignments('auth0|elon', 'close', 'issue:1234')
+            print([assignment.role for assignment in assignments])
+        """  # noqa: E501
+        return self._enforcer.authorized_user_assignments(user, action, resource, context)  # type: ignore[return-value]
+
     def bulk_check(  # type: ignore[override]
         self,
         checks: List[CheckQuery],
         context: Optional[Context] = None,
+        *,
+        retries: Optional[int] = None,
     ) -> List[bool]:
         """
         Checks if a user is authorized to perform an action on a list of resources within the specified context.
@@ -63,6 +178,8 @@ class Permit(AsyncPermit):
         Args:
             checks: A list of CheckQuery objects representing the authorization checks to be performed.
             context: The context object representing the context in which the action is performed. Defaults to None.
+            retries: The number of times a chunk of queries that failed transiently is retried,
+                overrides the bulk_check.chunk_retries config for this call.
 
         Returns:
             list[bool]: A list of booleans indicating whether the user is authorized for each resource.
@@ -91,7 +208,139 @@ class Permit(AsyncPermit):
                 },
             ])
         """
-        return self._enforcer.bulk_check(checks, context)  # type: ignore[return-value]
+        return self._enforcer.bulk_check(checks, context, retries=retries)  # type: ignore[return-value]
+
+    def bulk_check_stream(  # type: ignore[override]
+        self,
+        checks: Iterable[CheckQuery],
+        context: Optional[Context] = None,
+    ) -> Iterator[Tuple[int, CheckQuery, bool]]:
+        """
+        Checks a (possibly very large or lazily produced) stream of authorization queries, and yields
+        the decisions chunk by chunk as they arrive from the PDP.
+
+        The queries are consumed lazily and sent in chunks one after the other,
+        so the memory used does not grow with the number of queries.
+
+        Args:
+            checks: An iterable of check queries, each query contain user, action, and resource.
+            context: The context object representing the context in which the action is performed. Defaults to None.
+
+        Yields:
+            tuple[int, CheckQuery, bool]: the index of the query in the stream, the query and its decision.
+
+        Raises:
+            PermitConnectionError: If an error occurs while sending the authorization request to the PDP.
+
+        Examples:
+
+            for index, query, allowed in permit.bulk_check_stream(queries_from_db()):
+                if allowed:
+                    ...
+        """
+        offset = 0
+        for chunk in chunked(checks, max(self._config.bulk_check.chunk_size, 1)):
+            decisions: List[bool] = self._enforcer.bulk_check(chunk, context)  # type: ignore[assignment]
+            for i, (check, decision) in enumerate(zip(chunk, decisions)):
+                yield offset + i, check, decision
+            offset += len(chunk)
+
+    def allowed_actions(  # type: ignore[override]
+        self,
+        user: User,
+        resource: Resource,
+        actions: Optional[Iterable[Action]] = None,
+        context: Optional[Context] = None,
+        *,
+        retries: Optional[int] = None,
+    ) -> Set[Action]:
+        """
+        Checks which actions a user is authorized to perform on a resource within the specified context
+        (i.e: to decide which buttons to show for the resource).
+
+        The user, the resource and the context are normalized once and shared by the queries of all the actions,
+        which are sent to the PDP in a single bulk query (reusing cached decisions, if the decision cache is enabled).
+
+        Args:
+            user: The user object representing the user.
+            resource: The resource object representing the resource.
+            actions: The actions to check. Defaults to None, in which case all the actions defined on the resource type
+                are checked (as fetched from the Permit REST API, and cached for the resource_actions_ttl config).
+            context: The context object representing the context in which the actions are performed. Defaults to None.
+            retries: The number of times a chunk of queries that failed transiently is retried,
+                overrides the bulk_check.chunk_retries config for this call.
+
+        Returns:
+            set[str]: The actions the user is authorized to perform.
+
+        Raises:
+            PermitConnectionError: If an error occurs while sending the authorization request to the PDP.
+            PermitApiError: If the actions of the resource type cannot be fetched from the Permit REST API.
+
+        Examples:
+
+            # all the actions the user may perform on the issue 1234
+            permit.allowed_actions(user, 'issue:1234')
+
+            # which of the issue buttons should be shown to the user?
+            permit.allowed_actions(user, 'issue:1234', ['read', 'comment', 'close', 'delete'])
+        """
+        if actions is None:
+            resource_type = self._resource_type(resource)
+            actions = self._get_cached_resource_actions(resource_type)
+            if actions is None:
+                actions = self._cache_resource_actions(resource_type, self.api.resources.get(resource_type))
+        return self._enforcer.allowed_actions(user, resource, actions, context, retries=retries)  # type: ignore[return-value]
+
+    def filter_objects(  # type: ignore[override]
+        self,
+        user: User,
+        action: Action,
+        resources: Iterable[T],
+        key: Optional[Callable[[T], Resource]] = None,
+        context: Optional[Context] = None,
+        *,
+        type_level_check: bool = False,
+        retries: Optional[int] = None,
+    ) -> List[T]:
+        """
+        Filters a list of resources (or of objects representing resources) down to those the user
+        is authorized to perform an action on, within the specified context.
+
+        Repeated resources are only checked once, cached decisions (if the decision cache is enabled) are reused,
+        and the rest of the resources are checked in chunked bulk queries.
+
+        Args:
+            user: The user object representing the user.
+            action: The action to be performed on the resources.
+            resources: The resources to filter, or any objects the key function maps to resources.
+            key: A function returning the resource (a resource object or a 'type:key' string) of each object.
+                Defaults to None, in which case the objects themselves are the resources.
+            context: The context object representing the context in which the action is performed. Defaults to None.
+            type_level_check: Whether several instances of the same resource type (and tenant) are first checked
+                with a single type-level query: if the user may perform the action on any resource of the type,
+                the instances are allowed without being checked, otherwise they are checked individually
+                in a second round trip. Only enable it if a type-level allow implies that every instance is allowed
+                (i.e: RBAC policies), as it allows the instances that ABAC conditions on stored resource attributes
+                or ReBAC derived roles would deny. Instances given with attributes or with a resource context
+                are always checked individually. Defaults to False.
+            retries: The number of times a chunk of queries that failed transiently is retried,
+                overrides the bulk_check.chunk_retries config for this call.
+
+        Returns:
+            The objects the user is authorized on, in the order they were given.
+
+        Raises:
+            PermitConnectionError: If an error occurs while sending the authorization requests to the PDP.
+
+        Examples:
+
+            # the documents the user may read
+            documents = permit.filter_objects(user, 'read', documents, key=lambda doc: f'document:{doc.id}')
+        """
+        return self._enforcer.filter_objects(  # type: ignore[return-value]
+            user, action, resources, key, context, type_level_check=type_level_check, retries=retries
+        )
 
     def check(  # type: ignore[override]
         self,
@@ -99,6 +348,8 @@ class Permit(AsyncPermit):
         action: Action,
         resource: Resource,
         context: Optional[Context] = None,
+        *,
+        retries: Optional[int] = None,
     ) -> bool:
         """
         Checks if a user is authorized to perform an action on a resource within the specified context.
@@ -108,6 +359,8 @@ class Permit(AsyncPermit):
             action: The action to be performed on the resource.
             resource: The resource object representing the resource.
             context: The context object representing the context in which the action is performed. Defaults to None.
+            retries: The number of times the query is retried if it fails transiently,
+                overrides the retry config for this call.
 
         Returns:
             bool: True if the user is authorized, False otherwise.
@@ -127,4 +380,4 @@ class Permit(AsyncPermit):
             # (in a multi tenant application)
             permit.check(user, 'close', {'type': 'issue', 'tenant': 't1'})
         """
-        return self._enforcer.check(user, action, resource, context)  # type: ignore[return-value]
+        return self._enforcer.check(user, action, resource, context, retries=retries)  # type: ignore[return-value]
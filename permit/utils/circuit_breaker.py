@@ -0,0 +1,218 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from enum import Enum
+from typing import AsyncIterator, Callable, Deque, Dict, List, Optional, Tuple
+
+import aiohttp
+from loguru import logger
+
+from ..config import CircuitBreakerConfig, PermitConfig
+from ..exceptions import PermitApiError, PermitCircuitOpenError, PermitConnectionError, PermitLoadSheddingError
+from .pydantic_version import PYDANTIC_VERSION
+
+if PYDANTIC_VERSION < (2, 0):
+    from pydantic import BaseModel, Field
+else:
+    from pydantic.v1 import BaseModel, Field  # type: ignore
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    """
+    Requests are sent, and their outcome is tracked.
+    """
+
+    OPEN = "open"
+    """
+    Requests fail immediately, without being sent.
+    """
+
+    HALF_OPEN = "half_open"
+    """
+    A limited number of trial requests are sent, to find out whether the server recovered.
+    """
+
+
+# callback(circuit breaker name, previous state, new state)
+CircuitStateListener = Callable[[str, CircuitState, CircuitState], None]
+
+
+class CircuitBreakerStats(BaseModel):
+    state: CircuitState = Field(..., description="The current state of the circuit")
+    successes: int = Field(..., description="The number of requests that succeeded")
+    failures: int = Field(..., description="The number of requests that failed")
+    rejected: int = Field(..., description="The number of requests that failed fast while the circuit was open")
+    opened: int = Field(..., description="The number of times the circuit opened")
+
+
+def is_server_failure(error: BaseException) -> bool:
+    """
+    whether the error means the server is unavailable or failing (as opposed to rejecting a bad request)
+    """
+    if isinstance(error, PermitLoadSheddingError):
+        # the request was not sent, the SDK has too many requests in flight
+        return False
+    if isinstance(error, PermitConnectionError):
+        return error.status_code is None or error.status_code >= 500
+    if isinstance(error, PermitApiError):
+        return error.status_code >= 500
+    return isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError))
+
+
+class CircuitBreaker:
+    """
+    Stops sending requests to a server that keeps failing, so callers fail fast instead of waiting for timeouts.
+
+    The circuit opens once the failure rate of the recent requests crosses the configured threshold,
+    after open_duration seconds it lets a few trial requests through (half open), and closes again
+    if they succeed (or opens again if any of them fails).
+    """
+
+    def __init__(self, name: str, config: CircuitBreakerConfig):
+        self._name = name
+        self._config = config
+        self._state = CircuitState.CLOSED
+        # the outcomes (True if failed) of the recent requests, while the circuit is closed
+        self._outcomes: Deque[bool] = deque(maxlen=config.window_size)
+        self._opened_at = 0.0
+        self._trials = 0
+        self._trial_successes = 0
+        self._listeners: List[CircuitStateListener] = []
+        self._lock = threading.Lock()
+        self._successes = 0
+        self._failures = 0
+        self._rejected = 0
+        self._opened = 0
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def state(self) -> CircuitState:
+        return self._state
+
+    @property
+    def stats(self) -> CircuitBreakerStats:
+        with self._lock:
+            return CircuitBreakerStats(
+                state=self._state,
+                successes=self._successes,
+                failures=self._failures,
+                rejected=self._rejected,
+                opened=self._opened,
+            )
+
+    def add_listener(self, listener: CircuitStateListener) -> None:
+        """
+        Registers a callback that is called with (name, previous state, new state) whenever the circuit changes state.
+        """
+        self._listeners.append(listener)
+
+    @asynccontextmanager
+    async def guard(self) -> AsyncIterator[None]:
+        """
+        Guards a request: fails fast with PermitCircuitOpenError if the circuit is open,
+        and records the outcome of the request otherwise.
+        """
+        if not self._config.enable:
+            yield
+            return
+        self._acquire()
+        failed: Optional[bool] = None
+        try:
+            yield
+            failed = False
+        except asyncio.CancelledError:
+            # the request was abandoned, it has no outcome
+            raise
+        except BaseException as err:
+            failed = is_server_failure(err)
+            raise
+        finally:
+            self._release(failed=failed)
+
+    def _acquire(self) -> None:
+        with self._lock:
+            transition = None
+            if self._state == CircuitState.OPEN:
+                if time.monotonic() - self._opened_at < self._config.open_duration:
+                    self._rejected += 1
+                    raise PermitCircuitOpenError(
+                        f"the circuit to the {self._name} is open after repeated failures, failing fast"
+                    )
+                transition = self._transition(CircuitState.HALF_OPEN)
+            if self._state == CircuitState.HALF_OPEN:
+                if self._trials >= self._config.half_open_max_calls:
+                    self._rejected += 1
+                    raise PermitCircuitOpenError(
+                        f"the circuit to the {self._name} is half open, and its trial requests are in flight"
+                    )
+                self._trials += 1
+        self._notify(transition)
+
+    def _release(self, *, failed: Optional[bool]) -> None:
+        transition = None
+        with self._lock:
+            if failed is not None:
+                if failed:
+                    self._failures += 1
+                else:
+                    self._successes += 1
+            if self._state == CircuitState.HALF_OPEN:
+                self._trials = max(self._trials - 1, 0)
+                if failed:
+                    transition = self._transition(CircuitState.OPEN)
+                elif failed is not None:
+                    self._trial_successes += 1
+                    if self._trial_successes >= self._config.half_open_max_calls:
+                        transition = self._transition(CircuitState.CLOSED)
+            elif self._state == CircuitState.CLOSED and failed is not None:
+                self._outcomes.append(failed)
+                if len(self._outcomes) >= self._config.minimum_calls:
+                    failure_rate = sum(self._outcomes) / len(self._outcomes)
+                    if failure_rate >= self._config.failure_rate_threshold:
+                        transition = self._transition(CircuitState.OPEN)
+        self._notify(transition)
+
+    def _transition(self, state: CircuitState) -> Tuple[CircuitState, CircuitState]:
+        """
+        changes the state (must be called with the lock held), returns the (previous, new) states
+        """
+        previous, self._state = self._state, state
+        self._trials = 0
+        self._trial_successes = 0
+        if state == CircuitState.OPEN:
+            self._opened_at = time.monotonic()
+            self._opened += 1
+        elif state == CircuitState.CLOSED:
+            self._outcomes.clear()
+        return previous, state
+
+    def _notify(self, transition: Optional[Tuple[CircuitState, CircuitState]]) -> None:
+        if transition is None:
+            return
+        previous, state = transition
+        if state == CircuitState.OPEN:
+            logger.warning(f"the circuit to the {self._name} opened, requests will fail fast")
+        else:
+            logger.info(f"the circuit to the {self._name} is {state.value}")
+        for listener in self._listeners:
+            try:
+                listener(self._name, previous, state)
+            except Exception:  # noqa: BLE001
+                logger.exception(f"circuit breaker listener {listener!r} failed")
+
+
+def get_circuit_breaker(config: PermitConfig, name: str) -> CircuitBreaker:
+    """
+    returns the circuit breaker (shared by the SDK clients built with the given config) of the requests to a server,
+    either 'pdp' or 'api' (the Permit REST API).
+    """
+    circuit_breakers: Dict[str, CircuitBreaker] = config._circuit_breakers
+    if name not in circuit_breakers:
+        circuit_breakers[name] = CircuitBreaker(name, config.circuit_breaker)
+    return circuit_breakers[name]
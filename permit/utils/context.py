@@ -1,24 +1,139 @@
-from typing import Any, Callable, Dict, List
+from contextvars import ContextVar, Token
+from copy import deepcopy
+from typing import Any, Callable, Dict, List, NoReturn, Optional
 
-from .dicts import deep_merge
+from .dicts import deep_merge, shared_merge
 
 Context = Dict[str, Any]
 ContextTransform = Callable[[Context], Context]
 
 
+class _ReadOnlyContext(Dict[str, Any]):
+    """
+    a context shared by the derived contexts of many queries, which must not be mutated in place
+    """
+
+    def _refuse(self, *args, **kwargs) -> NoReturn:  # noqa: ARG002
+        raise TypeError("the derived authorization context is shared and read-only, copy it to modify it")
+
+    __setitem__ = __delitem__ = __ior__ = _refuse
+    clear = pop = popitem = setdefault = update = _refuse
+
+    def __copy__(self) -> Context:
+        return dict(self)
+
+    def __deepcopy__(self, memo: dict) -> Context:
+        return {key: deepcopy(value, memo) for key, value in self.items()}
+
+    def __reduce__(self):
+        return dict, (dict(self),)
+
+
+def _read_only(context: Context) -> Context:
+    """
+    returns the context with all its (nested) dicts read-only, the dicts that already are read-only are kept as is
+    """
+    if isinstance(context, _ReadOnlyContext):
+        return context
+    return _ReadOnlyContext(
+        {key: _read_only(value) if isinstance(value, dict) else value for key, value in context.items()}
+    )
+
+
+class _Scope:
+    __slots__ = ("_derived", "_derived_from", "context", "parent")
+
+    def __init__(self, context: Context, parent: Optional["_Scope"]):
+        self.context = context
+        self.parent = parent
+        self._derived: Context = {}
+        self._derived_from: Optional[Context] = None
+
+    def derive(self, base_context: Context) -> Context:
+        # computed once per scope, unless the base context was replaced while the scope is active
+        if self._derived_from is not base_context:
+            parent_context = base_context if self.parent is None else self.parent.derive(base_context)
+            self._derived = _read_only(shared_merge(parent_context, self.context))
+            self._derived_from = base_context
+        return self._derived
+
+
+class ContextScope:
+    """
+    a request scope of authorization context, see ContextStore.scope()
+    """
+
+    def __init__(self, store: "ContextStore", context: Context):
+        self._store = store
+        self._context = _read_only(deepcopy(context))
+        self._token: Optional[Token] = None
+
+    def __enter__(self) -> "ContextScope":
+        parent = self._store._scope.get()
+        self._token = self._store._scope.set(_Scope(self._context, parent))
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self._token is not None:
+            self._store._scope.reset(self._token)
+            self._token = None
+
+    async def __aenter__(self) -> "ContextScope":
+        return self.__enter__()
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.__exit__(*exc_info)
+
+
 class ContextStore:
+    """
+    holds the base context that is merged into the context of every authorization query.
+
+    the base context is copy-on-write: add() replaces it with a new merged dict and never mutates
+    the previous one, so derived contexts can safely share its values instead of deep copying them.
+    """
+
     def __init__(self):
-        self._base_context: Context = {}
+        self._base_context: Context = _read_only({})
         self._transforms: List[ContextTransform] = []
+        # the request scopes active in the current execution context (thread / asyncio task)
+        self._scope: ContextVar[Optional[_Scope]] = ContextVar(f"permit_context_scope_{id(self)}", default=None)
 
     def add(self, context: Context):
-        self._base_context = deep_merge(self._base_context, context)
+        self._base_context = _read_only(deep_merge(self._base_context, context))
 
     def register_transform(self, transform: ContextTransform):
         self._transforms.append(transform)
 
+    def scope(self, context: Context) -> ContextScope:
+        """
+        Opens a request scope: the given context is merged into the context of every authorization query
+        made within the scope (in the current thread or asyncio task), on top of the base context.
+
+        The merged context of the scope is computed once and reused by all the queries made within it.
+        Scopes can be nested, inner scopes override the context of outer scopes.
+
+        Usage example:
+
+            with permit.context_scope({"ip": request.client.host}):
+                await permit.check(user, 'read', 'document')
+        """
+        return ContextScope(self, context)
+
     def get_derived_context(self, context: Context) -> Context:
-        return deep_merge(self._base_context, context)
+        """
+        returns the base context (and the context of the active request scopes) merged with the context of a query.
+
+        only the dicts along the path of the keys of the query context are copied, every other value is shared
+        with the base context (which is read-only) and with the query context, so the cost of the derivation
+        grows with the size of the query context, not with the size of the base context.
+        without a query context, the (read-only) merged base context itself is returned.
+        """
+        base_context = self._base_context
+        scope = self._scope.get()
+        if scope is not None:
+            base_context = scope.derive(base_context)
+        return shared_merge(base_context, context)
 
     def transform(self, initial_context: Context) -> Context:
         context = initial_context.copy()
@@ -13,3 +13,20 @@ def deep_merge(base: Dict, overrides: Dict):
         else:
             result[key] = deep_merge(result[key], overrides[key])
     return result
+
+
+def shared_merge(base: Dict, overrides: Dict) -> Dict:
+    """
+    merges two dicts recursively without copying their values (copy-on-write):
+    only the dicts along the path of the overridden keys are copied, every other value
+    is shared with the inputs, so neither input may be mutated while the result is in use.
+    """
+    if not overrides:
+        return base
+    result = base.copy()
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(result.get(key), dict):
+            result[key] = shared_merge(result[key], value)
+        else:
+            result[key] = value
+    return result
@@ -0,0 +1,258 @@
+import asyncio
+import json
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from functools import lru_cache
+from typing import Any, AsyncIterator, Callable, Dict, Hashable, Iterator, Mapping, Optional, Tuple, cast
+
+import aiohttp
+import httpx
+from loguru import logger
+from multidict import CIMultiDict, CIMultiDictProxy
+from yarl import URL
+
+from ..config import HttpTransportConfig, PermitConfig
+
+# like the default total timeout of aiohttp, used when no timeout is configured
+DEFAULT_TIMEOUT = 300
+
+
+@lru_cache(maxsize=None)
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        logger.warning("http/2 requires the 'h2' package (pip install permit[http2]), falling back to http/1.1")
+        return False
+    return True
+
+
+@contextmanager
+def _as_aiohttp_errors() -> Iterator[None]:
+    """
+    raises httpx errors as the aiohttp errors they correspond to, so they are handled like aiohttp errors
+    (by the error handling, the retries and the circuit breakers of the SDK)
+    """
+    try:
+        yield
+    except httpx.TimeoutException as err:
+        raise asyncio.TimeoutError(str(err)) from err
+    except httpx.TransportError as err:
+        raise aiohttp.ClientConnectionError(str(err)) from err
+    except httpx.HTTPError as err:
+        raise aiohttp.ClientError(str(err)) from err
+
+
+class HttpxStreamReader:
+    """
+    The body of an httpx response, with the subset of the aiohttp.StreamReader interface used by the SDK.
+    """
+
+    def __init__(self, response: httpx.Response):
+        self._response = response
+
+    async def iter_chunked(self, n: int) -> AsyncIterator[bytes]:
+        with _as_aiohttp_errors():
+            async for chunk in self._response.aiter_bytes(n):
+                yield chunk
+
+
+class HttpxResponse:
+    """
+    An httpx response, with the subset of the aiohttp.ClientResponse interface used by the SDK.
+    """
+
+    def __init__(self, response: httpx.Response):
+        self._response = response
+
+    @property
+    def content(self) -> HttpxStreamReader:
+        return HttpxStreamReader(self._response)
+
+    @property
+    def status(self) -> int:
+        return self._response.status_code
+
+    @property
+    def headers(self) -> httpx.Headers:
+        return self._response.headers
+
+    @property
+    def url(self) -> URL:
+        return URL(str(self._response.url))
+
+    @property
+    def content_type(self) -> str:
+        return self.headers.get("content-type", "application/octet-stream").split(";")[0].strip().lower()
+
+    async def read(self) -> bytes:
+        with _as_aiohttp_errors():
+            return await self._response.aread()
+
+    async def text(self) -> str:
+        await self.read()
+        return self._response.text
+
+    async def json(self, *, loads: Callable[[str], Any] = json.loads, content_type: Optional[str] = "application/json"):
+        body = await self.read()
+        if content_type is not None and "json" not in self.content_type:
+            raise aiohttp.ContentTypeError(
+                self._request_info(),
+                (),
+                status=self.status,
+                message=f"Attempt to decode JSON with unexpected mimetype: {self.content_type}",
+                headers=CIMultiDictProxy(CIMultiDict(self.headers.items())),
+            )
+        if not body.strip():
+            return None
+        return loads(body.decode(self._response.encoding or "utf-8"))
+
+    def _request_info(self) -> aiohttp.RequestInfo:
+        request = self._response.request
+        url = URL(str(request.url))
+        return aiohttp.RequestInfo(url, request.method, CIMultiDictProxy(CIMultiDict(request.headers.items())), url)
+
+
+class HttpxSession:
+    """
+    An httpx client (http/2 by default, so concurrent requests share a single multiplexed connection),
+    with the subset of the aiohttp.ClientSession interface used by the SDK.
+    """
+
+    def __init__(
+        self,
+        *,
+        base_url: str = "",
+        headers: Optional[Mapping[str, str]] = None,
+        timeout: Optional[aiohttp.ClientTimeout] = None,
+        json_serialize: Callable[[Any], str] = json.dumps,
+        unix_socket_path: Optional[str] = None,
+        http2: bool = True,
+        limits: Optional[httpx.Limits] = None,
+    ):
+        self._json_serialize = json_serialize
+        http2 = http2 and _http2_available()
+        limits = limits or httpx.Limits()
+        transport = httpx.AsyncHTTPTransport(http2=http2, limits=limits, uds=unix_socket_path)
+        self._client = httpx.AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=(timeout.total if timeout is not None and timeout.total else DEFAULT_TIMEOUT),
+            transport=transport,
+        )
+
+    @property
+    def closed(self) -> bool:
+        return self._client.is_closed
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+    async def __aenter__(self) -> "HttpxSession":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    @asynccontextmanager
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        data: Optional[bytes] = None,
+        json: Any = None,
+        params: Optional[Mapping[str, Any]] = None,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> AsyncIterator[HttpxResponse]:
+        if json is not None:
+            data = self._json_serialize(json).encode()
+        request = self._client.build_request(method, url, content=data, params=params, headers=headers)
+        with _as_aiohttp_errors():
+            response = await self._client.send(request, stream=True)
+        try:
+            yield HttpxResponse(response)
+        finally:
+            await response.aclose()
+
+    def get(self, url: str, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url: str, **kwargs):
+        return self.request("PUT", url, **kwargs)
+
+    def patch(self, url: str, **kwargs):
+        return self.request("PATCH", url, **kwargs)
+
+    def delete(self, url: str, **kwargs):
+        return self.request("DELETE", url, **kwargs)
+
+    def as_aiohttp_session(self) -> aiohttp.ClientSession:
+        """
+        returns the session typed as the aiohttp session it stands in for
+        """
+        return cast(aiohttp.ClientSession, self)
+
+
+class HttpxSessionPool:
+    """
+    The long-lived httpx sessions shared by the REST API clients built with the same config,
+    one per server (and per event loop, as an httpx client is bound to the event loop it was used in).
+    """
+
+    def __init__(self, config: HttpTransportConfig):
+        self._config = config
+        self._sessions: Dict[Tuple[Hashable, asyncio.AbstractEventLoop], HttpxSession] = {}
+        self._lock = threading.Lock()
+
+    def get(self, client_config: Dict[str, Any], unix_socket_path: Optional[str] = None) -> HttpxSession:
+        """
+        returns the session of the server the client config (the kwargs of an aiohttp.ClientSession) points to
+        """
+        timeout = client_config.get("timeout")
+        key = (
+            client_config.get("base_url", ""),
+            tuple(sorted(client_config.get("headers", {}).items())),
+            timeout.total if timeout is not None else None,
+            unix_socket_path,
+        )
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            session = self._sessions.get((key, loop))
+            if session is not None and not session.closed:
+                return session
+            # the sessions of closed event loops (i.e: of the sync client) cannot be used anymore
+            for stale_key in [stale_key for stale_key in self._sessions if stale_key[1].is_closed()]:
+                del self._sessions[stale_key]
+            session = HttpxSession(
+                base_url=client_config.get("base_url", ""),
+                headers=client_config.get("headers"),
+                timeout=timeout,
+                json_serialize=client_config.get("json_serialize", json.dumps),
+                unix_socket_path=unix_socket_path,
+                http2=self._config.http2,
+            )
+            self._sessions[(key, loop)] = session
+            return session
+
+    async def aclose(self) -> None:
+        """
+        closes the sessions of the running event loop
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            sessions = [self._sessions.pop(key) for key in list(self._sessions) if key[1] is loop]
+        for session in sessions:
+            await session.close()
+
+
+def get_httpx_session_pool(config: PermitConfig) -> HttpxSessionPool:
+    """
+    returns the httpx sessions shared by the REST API clients built with the given config
+    """
+    if config._httpx_sessions is None:
+        config._httpx_sessions = HttpxSessionPool(config.http_transport)
+    return config._httpx_sessions
@@ -0,0 +1,32 @@
+from itertools import islice
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator, List, TypeVar, Union
+
+T = TypeVar("T")
+
+
+def chunked(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """
+    lazily splits an iterable into lists of (at most) size items
+    """
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+async def achunked(items: Union[Iterable[T], AsyncIterable[T]], size: int) -> AsyncIterator[List[T]]:
+    """
+    lazily splits a sync or async iterable into lists of (at most) size items
+    """
+    if not isinstance(items, AsyncIterable):
+        for sync_chunk in chunked(items, size):
+            yield sync_chunk
+        return
+
+    chunk: List[T] = []
+    async for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
@@ -0,0 +1,88 @@
+import json
+from functools import lru_cache
+from typing import Any, Union
+
+from loguru import logger
+from typing_extensions import Literal
+
+JsonCodecName = Literal["json", "orjson", "msgspec", "auto"]
+
+
+class JsonCodec:
+    """
+    encodes and decodes the json payloads sent to (and received from) the PDP and the Permit REST API.
+    the default implementation uses the python standard library json module.
+    """
+
+    name = "json"
+
+    def dumps(self, obj: Any) -> str:
+        return json.dumps(obj)
+
+    def dumps_bytes(self, obj: Any) -> bytes:
+        return self.dumps(obj).encode()
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(JsonCodec):
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+
+        self._orjson = orjson
+        # like the standard library, non-str dict keys (i.e: int) are serialized as strings
+        self._options = orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj: Any) -> str:
+        return self.dumps_bytes(obj).decode()
+
+    def dumps_bytes(self, obj: Any) -> bytes:
+        return self._orjson.dumps(obj, option=self._options)
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return self._orjson.loads(data)
+
+
+class MsgspecCodec(JsonCodec):
+    name = "msgspec"
+
+    def __init__(self):
+        import msgspec
+
+        self._encoder = msgspec.json.Encoder()
+        self._decoder = msgspec.json.Decoder()
+
+    def dumps(self, obj: Any) -> str:
+        return self.dumps_bytes(obj).decode()
+
+    def dumps_bytes(self, obj: Any) -> bytes:
+        return self._encoder.encode(obj)
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return self._decoder.decode(data)
+
+
+_CODECS = {codec.name: codec for codec in (OrjsonCodec, MsgspecCodec, JsonCodec)}
+
+
+@lru_cache(maxsize=None)
+def get_json_codec(name: JsonCodecName = "json") -> JsonCodec:
+    """
+    returns the json codec with the given name, 'auto' picks the fastest installed codec.
+    if the requested codec is not installed, the standard library codec is used instead.
+    """
+    if name == "auto":
+        for codec_class in _CODECS.values():
+            try:
+                return codec_class()
+            except ImportError:
+                continue
+    codec_class = _CODECS.get(name, JsonCodec)
+    try:
+        return codec_class()
+    except ImportError:
+        logger.warning(f"json codec '{name}' is not installed, falling back to the standard library json codec")
+        return JsonCodec()
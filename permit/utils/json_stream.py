@@ -0,0 +1,94 @@
+import codecs
+import json
+from typing import Any, AsyncIterable, AsyncIterator
+
+_WHITESPACE = " \t\n\r"
+
+
+class JsonStreamReader:
+    """
+    incrementally parses a json document received in chunks (i.e: an http response body),
+    so large documents can be consumed member by member without holding the whole document in memory.
+
+    the reader walks the document from its start: objects are iterated with members() and
+    every other value (including nested objects that are not walked) is read whole with value().
+    """
+
+    def __init__(self, chunks: AsyncIterable[bytes]):
+        self._chunks = chunks.__aiter__()
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json_decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._position = 0
+        self._exhausted = False
+
+    async def _fill(self) -> bool:
+        """
+        appends the next chunk to the buffer (dropping the part that was already parsed),
+        returns False if the document is exhausted
+        """
+        if self._exhausted:
+            return False
+        try:
+            chunk = await self._chunks.__anext__()
+        except StopAsyncIteration:
+            self._exhausted = True
+            text = self._decoder.decode(b"", final=True)
+        else:
+            text = self._decoder.decode(chunk)
+        self._buffer = self._buffer[self._position :] + text
+        self._position = 0
+        return True
+
+    async def _peek(self) -> str:
+        while True:
+            while self._position < len(self._buffer) and self._buffer[self._position] in _WHITESPACE:
+                self._position += 1
+            if self._position < len(self._buffer):
+                return self._buffer[self._position]
+            if not await self._fill():
+                raise ValueError("unexpected end of json document")
+
+    async def _expect(self, char: str) -> None:
+        if await self._peek() != char:
+            raise ValueError(f"expected '{char}' at position {self._position} of the json document")
+        self._position += 1
+
+    async def value(self) -> Any:
+        """
+        reads the next value of the document whole
+        """
+        await self._peek()
+        while True:
+            try:
+                value, end = self._json_decoder.raw_decode(self._buffer, self._position)
+            except json.JSONDecodeError:
+                # the value may be cut by the end of the buffer
+                if not await self._fill():
+                    raise
+                continue
+            # a value that ends the buffer may continue in the next chunk (i.e: the digits of a number)
+            if end < len(self._buffer) or self._exhausted:
+                self._position = end
+                return value
+            await self._fill()
+
+    async def members(self) -> AsyncIterator[str]:
+        """
+        iterates over the keys of the next object of the document, the value of each member
+        must be consumed (with value() or members()) before the iteration continues.
+        """
+        await self._expect("{")
+        if await self._peek() == "}":
+            self._position += 1
+            return
+        while True:
+            key = await self.value()
+            if not isinstance(key, str):
+                raise ValueError("expected an object key in the json document")
+            await self._expect(":")
+            yield key
+            if await self._peek() == "}":
+                self._position += 1
+                return
+            await self._expect(",")
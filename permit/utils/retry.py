@@ -0,0 +1,129 @@
+import asyncio
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Mapping, Optional, TypeVar
+
+import aiohttp
+from loguru import logger
+
+from ..config import PermitConfig, RetryConfig
+from ..exceptions import PermitApiError, PermitCircuitOpenError, PermitConnectionError
+
+T = TypeVar("T")
+
+
+def parse_retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    """
+    returns the delay in seconds requested by the Retry-After header (either seconds or an http date), if any
+    """
+    value = headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryBudget:
+    """
+    Limits the retries to a ratio of the requests (plus a small number of retries per second),
+    so retries cannot multiply the load on a server that is already failing.
+    """
+
+    def __init__(self, ratio: float, min_per_second: float):
+        self._ratio = ratio
+        self._min_per_second = min_per_second
+        self._max_tokens = max(min_per_second, 10.0)
+        self._tokens = self._max_tokens
+        self._refilled_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        with self._lock:
+            self._tokens = min(self._tokens + self._ratio, self._max_tokens)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self._tokens + (now - self._refilled_at) * self._min_per_second, self._max_tokens)
+            self._refilled_at = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+class RetryPolicy:
+    """
+    Retries idempotent requests that failed transiently (connection errors, and the configured status codes),
+    with exponential backoff and full jitter, honoring the Retry-After header of the server.
+    """
+
+    def __init__(self, config: RetryConfig):
+        self._config = config
+        self._budget = RetryBudget(config.budget_ratio, config.min_retries_per_second)
+
+    def is_retryable(self, error: BaseException) -> bool:
+        if isinstance(error, PermitCircuitOpenError):
+            return False
+        if isinstance(error, PermitConnectionError):
+            if error.status_code is not None:
+                return error.status_code in self._config.retry_status_codes
+            return isinstance(error.original_error, aiohttp.ClientConnectionError)
+        if isinstance(error, PermitApiError):
+            return error.status_code in self._config.retry_status_codes
+        return isinstance(error, aiohttp.ClientConnectionError)
+
+    def _retry_delay(self, error: BaseException, attempt: int) -> Optional[float]:
+        """
+        returns the time to wait before the next attempt, or None if the server asked to wait for too long
+        """
+        retry_after = None
+        if isinstance(error, PermitConnectionError):
+            retry_after = error.retry_after
+        elif isinstance(error, PermitApiError):
+            retry_after = parse_retry_after(error.response.headers)
+        if retry_after is not None:
+            return retry_after if retry_after <= self._config.max_retry_after else None
+        backoff = min(self._config.initial_backoff * (2**attempt), self._config.max_backoff)
+        return random.uniform(0, backoff)
+
+    async def run(self, call: Callable[[], Awaitable[T]], *, retries: Optional[int] = None) -> T:
+        """
+        runs the call, retrying it if it fails transiently.
+
+        Args:
+            call: The idempotent request to run.
+            retries: The maximum number of retries of this call, overriding the configured policy.
+        """
+        max_retries = retries if retries is not None else (self._config.max_retries if self._config.enable else 0)
+        self._budget.deposit()
+        attempt = 0
+        while True:
+            try:
+                return await call()
+            except (PermitConnectionError, PermitApiError, aiohttp.ClientError) as err:
+                if attempt >= max_retries or not self.is_retryable(err):
+                    raise
+                delay = self._retry_delay(err, attempt)
+                if delay is None or not self._budget.withdraw():
+                    raise
+                attempt += 1
+                logger.warning(f"request failed transiently, retrying in {delay:.3f}s (attempt {attempt}): {err}")
+                await asyncio.sleep(delay)
+
+
+def get_retry_policy(config: PermitConfig) -> RetryPolicy:
+    """
+    returns the retry policy (and retry budget) shared by the SDK clients built with the given config
+    """
+    if config._retry_policy is None:
+        config._retry_policy = RetryPolicy(config.retry)
+    return config._retry_policy
@@ -1,8 +1,9 @@
 import asyncio
+import inspect
 import threading
 from asyncio import iscoroutinefunction
 from functools import wraps
-from typing import Any, Awaitable, Callable, Coroutine, TypeVar
+from typing import Any, AsyncIterator, Awaitable, Callable, Coroutine, Iterator, TypeVar
 
 from typing_extensions import ParamSpec, TypeGuard
 
@@ -22,6 +23,26 @@ def run_coroutine_sync(coroutine: Coroutine[Any, Any, T]) -> T:
         return asyncio.run_coroutine_threadsafe(coroutine, loop).result()
 
 
+def iterate_async_sync(iterator: AsyncIterator[T]) -> Iterator[T]:
+    """
+    consumes an async iterator synchronously, item by item, on a private event loop
+    (the steps of an async generator must all run on the same loop, unlike independent coroutines)
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(iterator.__anext__())
+            except StopAsyncIteration:
+                return
+    finally:
+        aclose = getattr(iterator, "aclose", None)
+        if aclose is not None:
+            loop.run_until_complete(aclose())
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.close()
+
+
 def async_to_sync(func: Callable[P, Coroutine[Any, Any, T]]) -> Callable[P, T]:
     @wraps(func)
     def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
@@ -44,6 +65,9 @@ class SyncClass(type):
                 continue
 
             attr = getattr(class_obj, name)
+            if inspect.isasyncgenfunction(attr):
+                # async generators cannot be consumed synchronously in a single call
+                continue
             if attr.__class__.__name__ in ("cython_function_or_method", "function"):
                 # Handle cython method
                 is_coroutine = True
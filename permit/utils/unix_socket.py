@@ -0,0 +1,18 @@
+from typing import Optional, Tuple
+
+UNIX_SOCKET_SCHEME = "unix://"
+# the base url of the requests sent over a unix domain socket (the socket replaces the host and port)
+UNIX_SOCKET_BASE_URL = "http://localhost"
+
+
+def split_unix_socket_url(url: str) -> Tuple[str, Optional[str]]:
+    """
+    splits a 'unix:///path/to/pdp.sock' url into the base url of the requests and the path of the socket,
+    urls of other schemes (i.e: http) are returned as is, without a socket path.
+    """
+    if not url.startswith(UNIX_SOCKET_SCHEME):
+        return url, None
+    socket_path = url[len(UNIX_SOCKET_SCHEME) :]
+    if not socket_path:
+        raise ValueError(f"invalid unix socket url '{url}', expected 'unix:///path/to/pdp.sock'")
+    return UNIX_SOCKET_BASE_URL, socket_path
@@ -26,6 +26,11 @@ setup(
     python_requires=">=3.8",
     description="Permit.io python sdk",
     install_requires=get_requirements(),
+    extras_require={
+        "orjson": ["orjson>=3.8,<4"],
+        "msgspec": ["msgspec>=0.18,<1"],
+        "http2": ["httpx[http2]>=0.24.1,<1"],
+    },
     long_description=get_readme(),
     long_description_content_type="text/markdown",
     classifiers=[
@@ -1,11 +1,25 @@
 import os
+from typing import AsyncIterator, Iterator
 
 import pytest
+from pytest_httpserver import HTTPServer
 
 from permit import Permit, PermitConfig
 from permit.sync import Permit as SyncPermit
 
 
+@pytest.fixture
+def threaded_httpserver() -> Iterator[HTTPServer]:
+    """
+    a mocked server that answers its requests concurrently (i.e: so slow responses do not block the others)
+    """
+    server = HTTPServer(threaded=True)
+    server.start()
+    yield server
+    server.clear()
+    server.stop()
+
+
 @pytest.fixture
 def permit_config() -> PermitConfig:
     default_pdp_address = (
@@ -32,8 +46,9 @@ def permit_config() -> PermitConfig:
 
 
 @pytest.fixture
-def permit(permit_config: PermitConfig) -> Permit:
-    return Permit(permit_config)
+async def permit(permit_config: PermitConfig) -> AsyncIterator[Permit]:
+    async with Permit(permit_config) as permit:
+        yield permit
 
 
 @pytest.fixture
@@ -62,5 +77,6 @@ def permit_config_cloud() -> PermitConfig:
 
 
 @pytest.fixture
-def permit_cloud(permit_config_cloud: PermitConfig) -> Permit:
-    return Permit(permit_config_cloud)
+async def permit_cloud(permit_config_cloud: PermitConfig) -> AsyncIterator[Permit]:
+    async with Permit(permit_config_cloud) as permit:
+        yield permit
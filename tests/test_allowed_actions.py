@@ -0,0 +1,87 @@
+import json
+from typing import List
+from uuid import uuid4
+
+from pytest_httpserver import HTTPServer
+from werkzeug import Request, Response
+
+from permit import Permit
+
+from .utils import mocked_permit
+
+
+SCOPE = {"organization_id": str(uuid4()), "project_id": str(uuid4()), "environment_id": str(uuid4())}
+
+
+def mocked_pdp(httpserver: HTTPServer) -> List[List[dict]]:
+    """
+    the user may perform the read and comment actions
+    """
+    calls = []
+
+    def handler(request: Request):
+        queries = request.get_json()
+        calls.append(queries)
+        body = {"allow": [{"allow": query["action"] in ("read", "comment")} for query in queries]}
+        return Response(json.dumps(body), status=200, content_type="application/json")
+
+    httpserver.expect_request("/allowed/bulk").respond_with_handler(handler)
+    return calls
+
+
+def mocked_schema(httpserver: HTTPServer, actions: List[str]) -> None:
+    httpserver.expect_request("/v2/api-key/scope").respond_with_json(SCOPE)
+    httpserver.expect_request(
+        f"/v2/schema/{SCOPE['project_id']}/{SCOPE['environment_id']}/resources/issue"
+    ).respond_with_json(
+        {
+            "key": "issue",
+            "name": "Issue",
+            "id": str(uuid4()),
+            "created_at": "2024-01-01T00:00:00",
+            "updated_at": "2024-01-01T00:00:00",
+            "actions": {action: {"id": str(uuid4())} for action in actions},
+            **SCOPE,
+        }
+    )
+
+
+async def test_allowed_actions(httpserver: HTTPServer):
+    calls = mocked_pdp(httpserver)
+    async with mocked_permit(httpserver) as permit:
+        allowed = await permit.allowed_actions(
+            {"key": "user", "attributes": {"age": 30}}, "issue:1", ["read", "comment", "close", "delete", "read"]
+        )
+    assert allowed == {"read", "comment"}
+    # the actions are checked in a single round trip, sharing the same user, resource and context
+    (queries,) = calls
+    assert [query["action"] for query in queries] == ["read", "comment", "close", "delete"]
+    assert all(query["user"] == queries[0]["user"] and query["resource"] == queries[0]["resource"] for query in queries)
+    assert queries[0]["resource"] == {
+        "type": "issue",
+        "key": "1",
+        "tenant": "default",
+        "context": {"tenant": "default"},
+    }
+
+
+async def test_allowed_actions_of_the_resource_type(httpserver: HTTPServer):
+    calls = mocked_pdp(httpserver)
+    mocked_schema(httpserver, ["read", "comment", "close"])
+    url = httpserver.url_for("").rstrip("/")
+    async with Permit(token="mocked", pdp=url, api_url=url) as permit:
+        assert await permit.allowed_actions("user", "issue:1") == {"read", "comment"}
+        assert await permit.allowed_actions("user", {"type": "issue", "key": "2"}) == {"read", "comment"}
+    assert [[query["action"] for query in queries] for queries in calls] == [["read", "comment", "close"]] * 2
+    # the actions of the resource type were fetched once
+    schema_requests = [request for request, _ in httpserver.log if "/v2/schema/" in request.path]
+    assert len(schema_requests) == 1
+
+
+async def test_allowed_actions_uses_the_decision_cache(httpserver: HTTPServer):
+    calls = mocked_pdp(httpserver)
+    async with mocked_permit(httpserver, decision_cache={"enable": True}) as permit:
+        assert await permit.allowed_actions("user", "issue:1", ["read", "close"]) == {"read"}
+        assert await permit.allowed_actions("user", "issue:1", ["read", "close", "comment"]) == {"read", "comment"}
+        assert await permit.allowed_actions("user", "issue:1", []) == set()
+    assert [[query["action"] for query in queries] for queries in calls] == [["read", "close"], ["comment"]]
@@ -0,0 +1,111 @@
+import json
+from uuid import uuid4
+
+from pytest_httpserver import HTTPServer
+from werkzeug import Request, Response
+
+from permit import Permit
+from permit.config import AuthorizedUsersCacheConfig
+from permit.enforcement.cache import AuthorizedUsersCache
+from permit.enforcement.interfaces import AuthorizedUsersResult
+
+from .utils import mocked_permit
+
+
+def authorized_users(request: Request) -> dict:
+    query = request.get_json()
+    resource = query["resource"]
+    resource_id = f"{resource['type']}:{resource.get('key', '*')}"
+    tenant = resource.get("tenant", "default")
+    return {
+        "resource": resource_id,
+        "tenant": tenant,
+        "users": {
+            "elon": [
+                {"user": "elon", "tenant": tenant, "resource": resource_id, "role": "admin"},
+                {"user": "elon", "tenant": tenant, "resource": resource_id, "role": "editor"},
+            ],
+            "jeff": [{"user": "jeff", "tenant": tenant, "resource": resource_id, "role": "viewer"}],
+        },
+    }
+
+
+def mocked_pdp(httpserver: HTTPServer) -> list:
+    calls = []
+
+    def handler(request: Request):
+        calls.append(request.get_json())
+        return Response(json.dumps(authorized_users(request)), status=200, content_type="application/json")
+
+    httpserver.expect_request("/authorized_users").respond_with_handler(handler)
+    return calls
+
+
+async def test_authorized_users_are_cached_and_indexed(httpserver: HTTPServer):
+    calls = mocked_pdp(httpserver)
+    async with mocked_permit(httpserver, authorized_users_cache={"enable": True}) as permit:
+        result = await permit.authorized_users("read", "document:1")
+        assert set(result.users) == {"elon", "jeff"}
+        assert await permit.authorized_users("read", "document:1") is result
+
+        assignments = await permit.authorized_user_assignments("elon", "read", "document:1")
+        assert [assignment.role for assignment in assignments] == ["admin", "editor"]
+        assert await permit.authorized_user_assignments({"key": "bill"}, "read", "document:1") == []
+        assert len(calls) == 1
+
+        await permit.authorized_users("delete", "document:1")
+        assert len(calls) == 2
+        assert permit.authorized_users_cache.stats.hits == 3
+
+
+async def test_authorized_users_are_not_cached_by_default(httpserver: HTTPServer):
+    calls = mocked_pdp(httpserver)
+    async with mocked_permit(httpserver) as permit:
+        await permit.authorized_users("read", "document:1")
+        assert [a.role for a in await permit.authorized_user_assignments("jeff", "read", "document:1")] == ["viewer"]
+    assert len(calls) == 2
+
+
+async def test_api_writes_invalidate_cached_authorized_users(httpserver: HTTPServer):
+    mocked_pdp(httpserver)
+    scope = {"organization_id": str(uuid4()), "project_id": str(uuid4()), "environment_id": str(uuid4())}
+    httpserver.expect_request("/v2/api-key/scope").respond_with_json(scope)
+    httpserver.expect_request("/facts/users/bill/roles", method="POST").respond_with_json(
+        {
+            "id": str(uuid4()),
+            "user": "bill",
+            "role": "admin",
+            "tenant": "tesla",
+            "user_id": str(uuid4()),
+            "role_id": str(uuid4()),
+            "tenant_id": str(uuid4()),
+            "organization_id": scope["organization_id"],
+            "project_id": scope["project_id"],
+            "environment_id": scope["environment_id"],
+            "created_at": "2024-01-01T00:00:00",
+        }
+    )
+    url = httpserver.url_for("").rstrip("/")
+    async with Permit(
+        token="mocked", pdp=url, api_url=url, proxy_facts_via_pdp=True, authorized_users_cache={"enable": True}
+    ) as permit:
+        await permit.authorized_users("read", {"type": "document", "key": "1", "tenant": "tesla"})
+        await permit.authorized_users("read", {"type": "document", "key": "1", "tenant": "spacex"})
+        assert permit.authorized_users_cache.stats.entries == 2
+
+        # bill is in none of the cached results, but the new role may add him to those of the tenant
+        await permit.api.users.assign_role({"user": "bill", "role": "admin", "tenant": "tesla"})
+        assert permit.authorized_users_cache.stats.entries == 1
+
+
+def test_cache_invalidation_by_resource():
+    cache = AuthorizedUsersCache(AuthorizedUsersCacheConfig(enable=True))
+    for resource_key in ("1", "2"):
+        query = {"action": "read", "resource": {"type": "document", "key": resource_key}, "context": {}}
+        cache.set(
+            AuthorizedUsersCache.key_for(query),
+            AuthorizedUsersResult(resource=f"document:{resource_key}", tenant="default", users={}),
+        )
+    assert cache.invalidate(resource="document:1") == 1
+    assert cache.invalidate(resource="document") == 1
+    assert cache.stats.entries == 0
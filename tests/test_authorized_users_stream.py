@@ -0,0 +1,110 @@
+import json
+from typing import AsyncIterator, List
+
+import pytest
+from pytest_httpserver import HTTPServer
+from werkzeug import Request, Response
+
+from permit import AuthorizedUserRole, PermitConnectionError
+from permit.utils.json_stream import JsonStreamReader
+
+from .utils import mocked_permit
+
+
+USERS = 2_000
+
+
+def authorized_users(request: Request) -> Response:
+    resource = request.get_json()["resource"]
+    resource_id = f"{resource['type']}:{resource.get('key', '*')}"
+    users = {
+        f"user{i}": [{"user": f"user{i}", "tenant": "default", "resource": resource_id, "role": "viewer"}]
+        for i in range(USERS)
+    }
+    users["user0"].append({"user": "user0", "tenant": "default", "resource": resource_id, "role": "admin"})
+    body = json.dumps({"resource": resource_id, "tenant": "default", "users": users}, indent=2)
+    return Response(body, status=200, content_type="application/json")
+
+
+@pytest.mark.parametrize("http_transport", [{"backend": "aiohttp"}, {"backend": "httpx"}])
+async def test_authorized_users_stream(httpserver: HTTPServer, http_transport: dict):
+    httpserver.expect_request("/authorized_users").respond_with_handler(authorized_users)
+    async with mocked_permit(httpserver, http_transport=http_transport) as permit:
+        streamed = {user: roles async for user, roles in permit.authorized_users_stream("read", "document:1")}
+        result = await permit.authorized_users("read", "document:1")
+    assert len(streamed) == USERS
+    assert streamed["user0"] == [
+        AuthorizedUserRole(tenant="default", resource="document:1", role="viewer"),
+        AuthorizedUserRole(tenant="default", resource="document:1", role="admin"),
+    ]
+    assert streamed == {
+        user: [AuthorizedUserRole(a.tenant, a.resource, a.role) for a in assignments]
+        for user, assignments in result.users.items()
+    }
+
+
+async def test_authorized_users_stream_releases_the_pdp_once_answered(httpserver: HTTPServer):
+    httpserver.expect_request("/authorized_users").respond_with_handler(authorized_users)
+    httpserver.expect_request("/allowed").respond_with_json({"allow": True})
+    async with mocked_permit(
+        httpserver,
+        pdp_concurrency_limit={"enable": True, "initial_limit": 1, "max_limit": 1},
+        circuit_breaker={"enable": True},
+    ) as permit:
+        streamed = 0
+        async for _ in permit.authorized_users_stream("read", "document:1"):
+            if streamed == 0:
+                # the stream does not hold the only concurrency limit slot while the users are consumed
+                assert permit.pdp_concurrency_limiter.stats.in_flight == 0
+                assert await permit.check("user", "read", "document:1")
+            streamed += 1
+        assert streamed == USERS
+        assert permit.circuit_breakers["pdp"].stats.successes == 2
+
+
+async def test_authorized_users_stream_errors(httpserver: HTTPServer):
+    httpserver.expect_request(
+        "/authorized_users", json={"action": "read", "resource": {"type": "document", "key": "1"}, "context": {}}
+    ).respond_with_data(
+        '{"resource": "document:1", "users": {"user0": [{"role": "viewer"}]}}', content_type="application/json"
+    )
+    httpserver.expect_request("/authorized_users").respond_with_response(
+        Response(json.dumps({"detail": "error"}), status=500, content_type="application/json")
+    )
+    async with mocked_permit(httpserver) as permit:
+        with pytest.raises(PermitConnectionError):
+            async for _ in permit.authorized_users_stream("read", "document:1"):
+                pass
+        with pytest.raises(PermitConnectionError) as error:
+            async for _ in permit.authorized_users_stream("read", "document:2"):
+                pass
+        assert error.value.status_code == 500
+
+
+async def read_document(document: str, chunk_size: int) -> List:
+    async def chunks() -> AsyncIterator[bytes]:
+        data = document.encode()
+        for i in range(0, len(data), chunk_size):
+            yield data[i : i + chunk_size]
+
+    reader = JsonStreamReader(chunks())
+    members = []
+    async for key in reader.members():
+        if key == "nested":
+            members.append((key, [(nested_key, await reader.value()) async for nested_key in reader.members()]))
+        else:
+            members.append((key, await reader.value()))
+    return members
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 1024])
+async def test_json_stream_reader(chunk_size: int):
+    document = '{ "number" : 12345, "text": "héllo \\" wörld", "nested": {"a": [1, {"b": null}], "c": {}}, "e": {} }'
+    assert await read_document(document, chunk_size) == [
+        ("number", 12345),
+        ("text", 'héllo " wörld'),
+        ("nested", [("a", [1, {"b": None}]), ("c", {})]),
+        ("e", {}),
+    ]
+    with pytest.raises(ValueError):
+        await read_document('{"number": 1, "text": "cut', chunk_size)
@@ -0,0 +1,101 @@
+import asyncio
+import json
+from typing import List
+
+import pytest
+from aiohttp import web
+from pytest_httpserver import HTTPServer
+from werkzeug import Request, Response
+
+from permit import Permit, PermitConnectionError
+
+from .utils import mocked_permit
+
+
+def authorized_users(query: dict) -> dict:
+    resource = query["resource"]
+    resource_id = f"{resource['type']}:{resource.get('key', '*')}"
+    tenant = resource.get("tenant", "default")
+    user = "admin" if query["action"] == "delete" else "reader"
+    return {
+        "resource": resource_id,
+        "tenant": tenant,
+        "users": {user: [{"user": user, "tenant": tenant, "resource": resource_id, "role": user}]},
+    }
+
+
+def mocked_pdp(httpserver: HTTPServer) -> List[dict]:
+    calls = []
+
+    def handler(request: Request):
+        calls.append(request.get_json())
+        return Response(json.dumps(authorized_users(request.get_json())), status=200, content_type="application/json")
+
+    httpserver.expect_request("/authorized_users").respond_with_handler(handler)
+    return calls
+
+
+async def test_bulk_authorized_users(httpserver: HTTPServer):
+    calls = mocked_pdp(httpserver)
+    async with mocked_permit(httpserver) as permit:
+        results = await permit.bulk_authorized_users(
+            [
+                ("read", "document:1"),
+                ("delete", "document:1"),
+                ("read", {"type": "document", "key": "1"}),
+                ("read", "document:1"),
+                ("read", {"type": "document", "key": "2", "tenant": "tesla"}),
+            ]
+        )
+    # the same query given twice, and given as both a string and a resource object, is only sent once
+    assert len(calls) == 3
+    assert set(results) == {
+        ("read", "document:1"),
+        ("delete", "document:1"),
+        ("read", "document:1, tenant: default"),
+        ("read", "document:2, tenant: tesla"),
+    }
+    assert set(results[("read", "document:1")].users) == {"reader"}
+    assert set(results[("delete", "document:1")].users) == {"admin"}
+    assert results[("read", "document:2, tenant: tesla")].tenant == "tesla"
+
+
+async def test_bulk_authorized_users_concurrency_is_bounded():
+    in_flight, max_in_flight = 0, 0
+
+    async def handler(request: web.Request) -> web.Response:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return web.json_response(authorized_users(await request.json()))
+
+    app = web.Application()
+    app.router.add_post("/authorized_users", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    try:
+        port = site._server.sockets[0].getsockname()[1]
+        async with Permit(token="mocked", pdp=f"http://127.0.0.1:{port}") as permit:
+            results = await permit.bulk_authorized_users(
+                [("read", f"document:{i}") for i in range(20)], max_concurrency=3
+            )
+    finally:
+        await runner.cleanup()
+    assert len(results) == 20
+    assert max_in_flight == 3
+
+
+async def test_bulk_authorized_users_fails_as_a_whole(httpserver: HTTPServer):
+    def handler(request: Request):
+        if request.get_json()["resource"].get("key") == "broken":
+            return Response(json.dumps({"detail": "error"}), status=500, content_type="application/json")
+        return Response(json.dumps(authorized_users(request.get_json())), status=200, content_type="application/json")
+
+    httpserver.expect_request("/authorized_users").respond_with_handler(handler)
+    async with mocked_permit(httpserver) as permit:
+        with pytest.raises(PermitConnectionError):
+            await permit.bulk_authorized_users([("read", "document:1"), ("read", "document:broken")])
@@ -0,0 +1,110 @@
+import json
+from collections import Counter
+
+import pytest
+from pytest_httpserver import HTTPServer
+from werkzeug import Request, Response
+
+from permit import PermitConnectionError
+from permit.sync import Permit as SyncPermit
+
+from .utils import mocked_permit
+
+
+def checks(count: int):
+    return [{"user": f"user-{i}", "action": "read", "resource": f"document:{i}"} for i in range(count)]
+
+
+def allow_even_documents(queries):
+    return Response(
+        json.dumps({"allow": [{"allow": int(query["resource"]["key"]) % 2 == 0} for query in queries]}),
+        status=200,
+        content_type="application/json",
+    )
+
+
+async def test_bulk_check_is_chunked_in_order(httpserver: HTTPServer):
+    chunks = []
+
+    def handler(request: Request):
+        queries = request.get_json()
+        chunks.append(len(queries))
+        return allow_even_documents(queries)
+
+    httpserver.expect_request("/allowed/bulk").respond_with_handler(handler)
+    async with mocked_permit(httpserver, bulk_check={"chunk_size": 10, "max_concurrency": 2}) as permit:
+        decisions = await permit.bulk_check(checks(25))
+    assert decisions == [i % 2 == 0 for i in range(25)]
+    assert sorted(chunks) == [5, 10, 10]
+
+
+async def test_only_failed_chunk_is_retried(httpserver: HTTPServer):
+    attempts = Counter()
+
+    def handler(request: Request):
+        queries = request.get_json()
+        first_key = queries[0]["resource"]["key"]
+        attempts[first_key] += 1
+        if first_key == "10" and attempts[first_key] == 1:
+            return Response(json.dumps({"detail": "unavailable"}), status=503, content_type="application/json")
+        return allow_even_documents(queries)
+
+    httpserver.expect_request("/allowed/bulk").respond_with_handler(handler)
+    async with mocked_permit(httpserver, bulk_check={"chunk_size": 10}, retry={"enable": True}) as permit:
+        decisions = await permit.bulk_check(checks(30))
+    assert decisions == [i % 2 == 0 for i in range(30)]
+    assert attempts == {"0": 1, "10": 2, "20": 1}
+
+
+async def test_chunks_are_not_retried_when_retries_are_disabled(httpserver: HTTPServer):
+    attempts = []
+
+    def handler(request: Request):
+        attempts.append(request.get_json())
+        return Response(json.dumps({"detail": "unavailable"}), status=503, content_type="application/json")
+
+    httpserver.expect_request("/allowed/bulk").respond_with_handler(handler)
+    async with mocked_permit(httpserver, bulk_check={"chunk_size": 10}, retry={"enable": False}) as permit:
+        with pytest.raises(PermitConnectionError):
+            await permit.bulk_check(checks(5))
+    assert len(attempts) == 1
+
+
+async def test_bulk_check_fails_when_retries_are_exhausted(httpserver: HTTPServer):
+    httpserver.expect_request("/allowed/bulk").respond_with_json({"detail": "unavailable"}, status=503)
+    async with mocked_permit(httpserver, bulk_check={"chunk_size": 10, "chunk_retries": 0}) as permit:
+        with pytest.raises(PermitConnectionError):
+            await permit.bulk_check(checks(15))
+
+
+async def test_bulk_check_stream_consumes_queries_lazily(httpserver: HTTPServer):
+    httpserver.expect_request("/allowed/bulk").respond_with_handler(
+        lambda request: allow_even_documents(request.get_json())
+    )
+    consumed = []
+
+    async def queries():
+        for check in checks(100):
+            consumed.append(check)
+            yield check
+
+    async with mocked_permit(httpserver, bulk_check={"chunk_size": 10, "max_concurrency": 2}) as permit:
+        results = []
+        async for index, query, decision in permit.bulk_check_stream(queries()):
+            if not results:
+                # only the chunks in flight (and the one waiting for a free slot) were read
+                assert len(consumed) <= 30
+            results.append((index, query, decision))
+
+    assert sorted(index for index, _, _ in results) == list(range(100))
+    assert all(query["resource"] == f"document:{index}" for index, query, _ in results)
+    assert all(decision == (index % 2 == 0) for index, _, decision in results)
+
+
+def test_sync_bulk_check_stream(httpserver: HTTPServer):
+    httpserver.expect_request("/allowed/bulk").respond_with_handler(
+        lambda request: allow_even_documents(request.get_json())
+    )
+    permit = SyncPermit(token="mocked", pdp=httpserver.url_for("").rstrip("/"), bulk_check={"chunk_size": 4})
+    results = list(permit.bulk_check_stream(iter(checks(10))))
+    assert [(index, decision) for index, _, decision in results] == [(i, i % 2 == 0) for i in range(10)]
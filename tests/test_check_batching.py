@@ -0,0 +1,62 @@
+import asyncio
+import json
+
+from pytest_httpserver import HTTPServer
+from werkzeug import Request, Response
+
+from permit import PermitConnectionError
+
+from .utils import mocked_permit
+
+
+def allow_readers(request: Request):
+    queries = request.get_json()
+    return Response(
+        json.dumps({"allow": [{"allow": query["action"] == "read"} for query in queries]}),
+        status=200,
+        content_type="application/json",
+    )
+
+
+async def test_concurrent_checks_are_batched(httpserver: HTTPServer):
+    batches = []
+
+    def handler(request: Request):
+        batches.append(request.get_json())
+        return allow_readers(request)
+
+    httpserver.expect_request("/allowed/bulk").respond_with_handler(handler)
+    async with mocked_permit(httpserver, check_batching={"enable": True, "max_delay": 0.05}) as permit:
+        decisions = await asyncio.gather(
+            *[permit.check(f"user-{i}", "read" if i % 2 else "write", "document") for i in range(6)]
+        )
+        assert decisions == [False, True, False, True, False, True]
+        assert len(batches) == 1
+        assert [query["user"]["key"] for query in batches[0]] == [f"user-{i}" for i in range(6)]
+
+
+async def test_full_batch_is_sent_right_away(httpserver: HTTPServer):
+    batches = []
+
+    def handler(request: Request):
+        batches.append(request.get_json())
+        return allow_readers(request)
+
+    httpserver.expect_request("/allowed/bulk").respond_with_handler(handler)
+    async with mocked_permit(
+        httpserver, check_batching={"enable": True, "max_delay": 10, "max_batch_size": 2}
+    ) as permit:
+        decisions = await asyncio.wait_for(
+            asyncio.gather(*[permit.check(f"user-{i}", "read", "document") for i in range(4)]), timeout=5
+        )
+        assert decisions == [True] * 4
+        assert [len(batch) for batch in batches] == [2, 2]
+
+
+async def test_batch_errors_reach_every_caller(httpserver: HTTPServer):
+    httpserver.expect_request("/allowed/bulk").respond_with_json({"detail": "boom"}, status=500)
+    async with mocked_permit(httpserver, check_batching={"enable": True}) as permit:
+        results = await asyncio.gather(
+            *[permit.check(f"user-{i}", "read", "document") for i in range(3)], return_exceptions=True
+        )
+        assert all(isinstance(result, PermitConnectionError) for result in results)
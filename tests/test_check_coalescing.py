@@ -0,0 +1,100 @@
+import asyncio
+import json
+import time
+
+import pytest
+from pytest_httpserver import HTTPServer
+from werkzeug import Request, Response
+
+from permit import PermitConnectionError
+
+from .utils import mocked_permit
+
+
+async def test_identical_checks_share_one_request(httpserver: HTTPServer):
+    calls = []
+
+    def slow_allow(request: Request):
+        calls.append(request.get_json())
+        time.sleep(0.2)
+        return Response(json.dumps({"allow": True}), status=200, content_type="application/json")
+
+    httpserver.expect_request("/allowed").respond_with_handler(slow_allow)
+    async with mocked_permit(httpserver, coalesce_checks=True) as permit:
+        decisions = await asyncio.gather(*[permit.check("user", "read", "document:1") for _ in range(10)])
+        assert decisions == [True] * 10
+        assert len(calls) == 1
+
+        await asyncio.gather(permit.check("user", "read", "document:1"), permit.check("user", "read", "document:2"))
+        assert len(calls) == 3
+
+        # a query that may not be retried does not wait for one that may be
+        await asyncio.gather(
+            permit.check("user", "read", "document:1"), permit.check("user", "read", "document:1", retries=0)
+        )
+        assert len(calls) == 5
+        assert len(permit._enforcer._in_flight_checks) == 0
+
+
+async def test_coalesced_checks_share_errors(httpserver: HTTPServer):
+    calls = []
+
+    def slow_error(request: Request):
+        calls.append(request.get_json())
+        time.sleep(0.2)
+        return Response(json.dumps({"detail": "boom"}), status=500, content_type="application/json")
+
+    httpserver.expect_request("/allowed").respond_with_handler(slow_error)
+    async with mocked_permit(httpserver, coalesce_checks=True) as permit:
+        results = await asyncio.gather(
+            *[permit.check("user", "read", "document:1") for _ in range(5)], return_exceptions=True
+        )
+        assert all(isinstance(result, PermitConnectionError) for result in results)
+        assert len(calls) == 1
+
+
+async def test_coalescing_is_disabled_by_default(httpserver: HTTPServer):
+    calls = []
+
+    def slow_allow(request: Request):
+        calls.append(request.get_json())
+        time.sleep(0.1)
+        return Response(json.dumps({"allow": True}), status=200, content_type="application/json")
+
+    httpserver.expect_request("/allowed").respond_with_handler(slow_allow)
+    async with mocked_permit(httpserver) as permit:
+        await asyncio.gather(*[permit.check("user", "read", "document:1") for _ in range(3)])
+        assert len(calls) == 3
+
+
+async def test_cancelled_waiter_does_not_cancel_shared_check(httpserver: HTTPServer):
+    def slow_allow(request: Request):  # noqa: ARG001
+        time.sleep(0.2)
+        return Response(json.dumps({"allow": True}), status=200, content_type="application/json")
+
+    httpserver.expect_request("/allowed").respond_with_handler(slow_allow)
+    async with mocked_permit(httpserver, coalesce_checks=True) as permit:
+        first = asyncio.ensure_future(permit.check("user", "read", "document:1"))
+        second = asyncio.ensure_future(permit.check("user", "read", "document:1"))
+        await asyncio.sleep(0.05)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        assert await second
+
+
+async def test_coalesced_checks_are_serialized_once(httpserver: HTTPServer, monkeypatch: pytest.MonkeyPatch):
+    httpserver.expect_request("/allowed").respond_with_json({"allow": True})
+    async with mocked_permit(httpserver, coalesce_checks=True) as permit:
+        codec = permit._enforcer._json
+        serialized = []
+
+        def dumps_bytes(obj) -> bytes:
+            serialized.append(obj)
+            return json.dumps(obj).encode()
+
+        monkeypatch.setattr(codec, "dumps_bytes", dumps_bytes)
+        # the coalescing key is the serialized query sent to the PDP, not the (costlier) decision cache key
+        monkeypatch.setattr("permit.enforcement.enforcer.DecisionCache.key_for", pytest.fail)
+        assert await permit.check("user", "read", "document:1")
+    assert len(serialized) == 1
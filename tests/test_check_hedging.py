@@ -0,0 +1,65 @@
+import asyncio
+import json
+import threading
+import time
+from collections import Counter
+
+from pytest_httpserver import HTTPServer
+from werkzeug import Request, Response
+
+from permit import Permit
+
+from .utils import mocked_permit
+
+
+def hedged_permit(httpserver: HTTPServer, **options) -> Permit:
+    base_url = httpserver.url_for("").rstrip("/")
+    return mocked_permit(
+        httpserver,
+        pdp_load_balancing={"endpoints": [f"{base_url}/slow", f"{base_url}/fast"], "strategy": "power_of_two"},
+        **options,
+    )
+
+
+async def test_slow_check_is_hedged(threaded_httpserver: HTTPServer):
+    calls = Counter()
+    # the slow endpoint does not answer before the end of the test, so a check can only be answered by a hedge
+    released = threading.Event()
+
+    def allow(request: Request):
+        endpoint = request.path.split("/")[1]
+        calls[endpoint] += 1
+        if endpoint == "slow":
+            released.wait(timeout=30)
+        return Response(json.dumps({"allow": True}), status=200, content_type="application/json")
+
+    threaded_httpserver.expect_request("/slow/allowed").respond_with_handler(allow)
+    threaded_httpserver.expect_request("/fast/allowed").respond_with_handler(allow)
+    async with hedged_permit(
+        threaded_httpserver, check_hedging={"enable": True, "initial_delay": 0.02, "max_hedge_ratio": 1}
+    ) as permit:
+        hedger = permit._enforcer._check_hedger
+        try:
+            for i in range(10):
+                # the timeout only keeps a regression from hanging the test, it is far beyond the hedging delay
+                assert await asyncio.wait_for(permit.check("user", "read", f"document:{i}"), timeout=10)
+        finally:
+            released.set()
+        # every query was answered by the fast endpoint, whether it was first sent there or hedged to it
+        assert calls["fast"] == 10
+        assert hedger.hedges_won <= hedger.hedged
+
+
+async def test_hedging_budget(threaded_httpserver: HTTPServer):
+    def slow_allow(request: Request):  # noqa: ARG001
+        time.sleep(0.03)
+        return Response(json.dumps({"allow": True}), status=200, content_type="application/json")
+
+    threaded_httpserver.expect_request("/slow/allowed").respond_with_handler(slow_allow)
+    threaded_httpserver.expect_request("/fast/allowed").respond_with_handler(slow_allow)
+    async with hedged_permit(
+        threaded_httpserver, check_hedging={"enable": True, "initial_delay": 0.001, "max_hedge_ratio": 0.1}
+    ) as permit:
+        for i in range(30):
+            assert await permit.check("user", "read", f"document:{i}")
+        assert permit._enforcer._check_hedger.hedged <= 3
@@ -0,0 +1,75 @@
+import asyncio
+import json
+
+import pytest
+from pytest_httpserver import HTTPServer
+from werkzeug import Request, Response
+
+from permit import Permit, PermitConnectionError
+from permit.exceptions import PermitApiError, PermitCircuitOpenError
+from permit.utils.circuit_breaker import CircuitState
+
+from .utils import mocked_permit
+
+
+CIRCUIT_BREAKER = {"enable": True, "window_size": 4, "minimum_calls": 4, "open_duration": 0.1}
+
+
+async def test_pdp_circuit_opens_and_recovers(httpserver: HTTPServer):
+    pdp_available = False
+    calls = []
+
+    def allow(request: Request):
+        calls.append(request.path)
+        if not pdp_available:
+            return Response(json.dumps({"detail": "unavailable"}), status=503, content_type="application/json")
+        return Response(json.dumps({"allow": True}), status=200, content_type="application/json")
+
+    httpserver.expect_request("/allowed").respond_with_handler(allow)
+    transitions = []
+    async with mocked_permit(httpserver, circuit_breaker=CIRCUIT_BREAKER) as permit:
+        circuit_breaker = permit.circuit_breakers["pdp"]
+        circuit_breaker.add_listener(lambda name, previous, state: transitions.append((name, previous, state)))
+        for _ in range(4):
+            with pytest.raises(PermitConnectionError):
+                await permit.check("user", "read", "document")
+        assert circuit_breaker.state == CircuitState.OPEN
+
+        # fails fast, without sending the query
+        with pytest.raises(PermitCircuitOpenError):
+            await permit.check("user", "read", "document")
+        assert len(calls) == 4
+
+        pdp_available = True
+        await asyncio.sleep(0.15)
+        assert await permit.check("user", "read", "document")
+        assert circuit_breaker.state == CircuitState.CLOSED
+        assert transitions == [
+            ("pdp", CircuitState.CLOSED, CircuitState.OPEN),
+            ("pdp", CircuitState.OPEN, CircuitState.HALF_OPEN),
+            ("pdp", CircuitState.HALF_OPEN, CircuitState.CLOSED),
+        ]
+        stats = circuit_breaker.stats
+        assert (stats.failures, stats.successes, stats.rejected, stats.opened) == (4, 1, 1, 1)
+
+
+async def test_client_errors_do_not_open_the_circuit(httpserver: HTTPServer):
+    httpserver.expect_request("/allowed").respond_with_json({"detail": "invalid query"}, status=422)
+    async with mocked_permit(httpserver, circuit_breaker=CIRCUIT_BREAKER) as permit:
+        for _ in range(6):
+            with pytest.raises(PermitConnectionError):
+                await permit.check("user", "read", "document")
+        assert permit.circuit_breakers["pdp"].state == CircuitState.CLOSED
+
+
+async def test_api_circuit_opens(httpserver: HTTPServer):
+    httpserver.expect_request("/v2/api-key/scope").respond_with_json({"detail": "unavailable"}, status=503)
+    url = httpserver.url_for("").rstrip("/")
+    async with Permit(token="mocked", pdp=url, api_url=url, circuit_breaker=CIRCUIT_BREAKER) as permit:
+        for _ in range(4):
+            with pytest.raises(PermitApiError):
+                await permit.api.users.get("user")
+        with pytest.raises(PermitCircuitOpenError):
+            await permit.api.users.get("user")
+        assert permit.circuit_breakers["api"].state == CircuitState.OPEN
+        assert permit.circuit_breakers["pdp"].state == CircuitState.CLOSED
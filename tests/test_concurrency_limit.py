@@ -0,0 +1,134 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+from pytest_httpserver import HTTPServer
+from werkzeug import Request, Response
+
+from permit import PermitConnectionError
+from permit.config import PdpConcurrencyLimitConfig
+from permit.enforcement.limiter import ConcurrencyLimiter
+from permit.exceptions import PermitLoadSheddingError
+from permit.utils.circuit_breaker import CircuitState
+
+from .utils import mocked_permit
+
+
+def slow_pdp(httpserver: HTTPServer, delay: float):
+    in_flight = {"current": 0, "max": 0}
+    lock = threading.Lock()
+
+    def allow(request: Request):  # noqa: ARG001
+        with lock:
+            in_flight["current"] += 1
+            in_flight["max"] = max(in_flight["max"], in_flight["current"])
+        time.sleep(delay)
+        with lock:
+            in_flight["current"] -= 1
+        return Response(json.dumps({"allow": True}), status=200, content_type="application/json")
+
+    httpserver.expect_request("/allowed").respond_with_handler(allow)
+    return in_flight
+
+
+async def test_requests_beyond_the_limit_wait(threaded_httpserver: HTTPServer):
+    in_flight = slow_pdp(threaded_httpserver, delay=0.05)
+    async with mocked_permit(
+        threaded_httpserver,
+        pdp_concurrency_limit={"enable": True, "initial_limit": 2, "max_limit": 2},
+    ) as permit:
+        decisions = await asyncio.gather(*(permit.check(f"user{i}", "read", "document") for i in range(6)))
+        assert all(decisions)
+        assert in_flight["max"] == 2
+        stats = permit.pdp_concurrency_limiter.stats
+        assert (stats.in_flight, stats.queued, stats.shed) == (0, 0, 0)
+
+
+async def test_requests_are_shed_beyond_the_queue_size(threaded_httpserver: HTTPServer):
+    slow_pdp(threaded_httpserver, delay=0.1)
+    async with mocked_permit(
+        threaded_httpserver,
+        pdp_concurrency_limit={"enable": True, "initial_limit": 1, "max_limit": 1, "max_queue_size": 1},
+        circuit_breaker={"enable": True, "minimum_calls": 1},
+    ) as permit:
+        results = await asyncio.gather(
+            *(permit.check(f"user{i}", "read", "document") for i in range(3)), return_exceptions=True
+        )
+        assert results.count(True) == 2
+        assert sum(isinstance(result, PermitLoadSheddingError) for result in results) == 1
+        assert permit.pdp_concurrency_limiter.stats.shed == 1
+        # shed requests are not failures of the PDP
+        assert permit.circuit_breakers["pdp"].stats.failures == 0
+
+
+async def test_shed_requests_do_not_close_a_half_open_circuit(threaded_httpserver: HTTPServer):
+    slow_pdp(threaded_httpserver, delay=0.1)
+    async with mocked_permit(
+        threaded_httpserver,
+        pdp_concurrency_limit={"enable": True, "initial_limit": 1, "max_limit": 1, "max_queue_size": 0},
+        circuit_breaker={"enable": True, "minimum_calls": 1, "open_duration": 0, "half_open_max_calls": 2},
+    ) as permit:
+        circuit_breaker = permit.circuit_breakers["pdp"]
+        with pytest.raises(PermitConnectionError):
+            async with circuit_breaker.guard():
+                raise PermitConnectionError("the PDP is down")
+        assert circuit_breaker.state == CircuitState.OPEN
+
+        results = await asyncio.gather(
+            *(permit.check(f"user{i}", "read", "document") for i in range(2)), return_exceptions=True
+        )
+        assert results.count(True) == 1
+        assert sum(isinstance(result, PermitLoadSheddingError) for result in results) == 1
+        # a single trial succeeded, the shed request was not a trial
+        assert circuit_breaker.state == CircuitState.HALF_OPEN
+        assert await permit.check("user", "read", "document")
+        assert circuit_breaker.state == CircuitState.CLOSED
+
+
+async def test_limit_adapts_to_latency():
+    limiter = ConcurrencyLimiter(
+        PdpConcurrencyLimitConfig(enable=True, initial_limit=4, max_limit=8, latency_tolerance=5)
+    )
+
+    async def request(latency: float, kind: str = "check"):
+        async with limiter.acquire(kind):
+            await asyncio.sleep(latency)
+
+    # the limit grows while it is used, and the PDP answers in time
+    await asyncio.gather(*(request(0.01) for _ in range(40)))
+    assert limiter.limit > 4
+    grown_limit = limiter.limit
+
+    # slower kinds of requests are compared to their own baseline
+    for _ in range(3):
+        await request(0.2, kind="bulk_check")
+    assert limiter.limit == grown_limit
+
+    # and shrinks once the PDP gets much slower
+    for _ in range(3):
+        await request(0.2)
+    assert limiter.limit < grown_limit
+
+
+async def test_cancelled_waiters_release_their_slot():
+    limiter = ConcurrencyLimiter(PdpConcurrencyLimitConfig(enable=True, initial_limit=1, max_limit=1))
+    release = asyncio.Event()
+
+    async def request():
+        async with limiter.acquire():
+            await release.wait()
+
+    first = asyncio.ensure_future(request())
+    await asyncio.sleep(0)
+    waiting = asyncio.ensure_future(request())
+    await asyncio.sleep(0)
+    assert limiter.stats.queued == 1
+    waiting.cancel()
+    release.set()
+    await first
+    await asyncio.gather(waiting, return_exceptions=True)
+    stats = limiter.stats
+    assert (stats.in_flight, stats.queued) == (0, 0)
+    await asyncio.wait_for(request(), timeout=1)
@@ -0,0 +1,98 @@
+from copy import deepcopy
+
+import pytest
+
+from permit.utils.context import ContextStore
+from permit.utils.dicts import deep_merge, shared_merge
+
+
+def test_shared_merge_matches_deep_merge():
+    base = {"a": 1, "nested": {"x": 1, "y": {"z": 1}}, "list": [1, 2]}
+    overrides = {"b": 2, "nested": {"y": {"w": 2}}, "list": [3]}
+    assert shared_merge(base, overrides) == deep_merge(base, overrides)
+    assert base == {"a": 1, "nested": {"x": 1, "y": {"z": 1}}, "list": [1, 2]}
+
+
+def test_derived_context_is_not_copied_per_query():
+    store = ContextStore()
+    store.add({"org": {"id": "permit"}})
+    assert store.get_derived_context({}) is store.get_derived_context({})
+
+    query_context = {"ip": "1.1.1.1", "geo": {"country": "IL"}}
+    derived = store.get_derived_context(query_context)
+    assert derived == {"org": {"id": "permit"}, "ip": "1.1.1.1", "geo": {"country": "IL"}}
+    assert derived["org"] is store.get_derived_context({})["org"]
+    assert derived["geo"] is query_context["geo"]
+
+
+def test_shared_base_context_is_read_only():
+    store = ContextStore()
+    store.add({"org": {"id": "permit"}})
+    base = store.get_derived_context({})
+    with pytest.raises(TypeError):
+        base["org"] = "other"
+    with pytest.raises(TypeError):
+        base["org"].update(id="other")
+    with pytest.raises(TypeError):
+        store.get_derived_context({"ip": "1.1.1.1"})["org"]["id"] = "other"
+    assert store.get_derived_context({}) == {"org": {"id": "permit"}}
+
+    # copies of the base context can be modified
+    copied = deepcopy(base)
+    copied["org"]["id"] = "other"
+    assert type(copied["org"]) is dict
+    assert store.get_derived_context({}) == {"org": {"id": "permit"}}
+
+
+def test_derived_context_follows_changes():
+    store = ContextStore()
+    query_context = {"ip": "1.1.1.1"}
+    first = store.get_derived_context(query_context)
+
+    query_context["ip"] = "2.2.2.2"
+    second = store.get_derived_context(query_context)
+    assert first == {"ip": "1.1.1.1"}
+    assert second == {"ip": "2.2.2.2"}
+
+    store.add({"org": "permit"})
+    assert store.get_derived_context(query_context) == {"org": "permit", "ip": "2.2.2.2"}
+    assert first == {"ip": "1.1.1.1"}
+
+
+async def test_context_scope_is_derived_once():
+    store = ContextStore()
+    store.add({"org": "permit"})
+    with store.scope({"ip": "1.1.1.1", "geo": {"country": "IL"}}):
+        scoped = store.get_derived_context({})
+        assert scoped == {"org": "permit", "ip": "1.1.1.1", "geo": {"country": "IL"}}
+        assert store.get_derived_context({}) is scoped
+
+        async with store.scope({"geo": {"city": "TLV"}}):
+            assert store.get_derived_context({"time": 1}) == {
+                "org": "permit",
+                "ip": "1.1.1.1",
+                "geo": {"country": "IL", "city": "TLV"},
+                "time": 1,
+            }
+
+        store.add({"env": "prod"})
+        assert store.get_derived_context({}) == {
+            "org": "permit",
+            "env": "prod",
+            "ip": "1.1.1.1",
+            "geo": {"country": "IL"},
+        }
+    assert store.get_derived_context({}) == {"org": "permit", "env": "prod"}
+
+
+async def test_context_scopes_are_isolated_between_tasks():
+    import asyncio
+
+    store = ContextStore()
+
+    async def request(ip: str):
+        with store.scope({"ip": ip}):
+            await asyncio.sleep(0.01)
+            return store.get_derived_context({})
+
+    assert await asyncio.gather(request("1.1.1.1"), request("2.2.2.2")) == [{"ip": "1.1.1.1"}, {"ip": "2.2.2.2"}]
@@ -0,0 +1,251 @@
+import json
+import time
+from uuid import uuid4
+
+from pytest_httpserver import HTTPServer
+from werkzeug import Request, Response
+
+from permit import Permit
+from permit.config import DecisionCacheConfig
+from permit.enforcement.cache import DecisionCache
+
+from .utils import mocked_permit
+
+
+def query(user: str, resource_type: str, resource_key=None, tenant="default", action="read") -> dict:
+    resource = {"type": resource_type, "tenant": tenant, "context": {"tenant": tenant}}
+    if resource_key is not None:
+        resource["key"] = resource_key
+    return {"user": {"key": user}, "action": action, "resource": resource, "context": {}}
+
+
+def test_cache_ttl_per_decision(monkeypatch):
+    cache = DecisionCache(DecisionCacheConfig(enable=True, allow_ttl=10, deny_ttl=1))
+    allowed, denied = DecisionCache.key_for(query("u1", "doc")), DecisionCache.key_for(query("u2", "doc"))
+    cache.set(allowed, decision=True)
+    cache.set(denied, decision=False)
+    assert cache.get(allowed) is True
+    assert cache.get(denied) is False
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 5)
+    assert cache.get(allowed) is True
+    assert cache.get(denied) is None
+    assert cache.stats.hits == 3
+    assert cache.stats.misses == 1
+    assert cache.stats.entries == 1
+
+
+def test_cache_lru_eviction():
+    cache = DecisionCache(DecisionCacheConfig(enable=True, max_entries=2))
+    first, second, third = (DecisionCache.key_for(query(f"u{i}", "doc")) for i in range(3))
+    cache.set(first, decision=True)
+    cache.set(second, decision=True)
+    assert cache.get(first) is True  # first is now the most recently used
+    cache.set(third, decision=True)
+    assert cache.get(second) is None
+    assert cache.get(first) is True
+    assert cache.stats.evictions == 1
+
+    bounded = DecisionCache(DecisionCacheConfig(enable=True, max_bytes=1000))
+    for i in range(10):
+        bounded.set(DecisionCache.key_for(query(f"u{i}", "doc")), decision=True)
+    assert 0 < bounded.stats.bytes <= 1000
+    assert bounded.stats.entries < 10
+
+
+def test_cache_invalidation():
+    cache = DecisionCache(DecisionCacheConfig(enable=True))
+    keys = {
+        "u1-doc1": DecisionCache.key_for(query("u1", "doc", "1")),
+        "u1-doc2-t2": DecisionCache.key_for(query("u1", "doc", "2", tenant="t2")),
+        "u2-doc1": DecisionCache.key_for(query("u2", "doc", "1")),
+        "u2-folder": DecisionCache.key_for(query("u2", "folder")),
+    }
+    for key in keys.values():
+        cache.set(key, decision=True)
+
+    assert cache.invalidate(user="u1", tenant="t2") == 1
+    assert cache.get(keys["u1-doc2-t2"]) is None
+    assert cache.invalidate(resource="doc:1") == 2
+    assert cache.get(keys["u2-folder"]) is True
+    assert cache.invalidate(resource={"type": "folder"}) == 1
+    assert cache.stats.entries == 0
+    assert cache.stats.invalidations == 4
+
+
+async def test_check_served_from_cache(httpserver: HTTPServer):
+    calls = []
+
+    def allow_reader(request: Request):
+        body = request.get_json()
+        calls.append(body)
+        return Response(json.dumps({"allow": body["action"] == "read"}), status=200, content_type="application/json")
+
+    httpserver.expect_request("/allowed").respond_with_handler(allow_reader)
+    async with mocked_permit(httpserver, decision_cache={"enable": True}) as permit:
+        assert await permit.check("user", "read", "document:1")
+        assert await permit.check("user", "read", "document:1")
+        assert not await permit.check("user", "write", "document:1")
+        assert not await permit.check("user", "write", "document:1")
+        assert await permit.check("user", "read", "document:1", context={"ip": "1.1.1.1"})
+        assert len(calls) == 3
+
+        permit.cache.invalidate(user="user")
+        assert await permit.check("user", "read", "document:1")
+        assert len(calls) == 4
+        assert permit.cache.stats.hits == 2
+
+
+async def test_api_writes_invalidate_cached_decisions(httpserver: HTTPServer):
+    calls = []
+
+    def allow(request: Request):
+        calls.append(request.get_json())
+        return Response(json.dumps({"allow": True}), status=200, content_type="application/json")
+
+    scope = {"organization_id": str(uuid4()), "project_id": str(uuid4()), "environment_id": str(uuid4())}
+    httpserver.expect_request("/allowed").respond_with_handler(allow)
+    httpserver.expect_request("/v2/api-key/scope").respond_with_json(scope)
+    httpserver.expect_request("/facts/users/elon/roles", method="POST").respond_with_json(
+        {
+            "id": str(uuid4()),
+            "user": "elon",
+            "role": "admin",
+            "tenant": "tesla",
+            "user_id": str(uuid4()),
+            "role_id": str(uuid4()),
+            "tenant_id": str(uuid4()),
+            "organization_id": scope["organization_id"],
+            "project_id": scope["project_id"],
+            "environment_id": scope["environment_id"],
+            "created_at": "2024-01-01T00:00:00",
+        }
+    )
+    httpserver.expect_request("/facts/tenants/tesla", method="DELETE").respond_with_data(status=204)
+
+    url = httpserver.url_for("").rstrip("/")
+    async with Permit(
+        token="mocked", pdp=url, api_url=url, proxy_facts_via_pdp=True, decision_cache={"enable": True}
+    ) as permit:
+        checks = [
+            ("elon", "read", {"type": "document", "key": "1", "tenant": "tesla"}),
+            ("elon", "read", {"type": "document", "key": "1", "tenant": "spacex"}),
+            ("jeff", "read", {"type": "document", "key": "1", "tenant": "tesla"}),
+        ]
+        for user, action, resource in checks:
+            await permit.check(user, action, resource)
+        assert permit.cache.stats.entries == 3
+
+        await permit.api.users.assign_role({"user": "elon", "role": "admin", "tenant": "tesla"})
+        assert permit.cache.stats.entries == 2
+        await permit.api.tenants.delete("tesla")
+        assert permit.cache.stats.entries == 1
+
+        for user, action, resource in checks:
+            await permit.check(user, action, resource)
+        assert len(calls) == 5
+
+
+def test_cache_does_not_store_values_fetched_before_an_invalidation():
+    cache = DecisionCache(DecisionCacheConfig(enable=True))
+    key = DecisionCache.key_for(query("u1", "doc", "1"))
+    generation = cache.generation
+    cache.invalidate(user="u2")
+    cache.set(key, decision=True, generation=generation)
+    assert cache.get(key) is None
+    cache.set(key, decision=True, generation=cache.generation)
+    assert cache.get(key) is True
+
+
+async def test_decisions_checked_during_an_invalidation_are_not_cached(httpserver: HTTPServer):
+    calls = []
+
+    def allow(request: Request):
+        calls.append(request.get_json())
+        if len(calls) == 1:
+            # the facts change while the decision is made
+            permit.cache.invalidate(resource="document")
+        return Response(json.dumps({"allow": True}), status=200, content_type="application/json")
+
+    httpserver.expect_request("/allowed").respond_with_handler(allow)
+    async with mocked_permit(httpserver, decision_cache={"enable": True}) as permit:
+        assert await permit.check("user", "read", "document:1")
+        assert await permit.check("user", "read", "document:1")
+        assert await permit.check("user", "read", "document:1")
+        assert len(calls) == 2
+
+
+async def test_deleting_an_instance_by_id_invalidates_its_decisions(httpserver: HTTPServer):
+    httpserver.expect_request("/allowed").respond_with_data(
+        json.dumps({"allow": True}), content_type="application/json"
+    )
+    scope = {"organization_id": str(uuid4()), "project_id": str(uuid4()), "environment_id": str(uuid4())}
+    instance_id = str(uuid4())
+    httpserver.expect_request("/v2/api-key/scope").respond_with_json(scope)
+    httpserver.expect_request(f"/facts/resource_instances/{instance_id}", method="GET").respond_with_json(
+        {
+            "id": instance_id,
+            "key": "1",
+            "resource": "document",
+            "tenant": "default",
+            "resource_id": str(uuid4()),
+            "tenant_id": str(uuid4()),
+            "created_at": "2024-01-01T00:00:00",
+            "updated_at": "2024-01-01T00:00:00",
+            **scope,
+        }
+    )
+    httpserver.expect_request(f"/facts/resource_instances/{instance_id}", method="DELETE").respond_with_data(status=204)
+
+    url = httpserver.url_for("").rstrip("/")
+    async with Permit(
+        token="mocked", pdp=url, api_url=url, proxy_facts_via_pdp=True, decision_cache={"enable": True}
+    ) as permit:
+        for resource in ("document:1", "document:2", "folder:1"):
+            await permit.check("user", "read", resource)
+        await permit.api.resource_instances.delete(instance_id)
+        # only the decisions of the deleted instance were invalidated
+        assert permit.cache.stats.entries == 2
+        await permit.check("user", "read", "document:2")
+        assert permit.cache.stats.hits == 1
+
+
+async def test_assignments_by_id_invalidate_cached_decisions(httpserver: HTTPServer):
+    scope = {"organization_id": str(uuid4()), "project_id": str(uuid4()), "environment_id": str(uuid4())}
+    user_id = str(uuid4())
+    httpserver.expect_request("/allowed").respond_with_data(
+        json.dumps({"allow": True}), content_type="application/json"
+    )
+    httpserver.expect_request("/v2/api-key/scope").respond_with_json(scope)
+    httpserver.expect_request("/facts/role_assignments", method="POST").respond_with_json(
+        {
+            "id": str(uuid4()),
+            "user": "elon",
+            "role": "admin",
+            "tenant": "tesla",
+            "user_id": user_id,
+            "role_id": str(uuid4()),
+            "tenant_id": str(uuid4()),
+            "created_at": "2024-01-01T00:00:00",
+            **scope,
+        }
+    )
+    httpserver.expect_request("/facts/role_assignments", method="DELETE").respond_with_data(status=204)
+    httpserver.expect_request(f"/facts/users/{user_id}", method="GET").respond_with_json({"id": user_id, "key": "elon"})
+
+    async with mocked_permit(httpserver, proxy_facts_via_pdp=True, decision_cache={"enable": True}) as permit:
+        resource = {"type": "document", "key": "1", "tenant": "tesla"}
+        await permit.check("elon", "read", resource)
+        await permit.check("jeff", "read", resource)
+        assert permit.cache.stats.entries == 2
+
+        assignment = {"user": user_id, "role": "admin", "tenant": "tesla"}
+        await permit.api.role_assignments.assign(assignment)
+        assert permit.cache.stats.entries == 1
+        await permit.check("elon", "read", resource)
+        await permit.api.role_assignments.unassign(assignment)
+        assert permit.cache.stats.entries == 1
+        assert permit.cache.stats.invalidations == 2
+    # the user id was resolved to its key to unassign, the created assignment already had it
+    assert [request.path for request, _ in httpserver.log].count(f"/facts/users/{user_id}") == 1
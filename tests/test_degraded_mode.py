@@ -0,0 +1,112 @@
+import asyncio
+import json
+
+import pytest
+from pytest_httpserver import HTTPServer
+from werkzeug import Request, Response
+
+from permit import Permit, PermitConnectionError
+
+from .utils import mocked_permit
+
+
+class FlakyPdp:
+    def __init__(self):
+        self.calls = 0
+        self.available = True
+        self.allow = True
+        self.status = 503
+
+    def __call__(self, request: Request) -> Response:  # noqa: ARG002
+        self.calls += 1
+        if not self.available:
+            return Response(json.dumps({"detail": "unavailable"}), status=self.status, content_type="application/json")
+        return Response(json.dumps({"allow": self.allow}), status=200, content_type="application/json")
+
+
+def flaky_permit(httpserver: HTTPServer, pdp: FlakyPdp, **options) -> Permit:
+    httpserver.expect_request("/allowed").respond_with_handler(pdp)
+    return mocked_permit(httpserver, **options)
+
+
+async def test_stale_while_revalidate(httpserver: HTTPServer):
+    pdp = FlakyPdp()
+    async with flaky_permit(
+        httpserver,
+        pdp,
+        decision_cache={"enable": True, "allow_ttl": 0.05, "deny_ttl": 0.05},
+        degraded_mode={"enable": True, "stale_while_revalidate": 10},
+    ) as permit:
+        assert await permit.check("user", "read", "document")
+        await asyncio.sleep(0.1)
+
+        pdp.allow = False
+        # the expired decision is served, and revalidated in the background
+        assert await permit.check("user", "read", "document")
+        await asyncio.sleep(0.05)
+        assert pdp.calls == 2
+        assert not await permit.check("user", "read", "document")
+        assert permit.cache.stats.stale_hits == 1
+
+
+async def test_fallback_after_deadline(httpserver: HTTPServer):
+    pdp = FlakyPdp()
+    pdp.available = False
+    async with flaky_permit(
+        httpserver,
+        pdp,
+        degraded_mode={
+            "enable": True,
+            "unreachable_deadline": 0.05,
+            "fallback": "fail_open",
+            "fail_open_actions": ["read"],
+        },
+    ) as permit:
+        with pytest.raises(PermitConnectionError):
+            await permit.check("user", "read", "document")
+        await asyncio.sleep(0.1)
+        assert await permit.check("user", "read", "document")
+        assert not await permit.check("user", "delete", "document")
+
+        pdp.available = True
+        pdp.allow = False
+        assert not await permit.check("user", "read", "document")
+
+
+async def test_no_fallback_on_rejected_queries(httpserver: HTTPServer):
+    pdp = FlakyPdp()
+    pdp.available = False
+    async with flaky_permit(
+        httpserver, pdp, degraded_mode={"enable": True, "unreachable_deadline": 0.05, "fallback": "fail_open"}
+    ) as permit:
+        with pytest.raises(PermitConnectionError):
+            await permit.check("user", "read", "document")
+        await asyncio.sleep(0.1)
+        assert await permit.check("user", "read", "document")
+
+        # a bad request is raised, and shows the PDP is reachable
+        pdp.status = 400
+        with pytest.raises(PermitConnectionError) as error:
+            await permit.check("user", "read", "document")
+        assert error.value.status_code == 400
+        pdp.status = 503
+        with pytest.raises(PermitConnectionError):
+            await permit.check("user", "read", "document")
+
+
+async def test_stale_fallback(httpserver: HTTPServer):
+    pdp = FlakyPdp()
+    async with flaky_permit(
+        httpserver,
+        pdp,
+        decision_cache={"enable": True, "allow_ttl": 0.01},
+        degraded_mode={"enable": True, "unreachable_deadline": 0, "fallback": "stale", "max_stale": 60},
+    ) as permit:
+        assert await permit.check("user", "read", "document:1")
+        await asyncio.sleep(0.05)
+
+        pdp.available = False
+        assert await permit.check("user", "read", "document:1")
+        # no decision to fall back to: fails closed
+        assert not await permit.check("user", "read", "document:2")
+        assert permit.cache.stats.stale_hits == 1
@@ -0,0 +1,94 @@
+import json
+from dataclasses import dataclass
+from typing import List
+
+from pytest_httpserver import HTTPServer
+from werkzeug import Request, Response
+
+from .utils import mocked_permit
+
+
+@dataclass
+class Document:
+    id: str
+    tenant: str = "default"
+
+
+def mocked_pdp(httpserver: HTTPServer, allowed_types: tuple = ()) -> List[List[dict]]:
+    """
+    the user may read the even documents, and any document of the allowed types
+    """
+    calls = []
+
+    def allowed(query: dict) -> bool:
+        resource = query["resource"]
+        if resource.get("key") is None:
+            return resource["type"] in allowed_types
+        return resource["type"] in allowed_types or int(resource["key"]) % 2 == 0
+
+    def handler(request: Request):
+        queries = request.get_json()
+        calls.append(queries)
+        body = {"allow": [{"allow": allowed(query)} for query in queries]}
+        return Response(json.dumps(body), status=200, content_type="application/json")
+
+    httpserver.expect_request("/allowed/bulk").respond_with_handler(handler)
+    httpserver.expect_request("/allowed").respond_with_handler(
+        lambda request: Response(json.dumps({"allow": allowed(request.get_json())}), content_type="application/json")
+    )
+    return calls
+
+
+async def test_filter_objects(httpserver: HTTPServer):
+    calls = mocked_pdp(httpserver)
+    documents = [Document(str(i)) for i in range(10)] + [Document("2"), Document("3")]
+    async with mocked_permit(httpserver, bulk_check={"chunk_size": 4}) as permit:
+        allowed = await permit.filter_objects("user", "read", documents, key=lambda doc: f"document:{doc.id}")
+    assert [doc.id for doc in allowed] == ["0", "2", "4", "6", "8", "2"]
+    # the 10 distinct documents in (concurrent) chunks of 4, without a type-level query
+    assert sorted(len(chunk) for chunk in calls) == [2, 4, 4]
+    assert all(query["resource"].get("key") is not None for chunk in calls for query in chunk)
+
+
+async def test_filter_objects_type_level_short_circuit(httpserver: HTTPServer):
+    calls = mocked_pdp(httpserver, allowed_types=("folder",))
+    resources = [
+        "folder:1",
+        "folder:3",
+        {"type": "folder", "key": "5", "tenant": "other"},
+        {"type": "folder", "key": "7", "tenant": "other"},
+        {"type": "folder", "key": "9", "attributes": {"shared": True}},
+        "document:1",
+        "document:2",
+    ]
+    async with mocked_permit(httpserver) as permit:
+        assert await permit.filter_objects("user", "read", resources, type_level_check=True) == [
+            *resources[:5],
+            "document:2",
+        ]
+        # the folders of each tenant were allowed at the type level, without checking the instances
+        type_queries, instance_queries = calls
+        assert sorted((query["resource"]["type"], query["resource"]["tenant"]) for query in type_queries) == [
+            ("document", "default"),
+            ("folder", "default"),
+            ("folder", "other"),
+        ]
+        assert [query["resource"].get("key") for query in instance_queries] == ["9", "1", "2"]
+
+        # the instances are checked individually by default
+        calls.clear()
+        assert await permit.filter_objects("user", "read", resources) == [*resources[:5], "document:2"]
+        assert len(calls) == 1
+        assert len(calls[0]) == 7
+
+
+async def test_filter_objects_uses_the_decision_cache(httpserver: HTTPServer):
+    calls = mocked_pdp(httpserver)
+    async with mocked_permit(httpserver, decision_cache={"enable": True}) as permit:
+        assert await permit.check("user", "read", "document:2") is True
+        assert await permit.filter_objects("user", "read", ["document:1", "document:2"]) == ["document:2"]
+        # document:2 was cached by check()
+        assert [[query["resource"]["key"] for query in chunk] for chunk in calls] == [["1"]]
+
+        assert await permit.filter_objects("user", "read", ["document:2", "document:1"]) == ["document:2"]
+        assert len(calls) == 1
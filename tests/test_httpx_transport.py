@@ -0,0 +1,65 @@
+import json
+from uuid import uuid4
+
+import pytest
+from pytest_httpserver import HTTPServer
+from werkzeug import Response
+
+from permit import Permit, PermitConnectionError
+from permit.exceptions import PermitApiError, PermitNotFoundError
+from permit.utils.httpx_transport import get_httpx_session_pool
+
+from .utils import mocked_permit
+
+
+HTTPX = {"backend": "httpx"}
+
+
+def httpx_permit(httpserver: HTTPServer, **options) -> Permit:
+    return mocked_permit(httpserver, http_transport=HTTPX, **options)
+
+
+async def test_check_with_httpx(httpserver: HTTPServer):
+    httpserver.expect_request("/allowed").respond_with_json({"allow": True})
+    httpserver.expect_request("/allowed/bulk").respond_with_json({"allow": [{"allow": True}, {"allow": False}]})
+    async with httpx_permit(httpserver) as permit:
+        assert await permit.check("user", "read", "document")
+        assert await permit.bulk_check(
+            [
+                {"user": "user", "action": "read", "resource": "document"},
+                {"user": "user", "action": "delete", "resource": "document"},
+            ]
+        ) == [True, False]
+    assert all(request.headers["Authorization"] == "bearer mocked" for request, _ in httpserver.log)
+
+
+async def test_pdp_errors_with_httpx(httpserver: HTTPServer):
+    httpserver.expect_request("/allowed").respond_with_response(
+        Response(json.dumps({"detail": "unavailable"}), status=503, content_type="application/json")
+    )
+    async with httpx_permit(httpserver) as permit:
+        with pytest.raises(PermitConnectionError) as error:
+            await permit.check("user", "read", "document")
+        assert error.value.status_code == 503
+
+    async with Permit(token="mocked", pdp="http://127.0.0.1:1", http_transport=HTTPX) as permit:
+        with pytest.raises(PermitConnectionError):
+            await permit.check("user", "read", "document")
+
+
+async def test_api_requests_share_an_httpx_session(httpserver: HTTPServer):
+    scope = {"organization_id": str(uuid4()), "project_id": str(uuid4()), "environment_id": str(uuid4())}
+    httpserver.expect_request("/v2/api-key/scope").respond_with_json(scope)
+    users_url = f"/v2/facts/{scope['project_id']}/{scope['environment_id']}/users"
+    httpserver.expect_request(f"{users_url}/missing").respond_with_json(
+        {"id": "not_found", "title": "not found", "error_code": "NOT_FOUND"}, status=404
+    )
+    httpserver.expect_request(f"{users_url}/broken").respond_with_data("internal error", status=500)
+    async with httpx_permit(httpserver) as permit:
+        with pytest.raises(PermitNotFoundError):
+            await permit.api.users.get("missing")
+        with pytest.raises(PermitApiError) as error:
+            await permit.api.users.get("broken")
+        assert error.value.status_code == 500
+        assert len(get_httpx_session_pool(permit._config)._sessions) == 1
+    assert not get_httpx_session_pool(permit._config)._sessions
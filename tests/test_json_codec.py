@@ -0,0 +1,73 @@
+import json
+
+import pytest
+from pytest_httpserver import HTTPServer
+from werkzeug import Request, Response
+
+from permit.api.base import SimpleHttpClient
+from permit.utils.json_codec import JsonCodec, MsgspecCodec, OrjsonCodec, get_json_codec
+
+from .utils import mocked_permit
+
+
+PAYLOAD = {"user": {"key": "auth0|elon", "attributes": {"age": 50, 1: "int key"}}, "allow": [True, False, None]}
+
+
+def installed_codecs():
+    codecs = [JsonCodec]
+    for codec_class, module in ((OrjsonCodec, "orjson"), (MsgspecCodec, "msgspec")):
+        try:
+            __import__(module)
+        except ImportError:
+            continue
+        codecs.append(codec_class)
+    return codecs
+
+
+@pytest.mark.parametrize("codec_class", installed_codecs())
+def test_codec_round_trip(codec_class):
+    codec = codec_class()
+    expected = json.loads(json.dumps(PAYLOAD))
+    assert json.loads(codec.dumps(PAYLOAD)) == expected
+    assert codec.loads(codec.dumps_bytes(PAYLOAD)) == expected
+
+
+def test_missing_codec_falls_back_to_stdlib(monkeypatch):
+    monkeypatch.setitem(__import__("sys").modules, "msgspec", None)
+    get_json_codec.cache_clear()
+    try:
+        assert type(get_json_codec("msgspec")) is JsonCodec
+        assert get_json_codec("auto").name in ("orjson", "json")
+    finally:
+        get_json_codec.cache_clear()
+
+
+@pytest.mark.parametrize("codec_name", ["json", "auto"])
+async def test_enforcer_uses_configured_codec(httpserver: HTTPServer, codec_name: str):
+    def allow_reader(request: Request):
+        return Response(
+            json.dumps({"allow": request.get_json()["action"] == "read"}),
+            status=200,
+            content_type="application/json",
+        )
+
+    httpserver.expect_request("/allowed").respond_with_handler(allow_reader)
+    async with mocked_permit(httpserver, json_codec=codec_name) as permit:
+        assert await permit.check("user", "read", "document")
+        assert not await permit.check("user", "write", "document")
+
+
+@pytest.mark.parametrize("codec_class", installed_codecs())
+async def test_http_client_uses_codec(httpserver: HTTPServer, codec_class):
+    httpserver.expect_request("/v2/echo", method="POST").respond_with_handler(
+        lambda request: Response(request.data, status=200, content_type="application/json")
+    )
+    client = SimpleHttpClient(
+        {"base_url": httpserver.url_for("").rstrip("/"), "headers": {"Content-Type": "application/json"}},
+        base_url="/v2",
+        json_codec=codec_class(),
+    )
+    assert await client.post("/echo", model=dict, json={"key": "value", "items": [1, 2]}) == {
+        "key": "value",
+        "items": [1, 2],
+    }
@@ -0,0 +1,27 @@
+import pytest
+from pytest_httpserver import HTTPServer
+
+import permit.enforcement.enforcer as enforcer_module
+
+from .utils import mocked_permit
+
+
+@pytest.fixture
+def formatted(monkeypatch: pytest.MonkeyPatch) -> list:
+    formatted = []
+
+    def counting_pformat(value, **kwargs):  # noqa: ARG001
+        formatted.append(value)
+        return repr(value)
+
+    monkeypatch.setattr(enforcer_module, "pformat", counting_pformat)
+    return formatted
+
+
+async def test_debug_logs_are_not_formatted_when_logging_is_disabled(httpserver: HTTPServer, formatted: list):
+    httpserver.expect_request("/allowed").respond_with_json({"allow": True})
+    httpserver.expect_request("/allowed/bulk").respond_with_json({"allow": [{"allow": True}]})
+    async with mocked_permit(httpserver) as permit:
+        assert await permit.check("user", "read", "document")
+        assert await permit.bulk_check([{"user": "user", "action": "read", "resource": "document"}]) == [True]
+    assert formatted == []
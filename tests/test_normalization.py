@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from permit.config import MultiTenancyConfig
+from permit.enforcement.interfaces import ResourceInput
+from permit.enforcement.normalization import (
+    _normalize_resource_model,
+    _normalize_user_model,
+    normalize_resource,
+    normalize_user,
+    parse_resource_string,
+)
+
+USERS = [
+    {"key": "auth0|elon"},
+    {"key": "auth0|elon", "firstName": "Elon", "lastName": "Musk", "email": "elon@tesla.com"},
+    {"key": "auth0|elon", "email": None, "attributes": {"age": 50, "tags": ["ceo"]}},
+    {"key": "auth0|elon", "first_name": "ignored", "unknown": 1, "attributes": None},
+    {"key": "auth0|elon", "roles": [{"role": "admin", "tenant": "tesla", "extra": 1}]},
+    {"key": 1234, "email": "numeric@key.com"},
+]
+
+RESOURCES = [
+    "document",
+    "document:1234",
+    {"type": "document"},
+    {"type": "document", "key": "1234", "tenant": "tesla"},
+    {"type": "document", "key": None, "tenant": None, "attributes": None, "context": None},
+    {"type": "document", "id": "1", "attributes": {"private": True}, "context": {"tenant": "spacex", "a": 1}},
+    {"type": "document", "key": 1234, "tenant": "tesla"},
+    {"type": "document", "context": {"ip": "1.1.1.1"}, "unknown": "ignored"},
+]
+
+MULTI_TENANCY = [MultiTenancyConfig(), MultiTenancyConfig(use_default_tenant_if_empty=False)]
+
+
+def dumps(value: dict) -> bytes:
+    return json.dumps(value).encode()
+
+
+@pytest.mark.parametrize("user", USERS)
+def test_normalized_user_is_identical_to_model(user):
+    expected = _normalize_user_model({"key": user} if isinstance(user, str) else user)
+    assert dumps(normalize_user(user)) == dumps(expected)
+
+
+@pytest.mark.parametrize("multi_tenancy", MULTI_TENANCY)
+@pytest.mark.parametrize("resource", RESOURCES)
+def test_normalized_resource_is_identical_to_model(resource, multi_tenancy):
+    if isinstance(resource, str):
+        resource_type, resource_key = parse_resource_string(resource)
+        model = ResourceInput(type=resource_type, key=resource_key)
+    else:
+        model = ResourceInput(**resource)
+    expected = _normalize_resource_model(model, multi_tenancy)
+    assert dumps(normalize_resource(resource, multi_tenancy)) == dumps(expected)
+
+
+def test_normalization_does_not_mutate_input():
+    context = {"ip": "1.1.1.1"}
+    resource = {"type": "document", "tenant": "tesla", "context": context}
+    normalize_resource(resource, MultiTenancyConfig())
+    assert context == {"ip": "1.1.1.1"}
+
+
+def test_invalid_resource_string():
+    with pytest.raises(ValueError, match="invalid resource string"):
+        normalize_resource("document:1:2", MultiTenancyConfig())
@@ -0,0 +1,59 @@
+import asyncio
+import json
+
+from pytest_httpserver import HTTPServer
+from werkzeug import Request, Response
+
+from permit.sync import Permit as SyncPermit
+
+from .utils import mocked_permit
+
+
+def allow_all(request: Request):  # noqa: ARG001
+    return Response(json.dumps({"allow": True}), status=200, content_type="application/json")
+
+
+async def test_pdp_session_is_reused(httpserver: HTTPServer):
+    httpserver.expect_request("/allowed").respond_with_handler(allow_all)
+    permit = mocked_permit(httpserver)
+
+    assert await permit.check("user", "read", "document")
+    session = permit._enforcer._session
+    assert session is not None
+    assert await permit.check("user", "read", "document:1")
+    assert permit._enforcer._session is session
+
+    await permit.aclose()
+    assert session.closed
+    assert permit._enforcer._session is None
+
+
+async def test_pdp_session_reopens_after_close(httpserver: HTTPServer):
+    httpserver.expect_request("/allowed").respond_with_handler(allow_all)
+    async with mocked_permit(httpserver, pdp_connection={"limit_per_host": 2, "keepalive_timeout": 5}) as permit:
+        assert await permit.check("user", "read", "document")
+        first_session = permit._enforcer._session
+        await permit.aclose()
+        assert await permit.check("user", "read", "document")
+        assert permit._enforcer._session is not first_session
+    assert permit._enforcer._session is None
+
+
+def test_pdp_session_recreated_on_loop_change(httpserver: HTTPServer):
+    httpserver.expect_request("/allowed").respond_with_handler(allow_all)
+    permit = mocked_permit(httpserver)
+
+    assert asyncio.run(permit.check("user", "read", "document"))
+    first_session = permit._enforcer._session
+    assert asyncio.run(permit.check("user", "read", "document"))
+    assert permit._enforcer._session is not first_session
+    assert first_session is not None and first_session.closed
+    asyncio.run(permit.aclose())
+
+
+def test_sync_permit_does_not_keep_session(httpserver: HTTPServer):
+    httpserver.expect_request("/allowed").respond_with_handler(allow_all)
+    permit = SyncPermit(token="mocked", pdp=httpserver.url_for("").rstrip("/"))
+
+    assert permit.check("user", "read", "document")
+    assert permit._enforcer._session is None
@@ -0,0 +1,70 @@
+import asyncio
+import json
+from collections import Counter
+from contextlib import suppress
+
+import pytest
+from pytest_httpserver import HTTPServer
+from werkzeug import Request, Response
+
+from permit import Permit, PermitConnectionError
+
+from .utils import mocked_permit
+
+
+def balanced_permit(httpserver: HTTPServer, endpoints, **options) -> Permit:
+    base_url = httpserver.url_for("").rstrip("/")
+    return mocked_permit(
+        httpserver,
+        pdp_load_balancing={"endpoints": [f"{base_url}/{endpoint}" for endpoint in endpoints], **options},
+    )
+
+
+@pytest.mark.parametrize("strategy", ["least_outstanding", "power_of_two"])
+async def test_queries_are_balanced(httpserver: HTTPServer, strategy: str):
+    calls = Counter()
+
+    def allow(request: Request):
+        calls[request.path.split("/")[1]] += 1
+        return Response(json.dumps({"allow": True}), status=200, content_type="application/json")
+
+    for endpoint in ("pdp1", "pdp2", "pdp3"):
+        httpserver.expect_request(f"/{endpoint}/allowed").respond_with_handler(allow)
+    async with balanced_permit(httpserver, ["pdp1", "pdp2", "pdp3"], strategy=strategy) as permit:
+        await asyncio.gather(*(permit.check("user", "read", f"document:{i}") for i in range(60)))
+    assert sum(calls.values()) == 60
+    assert set(calls) == {"pdp1", "pdp2", "pdp3"}
+
+
+async def test_failing_endpoint_is_ejected_and_readmitted(httpserver: HTTPServer):
+    calls = Counter()
+    pdp2_healthy = False
+
+    def allow(request: Request):
+        endpoint = request.path.split("/")[1]
+        calls[endpoint] += 1
+        if endpoint == "pdp2" and not pdp2_healthy:
+            return Response(json.dumps({"detail": "unavailable"}), status=503, content_type="application/json")
+        return Response(json.dumps({"allow": True}), status=200, content_type="application/json")
+
+    httpserver.expect_request("/pdp1/allowed").respond_with_handler(allow)
+    httpserver.expect_request("/pdp2/allowed").respond_with_handler(allow)
+    httpserver.expect_request("/pdp2/healthy").respond_with_data("ok")
+    async with balanced_permit(httpserver, ["pdp1", "pdp2"], failure_threshold=2, probe_interval=0.05) as permit:
+        endpoints = permit._enforcer._endpoints.endpoints
+        while calls["pdp2"] < 2:
+            with suppress(PermitConnectionError):
+                await permit.check("user", "read", "document")
+        assert not endpoints[1].healthy
+
+        calls.clear()
+        for _ in range(10):
+            assert await permit.check("user", "read", "document")
+        assert calls == {"pdp1": 10}
+
+        pdp2_healthy = True
+        await asyncio.sleep(0.1)
+        # the next query starts a health probe of the ejected endpoint
+        await permit.check("user", "read", "document")
+        await asyncio.sleep(0.05)
+        assert endpoints[1].healthy
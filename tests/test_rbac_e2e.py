@@ -1,6 +1,6 @@
 import asyncio
 import time
-from typing import AsyncIterable, Final, List
+from typing import AsyncIterable, Final, Iterator, List
 
 import pytest
 from loguru import logger
@@ -48,9 +48,15 @@ def sleeping(request: Request):  # noqa: ARG001
     return Response("OK", status=200)
 
 
-@pytest.fixture(scope="session")
-def httpserver_listen_address():
-    return "localhost", MOCKED_PORT
+@pytest.fixture
+def httpserver() -> Iterator[HTTPServer]:
+    # a server of its own on the mocked port: the session wide server of pytest_httpserver
+    # may already be listening on a random port, started by the tests of other modules
+    server = HTTPServer(host="localhost", port=MOCKED_PORT)
+    server.start()
+    yield server
+    server.clear()
+    server.stop()
 
 
 async def test_api_timeout(httpserver: HTTPServer):
@@ -75,27 +81,28 @@ async def test_pdp_timeout(httpserver: HTTPServer):
         api_url=f"{MOCKED_URL}:{MOCKED_PORT}",
         pdp_timeout=TEST_TIMEOUT,
     )
-    current_time = time.time()
-    httpserver.expect_request("/allowed").respond_with_handler(sleeping)
-    with pytest.raises(asyncio.TimeoutError):
-        await permit.check("user", "action", {"type": "resource", "tenant": "tenant"})
-    time_passed = time.time() - current_time
-    assert time_passed < 3
-
-    current_time = time.time()
-    httpserver.expect_request("/allowed/bulk").respond_with_handler(sleeping)
-    with pytest.raises(asyncio.TimeoutError):
-        await permit.bulk_check(
-            [
-                {
-                    "user": "user",
-                    "action": "action",
-                    "resource": {"type": "resource", "tenant": "tenant"},
-                }
-            ]
-        )
-    time_passed = time.time() - current_time
-    assert time_passed < 3
+    async with permit:
+        current_time = time.time()
+        httpserver.expect_request("/allowed").respond_with_handler(sleeping)
+        with pytest.raises(asyncio.TimeoutError):
+            await permit.check("user", "action", {"type": "resource", "tenant": "tenant"})
+        time_passed = time.time() - current_time
+        assert time_passed < 3
+
+        current_time = time.time()
+        httpserver.expect_request("/allowed/bulk").respond_with_handler(sleeping)
+        with pytest.raises(asyncio.TimeoutError):
+            await permit.bulk_check(
+                [
+                    {
+                        "user": "user",
+                        "action": "action",
+                        "resource": {"type": "resource", "tenant": "tenant"},
+                    }
+                ]
+            )
+        time_passed = time.time() - current_time
+        assert time_passed < 3
 
 
 @pytest.fixture
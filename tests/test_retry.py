@@ -0,0 +1,130 @@
+import json
+from uuid import uuid4
+
+import pytest
+from pytest_httpserver import HTTPServer
+from werkzeug import Request, Response
+
+from permit import Permit, PermitConnectionError
+from permit.api.base import SimpleHttpClient
+from permit.config import RetryConfig
+from permit.exceptions import PermitApiError
+from permit.utils.retry import RetryBudget, RetryPolicy, parse_retry_after
+
+from .utils import mocked_permit
+
+
+RETRY = {"enable": True, "max_retries": 2, "initial_backoff": 0.001, "max_backoff": 0.01}
+
+
+def failing_then(responses):
+    calls = []
+
+    def handler(request: Request):  # noqa: ARG001
+        status, body, headers = responses[min(len(calls), len(responses) - 1)]
+        calls.append(status)
+        return Response(json.dumps(body), status=status, headers=headers, content_type="application/json")
+
+    return handler, calls
+
+
+async def test_check_retries_transient_failures(httpserver: HTTPServer):
+    handler, calls = failing_then(
+        [
+            (503, {"detail": "unavailable"}, {"Retry-After": "0"}),
+            (200, {"allow": True}, {}),
+        ]
+    )
+    httpserver.expect_request("/allowed").respond_with_handler(handler)
+    async with mocked_permit(httpserver, retry=RETRY) as permit:
+        assert await permit.check("user", "read", "document")
+    assert calls == [503, 200]
+
+
+async def test_check_does_not_retry_client_errors(httpserver: HTTPServer):
+    handler, calls = failing_then([(422, {"detail": "invalid query"}, {})])
+    httpserver.expect_request("/allowed").respond_with_handler(handler)
+    async with mocked_permit(httpserver, retry=RETRY) as permit:
+        with pytest.raises(PermitConnectionError):
+            await permit.check("user", "read", "document")
+    assert calls == [422]
+
+
+async def test_check_retries_override(httpserver: HTTPServer):
+    handler, calls = failing_then([(503, {"detail": "unavailable"}, {})])
+    httpserver.expect_request("/allowed").respond_with_handler(handler)
+    async with mocked_permit(httpserver, retry=RETRY) as permit:
+        with pytest.raises(PermitConnectionError) as error:
+            await permit.check("user", "read", "document", retries=0)
+        assert error.value.status_code == 503
+        assert calls == [503]
+        with pytest.raises(PermitConnectionError):
+            await permit.check("user", "read", "document")
+        assert calls == [503] * 4
+
+
+async def test_check_does_not_wait_for_a_long_retry_after(httpserver: HTTPServer):
+    handler, calls = failing_then([(429, {"detail": "too many requests"}, {"Retry-After": "3600"})])
+    httpserver.expect_request("/allowed").respond_with_handler(handler)
+    async with mocked_permit(httpserver, retry=RETRY) as permit:
+        with pytest.raises(PermitConnectionError) as error:
+            await permit.check("user", "read", "document")
+        assert error.value.retry_after == 3600
+    assert calls == [429]
+
+
+async def test_api_get_retries_transient_failures(httpserver: HTTPServer):
+    scope = {"organization_id": str(uuid4()), "project_id": str(uuid4()), "environment_id": str(uuid4())}
+    handler, calls = failing_then([(502, {"detail": "bad gateway"}, {}), (200, scope, {})])
+    httpserver.expect_request("/v2/api-key/scope").respond_with_handler(handler)
+    httpserver.expect_request(
+        f"/v2/facts/{scope['project_id']}/{scope['environment_id']}/users/user"
+    ).respond_with_json(
+        {
+            "key": "user",
+            "id": str(uuid4()),
+            "organization_id": scope["organization_id"],
+            "project_id": scope["project_id"],
+            "environment_id": scope["environment_id"],
+            "created_at": "2024-01-01T00:00:00Z",
+            "updated_at": "2024-01-01T00:00:00Z",
+            "roles": [],
+        }
+    )
+    url = httpserver.url_for("").rstrip("/")
+    async with Permit(token="mocked", pdp=url, api_url=url, retry=RETRY) as permit:
+        user = await permit.api.users.get("user")
+    assert user.key == "user"
+    assert calls == [502, 200]
+
+
+async def test_api_read_retries_override(httpserver: HTTPServer):
+    handler, calls = failing_then([(502, {"detail": "bad gateway"}, {}), (200, {"key": "user"}, {})])
+    httpserver.expect_request("/users/user").respond_with_handler(handler)
+    client = SimpleHttpClient(
+        {"base_url": httpserver.url_for("").rstrip("/")}, retry_policy=RetryPolicy(RetryConfig(**RETRY))
+    )
+    with pytest.raises(PermitApiError):
+        await client.get("/users/user", model=dict, retries=0)
+    assert calls == [502]
+    assert await client.get("/users/user", model=dict) == {"key": "user"}
+
+
+def test_retry_budget_limits_retries():
+    budget = RetryBudget(ratio=0.5, min_per_second=0)
+    withdrawn = sum(budget.withdraw() for _ in range(20))
+    assert withdrawn == 10
+    budget.deposit()
+    assert not budget.withdraw()
+    budget.deposit()
+    assert budget.withdraw()
+
+
+def test_retry_policy():
+    policy = RetryPolicy(RetryConfig(enable=True))
+    assert policy.is_retryable(PermitConnectionError("unavailable", status_code=503))
+    assert not policy.is_retryable(PermitConnectionError("forbidden", status_code=403))
+    assert parse_retry_after({"Retry-After": "1.5"}) == 1.5
+    assert parse_retry_after({"Retry-After": "Thu, 01 Jan 1970 00:00:00 GMT"}) == 0
+    assert parse_retry_after({"Retry-After": "soon"}) is None
+    assert parse_retry_after({}) is None
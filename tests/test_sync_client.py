@@ -1,9 +1,13 @@
+import json
 import random
 from concurrent.futures.thread import ThreadPoolExecutor
 
 import pytest
+from pytest_httpserver import HTTPServer
+from werkzeug import Request, Response
 
 from permit import PermitConfig, UserCreate
+from permit.enforcement.interfaces import AuthorizedUserRole
 from permit.sync import Permit
 
 
@@ -31,3 +35,44 @@ def test_sync_client_multithreading(permit_config: PermitConfig):
     with ThreadPoolExecutor() as executor:
         for instance in instances:
             executor.submit(test_sync_client, instance)
+
+
+def test_sync_authorized_users_queries(httpserver: HTTPServer):
+    def authorized_users(request: Request) -> Response:
+        resource = request.get_json()["resource"]
+        resource_id = f"{resource['type']}:{resource['key']}"
+        assignment = {"user": "elon", "tenant": "default", "resource": resource_id, "role": "admin"}
+        body = {"resource": resource_id, "tenant": "default", "users": {"elon": [assignment]}}
+        return Response(json.dumps(body), status=200, content_type="application/json")
+
+    httpserver.expect_request("/authorized_users").respond_with_handler(authorized_users)
+    permit = Permit(token="mocked", pdp=httpserver.url_for("").rstrip("/"))
+    results = permit.bulk_authorized_users([("read", "document:1"), ("read", "document:2")])
+    assert {resource: set(result.users) for (_, resource), result in results.items()} == {
+        "document:1": {"elon"},
+        "document:2": {"elon"},
+    }
+    assert [assignment.role for assignment in permit.authorized_user_assignments("elon", "read", "document:1")] == [
+        "admin"
+    ]
+    assert permit.authorized_user_assignments("jeff", "read", "document:1") == []
+
+
+def test_sync_authorized_users_stream(httpserver: HTTPServer):
+    assignments = [
+        {"user": f"user-{i}", "tenant": "default", "resource": "document:1", "role": "viewer"} for i in range(3)
+    ]
+    body = {
+        "resource": "document:1",
+        "tenant": "default",
+        "users": {assignment["user"]: [assignment] for assignment in assignments},
+    }
+    httpserver.expect_request("/authorized_users").respond_with_json(body)
+    permit = Permit(token="mocked", pdp=httpserver.url_for("").rstrip("/"))
+    assert list(permit.authorized_users_stream("read", "document:1")) == [
+        (f"user-{i}", [AuthorizedUserRole("default", "document:1", "viewer")]) for i in range(3)
+    ]
+    # a stream that is not consumed to its end releases the response
+    stream = permit.authorized_users_stream("read", "document:1")
+    assert next(stream)[0] == "user-0"
+    stream.close()
@@ -0,0 +1,74 @@
+import sys
+import tempfile
+
+import pytest
+from aiohttp import web
+
+from permit import Permit
+from permit.utils.unix_socket import split_unix_socket_url
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="unix domain sockets are not supported on windows")
+
+
+@pytest.fixture
+async def pdp_socket():
+    async def allowed(request: web.Request) -> web.Response:
+        query = await request.json()
+        return web.json_response({"allow": query["action"] == "read"})
+
+    async def bulk_allowed(request: web.Request) -> web.Response:
+        queries = await request.json()
+        return web.json_response({"allow": [{"allow": query["action"] == "read"} for query in queries]})
+
+    async def role_assignments(request: web.Request) -> web.Response:
+        return web.json_response([{"user": request.query["user"], "role": "viewer", "tenant": "default"}])
+
+    app = web.Application()
+    app.router.add_post("/allowed", allowed)
+    app.router.add_post("/allowed/bulk", bulk_allowed)
+    app.router.add_get("/local/role_assignments", role_assignments)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    # the path of a unix socket is limited to ~100 bytes, the (deeply nested) pytest tmp_path may exceed it
+    with tempfile.TemporaryDirectory(prefix="pdp", dir="/tmp") as socket_dir:
+        socket_path = f"{socket_dir}/pdp.sock"
+        await web.UnixSite(runner, socket_path).start()
+        try:
+            yield socket_path
+        finally:
+            await runner.cleanup()
+
+
+async def test_check_over_unix_socket(pdp_socket: str):
+    async with Permit(token="mocked", pdp=f"unix://{pdp_socket}") as permit:
+        assert await permit.check("user", "read", "document")
+        assert not await permit.check("user", "delete", "document")
+        assert await permit.bulk_check([{"user": "user", "action": "read", "resource": "document"}]) == [True]
+
+
+async def test_pdp_api_over_unix_socket(pdp_socket: str):
+    async with Permit(token="mocked", pdp=f"unix://{pdp_socket}") as permit:
+        role_assignments = await permit.pdp_api.role_assignments.list(user_key="user")
+    assert [(assignment.user, assignment.role) for assignment in role_assignments] == [("user", "viewer")]
+
+
+def test_split_unix_socket_url():
+    assert split_unix_socket_url("unix:///var/run/pdp.sock") == ("http://localhost", "/var/run/pdp.sock")
+    assert split_unix_socket_url("http://localhost:7766") == ("http://localhost:7766", None)
+    with pytest.raises(ValueError):
+        split_unix_socket_url("unix://")
+
+
+def test_unix_socket_cannot_be_load_balanced():
+    with pytest.raises(ValueError):
+        Permit(
+            token="mocked",
+            pdp_load_balancing={"endpoints": ["unix:///var/run/pdp.sock", "http://localhost:7766"]},
+        )
+
+
+async def test_httpx_over_unix_socket(pdp_socket: str):
+    async with Permit(token="mocked", pdp=f"unix://{pdp_socket}", http_transport={"backend": "httpx"}) as permit:
+        assert await permit.check("user", "read", "document")
+        role_assignments = await permit.pdp_api.role_assignments.list(user_key="user")
+        assert [assignment.role for assignment in role_assignments] == ["viewer"]
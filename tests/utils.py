@@ -1,9 +1,19 @@
 import pytest
 from loguru import logger
+from pytest_httpserver import HTTPServer
 
+from permit import Permit
 from permit.exceptions import PermitApiError
 
 
+def mocked_permit(httpserver: HTTPServer, **options) -> Permit:
+    """
+    returns a client of the mocked server, used as both the PDP and the API
+    """
+    url = httpserver.url_for("").rstrip("/")
+    return Permit(token="mocked", pdp=url, api_url=url, **options)
+
+
 def handle_api_error(error: PermitApiError, message: str):
     err = (
         f"{message}: status={error.status_code}, url={error.request_url}, method={error.response.method}, "